@@ -1,20 +1,52 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 
+from blueprints.admin import admin_bp
+from blueprints.metrics import metrics_bp
 from blueprints.statement import statement_bp
+from blueprints.stream import stream_bp
+from blueprints.symbols import symbols_bp
+from settings import PROXY_HOPS
 
-app = Flask(__name__)
-app.register_blueprint(statement_bp, url_prefix="/api")
 
-CORS(app)  # allow all origins to access this service
+def create_app(database_url=None, replica_urls=None):
+    """
+    application factory, cheap to call: the database is only connected to by the first request
 
+    :param database_url: database url of the primary, default per STORAGE_BACKEND from settings
+    :param replica_urls: database urls of the read replicas, default REPLICA_HOSTS from settings
+    :return: Flask app
+    """
+    if database_url or replica_urls:
+        import database
+        database.configure(database_url, replica_urls)
 
-@app.route("/")
-def index():
-    return "ok"
+    app = Flask(__name__)
+    app.register_blueprint(statement_bp, url_prefix="/api")
+    app.register_blueprint(symbols_bp, url_prefix="/api")
+    app.register_blueprint(stream_bp, url_prefix="/api")
+    app.register_blueprint(metrics_bp, url_prefix="/api")
+    app.register_blueprint(admin_bp, url_prefix="/api")
+
+    CORS(app)  # allow all origins to access this service
+    if PROXY_HOPS:
+        # request.remote_addr is the client's address as seen by the outermost trusted proxy
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS, x_proto=PROXY_HOPS)
+
+    @app.route("/")
+    def index():
+        return "ok"
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8080, debug=False)
-    # production env, use below
-    # gunicorn --bind 0.0.0.0:9999 app:app
+    # production env, use below, threaded workers since every /api/stream client holds a thread
+    # gunicorn --bind 0.0.0.0:9999 --worker-class gthread --threads 32 app:app
+    # behind the load balancer, which sets X-Forwarded-For, run it with PROXY_HOPS=1, PROXY_HOPS=2 behind
+    # e.g. a CDN and the load balancer; the default 0 is for gunicorn reachable directly
@@ -0,0 +1,49 @@
+"""
+Cold start budget of the API: importing the app and calling the factory in a fresh interpreter,
+as a gunicorn worker or an autoscaled instance does on boot.
+
+Fails (exit code 1) when the median is over IMPORT_BUDGET_MS or when a module that should be
+deferred to first use gets imported at startup.
+
+usage (from the backend dir):
+    python -m benchmarks.bench_import [runs]
+"""
+import statistics
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = 300
+
+# loaded by the first request / first use, never at boot
+DEFERRED_MODULES = ("numpy", "requests", "sqlalchemy", "pymysql")
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, ",".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))
+"""
+
+
+def measure():
+    output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True).stdout
+    elapsed, _, loaded = output.strip().partition(" ")
+    return float(elapsed), [module for module in loaded.split(",") if module]
+
+
+def main(runs=7):
+    results = [measure() for _ in range(runs)]
+    median = statistics.median(elapsed for elapsed, _ in results)
+    loaded = sorted({module for _, modules in results for module in modules})
+
+    print(f"app import + create_app: median {median:.0f} ms over {runs} runs (budget {IMPORT_BUDGET_MS} ms)")
+    if loaded:
+        print(f"modules that should be deferred were imported at startup: {', '.join(loaded)}")
+    if median > IMPORT_BUDGET_MS or loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 7)
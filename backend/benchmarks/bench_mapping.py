@@ -0,0 +1,97 @@
+"""
+Mapping throughput of the compiled field maps against the ORM constructor path they replaced.
+
+The old handlers built every statement with one `data.get(...)` per field passed into the
+instrumented model constructor, and served it through a hand-written `to_dict()` reading every
+attribute back. `legacy_ingest` / `legacy_output` reproduce exactly that work from the field map
+metadata, so both sides map the same fields.
+
+usage (from the backend dir):
+    python -m benchmarks.bench_mapping [rows]
+"""
+import sys
+import time
+from datetime import date, datetime
+
+from mappers.field_map import to_date, to_datetime, to_float, to_int
+from models.balance_sheet_statement import BALANCE_SHEET_MAP
+from models.cash_flow_statement import CASH_FLOW_MAP
+from models.company import Company
+from models.income_statement import INCOME_STATEMENT_MAP
+
+
+def fake_payload(field_map, index):
+    """build an FMP-like payload with a plausible value for every mapped key"""
+    payload = {}
+    for position, field in enumerate(field_map.fields):
+        if field.coerce is to_date:
+            payload[field.key] = f"{2000 + index % 25}-09-28"
+        elif field.coerce is to_datetime:
+            payload[field.key] = f"{2000 + index % 25}-11-01 06:01:36"
+        elif field.coerce is to_int:
+            payload[field.key] = 1_000_000 * (index + position)
+        elif field.coerce is to_float:
+            payload[field.key] = (index + position) / 100
+        else:
+            payload[field.key] = f"S{index}"
+    return payload
+
+
+def legacy_ingest(field_map, data):
+    kwargs, company = {}, {}
+    for field in field_map.fields:
+        value = data[field.key] if field.required else data.get(field.key)
+        if field.company:
+            company[field.company] = value
+        else:
+            kwargs[field.column] = value
+    return field_map.model(company=Company(**company), **kwargs)
+
+
+def legacy_output(field_map, record):
+    result = {}
+    for column in field_map.output_columns:
+        value = getattr(record, column)
+        result[column] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return result
+
+
+def selected_row(field_map, data):
+    """the row `select()` returns for a payload: id, then every field including the company ones"""
+    values, company = field_map.to_record(data, 1), field_map.to_company(data)
+    return (1,) + tuple(company[field.company] if field.company else values[field.column] for field in field_map.fields)
+
+
+def rate(rows, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return rows / (time.perf_counter() - start)
+
+
+def main(rows=20000):
+    print(f"{'statement':<16}{'path':<10}{'legacy rows/s':>16}{'mapper rows/s':>16}{'speedup':>10}")
+    for name, field_map in (("income", INCOME_STATEMENT_MAP),
+                            ("balance sheet", BALANCE_SHEET_MAP),
+                            ("cash flow", CASH_FLOW_MAP)):
+        payloads = [fake_payload(field_map, index) for index in range(rows)]
+        records = [legacy_ingest(field_map, data) for data in payloads]
+        for record in records:
+            record.id = 1
+        selected = [selected_row(field_map, data) for data in payloads]
+
+        # statement rows take the company id resolved once per batch by CompanyHandler
+        to_row, to_json = field_map.to_row, field_map.to_json
+        results = (
+            ("ingest",
+             rate(rows, lambda: [legacy_ingest(field_map, data) for data in payloads]),
+             rate(rows, lambda: [to_row(data, 1) for data in payloads])),
+            ("output",
+             rate(rows, lambda: [legacy_output(field_map, record) for record in records]),
+             rate(rows, lambda: [to_json(row) for row in selected])),
+        )
+        for path, legacy, mapper in results:
+            print(f"{name:<16}{path:<10}{legacy:>16,.0f}{mapper:>16,.0f}{mapper / legacy:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
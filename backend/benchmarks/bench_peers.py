@@ -0,0 +1,46 @@
+"""
+Latency of the peer similarity query: top-k nearest neighbours over a synthetic universe of
+companies, for both metrics, plus the time to (re)build the matrix as a sync does.
+
+usage (from the backend dir):
+    python -m benchmarks.bench_peers [companies] [k]
+"""
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from services.peer_index import FEATURES, PeerMatrix
+
+QUERIES = 1000
+
+
+def fake_features(n, seed=7):
+    """lognormal sizes, normal ratios, 5% of the values missing"""
+    rng = np.random.default_rng(seed)
+    raw = rng.normal(0.1, 0.2, size=(n, len(FEATURES)))
+    raw[:, :2] = rng.normal(21, 2, size=(n, 2))
+    raw[rng.random(raw.shape) < 0.05] = np.nan
+    return [f"S{i:05d}" for i in range(n)], raw
+
+
+def main(n, k):
+    symbols, raw = fake_features(n)
+    start = time.perf_counter()
+    matrix = PeerMatrix(symbols, raw)
+    print(f"build {n} x {len(FEATURES)}: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    rng = np.random.default_rng(11)
+    for metric in ("cosine", "euclidean"):
+        samples = []
+        for row in rng.integers(0, n, QUERIES):
+            start = time.perf_counter()
+            matrix.nearest([symbols[row]], k=k, metric=metric)
+            samples.append((time.perf_counter() - start) * 1000)
+        p95 = statistics.quantiles(samples, n=20)[-1]
+        print(f"top-{k} {metric:<10} p50 {statistics.median(samples):.3f} ms   p95 {p95:.3f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,88 @@
+"""
+Read latency of the API's handlers per storage backend: the same handler calls against the
+read-only SQLite file and against MySQL, so the network hop the sqlite backend saves shows up
+directly in the per-call numbers.
+
+Backends that cannot be reached (no file, no network, no PASSWORD) are skipped.
+
+usage (from the backend dir):
+    python -m benchmarks.bench_storage [database url ...]
+default urls: the sqlite file at SQLITE_PATH and the MySQL primary at HOST
+"""
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import make_url, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from database import database_url, make_engine, sqlite_url
+from handlers.balance_sheet_handler import BalanceSheetHandler
+from handlers.cash_flow_handler import CashFlowHandler
+from handlers.income_handler import IncomeHandler
+from handlers.latest_fundamentals_handler import LatestFundamentalsHandler
+from models.company import Company
+from settings import HOST, SQLITE_PATH
+
+SYMBOLS = 50
+RUNS = 5
+
+
+def operations(session):
+    income, balance_sheet = IncomeHandler(session), BalanceSheetHandler(session)
+    cash_flow, latest = CashFlowHandler(session), LatestFundamentalsHandler(session)
+    return {
+        "income-statement": income.read,
+        "balance-sheet-statement": balance_sheet.read,
+        "cash-flow-statement": cash_flow.read,
+        "latest-fundamentals": latest.read,
+        "screen": lambda symbol: latest.screen(sort="revenue"),
+    }
+
+
+def measure(url):
+    """
+    :return: {operation: list of milliseconds per call}
+    """
+    engine = make_engine(url)
+    session = sessionmaker(bind=engine)()
+    try:
+        symbols = session.execute(select(Company.symbol).order_by(Company.id).limit(SYMBOLS)).scalars().all()
+        timings = {}
+        for name, call in operations(session).items():
+            samples = timings[name] = []
+            for _ in range(RUNS):
+                for symbol in symbols:
+                    start = time.perf_counter()
+                    call(symbol)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    session.rollback()
+        return timings
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def main(urls):
+    print(f"{'backend':<20}{'operation':<26}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for url in urls:
+        parsed = make_url(url)
+        backend = f"{parsed.get_backend_name()} {os.path.basename((parsed.database or '').split('?')[0])}"
+        try:
+            timings = measure(url)
+        except SQLAlchemyError as e:
+            print(f"{backend:<20}skipped, {str(e).splitlines()[0]}")
+            continue
+        for name, samples in timings.items():
+            if not samples:
+                print(f"{backend:<20}{name:<26}no companies stored")
+                continue
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+            print(f"{backend:<20}{name:<26}{len(samples):>8}{statistics.median(samples):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == '__main__':
+    default = ([sqlite_url(SQLITE_PATH)] if os.path.exists(SQLITE_PATH) else []) + [database_url(HOST)]
+    main(sys.argv[1:] or default)
@@ -0,0 +1,90 @@
+import hmac
+
+from flask import Blueprint, Response, jsonify, request
+
+from services.profiler import SamplingProfiler
+from settings import ADMIN_TOKEN
+
+# register blueprint
+admin_bp = Blueprint("admin", __name__)
+
+# profiler of this worker process, idle until /admin/profile starts it
+PROFILER = SamplingProfiler()
+
+MAX_PROFILED_REQUESTS = 1000
+MAX_PROFILE_SECONDS = 300
+
+
+@admin_bp.before_request
+def require_admin():
+    """
+    admin endpoints answer only requests with `Authorization: Bearer <ADMIN_TOKEN>`, and do not
+    exist when ADMIN_TOKEN is not set
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme != "Bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+
+
+@admin_bp.before_app_request
+def profile_request():
+    if request.blueprint != "admin":
+        PROFILER.enter()
+
+
+@admin_bp.teardown_app_request
+def end_profiled_request(exc):
+    PROFILER.exit()
+
+
+@admin_bp.route("/admin/slow-queries", methods=["GET"])
+def get_slow_queries():
+    """
+    statements of this worker process slower than SLOW_QUERY_MS
+
+    :return: threshold and a list of {at, duration_ms, database, statement, parameters, plan}, newest
+             first, in json format
+    """
+    import database
+    return jsonify({"threshold_ms": database.slow_queries.threshold_ms, "queries": database.slow_queries.entries()})
+
+
+@admin_bp.route("/admin/profile", methods=["POST"])
+def profile():
+    """
+    samples the stacks of the next requests served by this worker process and returns them once they
+    ended, e.g. `curl -X POST -H "Authorization: Bearer $ADMIN_TOKEN" ".../api/admin/profile?requests=200"
+    > out.folded; flamegraph.pl out.folded > out.svg`
+
+    :parameter:
+        requests: number of requests to profile, default 100
+        interval_ms: milliseconds between two samples, default 5
+        timeout: seconds to wait for the requests at most, default 60
+
+    :return: stacks in folded format, one "outer;...;inner count" line per stack, as text/plain. headers
+             X-Profile-Samples, and X-Profile-Unfinished / X-Profile-Untracked, the requests still running
+             or never started when the timeout ran out
+    """
+    count = request.args.get("requests", 100, type=int)
+    interval_ms = request.args.get("interval_ms", 5, type=float)
+    timeout = request.args.get("timeout", 60, type=float)
+    if not 1 <= count <= MAX_PROFILED_REQUESTS:
+        return jsonify({"error": f"requests must be between 1 and {MAX_PROFILED_REQUESTS}"}), 400
+    if not 1 <= interval_ms <= 1000:
+        return jsonify({"error": "interval_ms must be between 1 and 1000"}), 400
+    if not 0 < timeout <= MAX_PROFILE_SECONDS:
+        return jsonify({"error": f"timeout must be between 0 and {MAX_PROFILE_SECONDS}"}), 400
+
+    try:
+        PROFILER.start(count, interval=interval_ms / 1000)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    report = PROFILER.wait(timeout)
+
+    return Response(report["folded"], mimetype="text/plain", headers={
+        "X-Profile-Samples": str(report["samples"]),
+        "X-Profile-Unfinished": str(report["unfinished"]),
+        "X-Profile-Untracked": str(report["untracked"]),
+    })
@@ -0,0 +1,53 @@
+from functools import wraps
+
+from flask import jsonify, request
+
+from services.admission import CHEAP, EXPENSIVE, AdmissionController
+from settings import (ADMISSION_BURST, ADMISSION_EXPENSIVE_COST, ADMISSION_QUEUE_SECONDS, ADMISSION_RATE,
+                      DB_MAX_OVERFLOW, DB_POOL_SIZE)
+
+# admission control of this worker process, as many concurrent queries as its pool has connections
+ADMISSION = AdmissionController(rate=ADMISSION_RATE,
+                                burst=ADMISSION_BURST,
+                                limits={CHEAP: DB_POOL_SIZE + DB_MAX_OVERFLOW, EXPENSIVE: DB_POOL_SIZE},
+                                costs={CHEAP: 1, EXPENSIVE: ADMISSION_EXPENSIVE_COST},
+                                queue_seconds=ADMISSION_QUEUE_SECONDS)
+
+
+# endpoints answered from in-memory state whatever their arguments
+_IN_MEMORY = {"statement.get_rankings", "statement.get_peers"}
+
+
+def priority():
+    """
+    :return: CHEAP for lookups of one company and in-memory answers, EXPENSIVE for queries over all
+             companies, e.g. screens
+    """
+    return CHEAP if request.args.get("symbol") or request.endpoint in _IN_MEMORY else EXPENSIVE
+
+
+def limit_rate():
+    """
+    before request hook, refuses clients over their rate before any work is done
+    """
+    ADMISSION.check_rate(request.remote_addr, priority())
+
+
+def admitted(view):
+    """
+    run a view in a concurrent query slot. placed under @coalesced, so a burst of identical requests
+    takes one slot for its single execution
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with ADMISSION.slot(priority()):
+            return view(*args, **kwargs)
+
+    return wrapper
+
+
+def overloaded(e):
+    """
+    error handler of Overloaded, 429 or 503 with Retry-After
+    """
+    return jsonify({"error": str(e)}), e.status, {"Retry-After": str(e.retry_after)}
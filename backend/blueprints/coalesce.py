@@ -0,0 +1,29 @@
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from services.single_flight import SingleFlight
+
+# in-flight reads of this worker process, shared by its request threads
+READS = SingleFlight()
+
+
+def coalesced(view):
+    """
+    share one execution of a GET view between concurrent requests with the same endpoint and query
+    string, e.g. a burst of lookups of the same ticker after earnings. followers get a copy of the
+    leader's serialized response, body, status and every header it set, so its DB queries and JSON
+    encoding run once per burst
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+
+        def run():
+            response = make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, response.headers.to_wsgi_list()
+
+        body, status, headers = READS.do(key, run, name=request.endpoint)
+        return Response(body, status=status, headers=headers)
+
+    return wrapper
@@ -0,0 +1,26 @@
+import threading
+from functools import wraps
+
+from flask import current_app
+
+_lock = threading.Lock()
+
+
+def per_app(factory):
+    """
+    build the component of `factory` once per Flask app, on first use, and keep it in app.extensions.
+    unlike functools.cache, an app made by another create_app call never gets the handlers, and so
+    the sessions, of the previous one
+    """
+    @wraps(factory)
+    def wrapper():
+        components = current_app.extensions.setdefault("components", {})
+        component = components.get(factory)
+        if component is None:
+            with _lock:
+                component = components.get(factory)
+                if component is None:
+                    component = components[factory] = factory()
+        return component
+
+    return wrapper
@@ -0,0 +1,19 @@
+from flask import Blueprint, jsonify
+
+from blueprints.admission import ADMISSION
+from blueprints.coalesce import READS
+
+# register blueprint
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    runtime counters of this worker process
+
+    :return: single flight counters: requests, executions and coalesced requests, in total and per
+             endpoint, and admission control counters: running requests, admitted, rate limited and
+             shed requests per priority, in json format
+    """
+    return jsonify({"single_flight": READS.stats(), "admission": ADMISSION.stats()})
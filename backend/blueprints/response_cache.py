@@ -0,0 +1,61 @@
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, request
+
+from blueprints.components import per_app
+
+from settings import RESPONSE_CACHE_REFRESH_SECONDS, TRAFFIC_FLUSH_SECONDS
+
+
+@per_app
+def response_cache():
+    """
+    responses warmed after ingestion, loaded on a session of their own
+    """
+    import database
+    from services.response_cache import ResponseCache
+    return ResponseCache(database.create_read_session(), interval=RESPONSE_CACHE_REFRESH_SECONDS)
+
+
+@per_app
+def traffic_recorder():
+    """
+    request counts per symbol, written to the primary on a session of their own
+    """
+    import database
+    from services.traffic_recorder import TrafficRecorder
+    return TrafficRecorder(database.create_session(), interval=TRAFFIC_FLUSH_SECONDS)
+
+
+def cache_key():
+    """
+    :return: key of the current request in the response cache, path and query string with the
+             arguments sorted
+    """
+    return f"{request.path}?{urlencode(sorted(request.args.items(multi=True)))}"
+
+
+def cached(view):
+    """
+    serve a GET view from the response cache when its response was warmed for the current data
+    version. placed above @coalesced, so hits neither wait for nor take a query slot
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        body = response_cache().get(cache_key())
+        if body is not None:
+            return Response(body, content_type="application/json")
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def record_symbol(response):
+    """
+    after request hook, counts the successful requests of every symbol for the cache warmup
+    """
+    symbol = request.args.get("symbol")
+    if symbol and len(symbol) <= 10 and response.status_code == 200:
+        traffic_recorder().hit(symbol)
+    return response
@@ -1,29 +1,106 @@
-import os
+from flask import Blueprint, g, jsonify, request
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from handlers.balance_sheet_handler import BalanceSheetHandler
-from handlers.income_handler import IncomeHandler
-from handlers.cash_flow_handler import CashFlowHandler
-from settings import DATABASE_NAME, HOST
+from blueprints.admission import admitted, limit_rate, overloaded
+from blueprints.coalesce import coalesced
+from blueprints.components import per_app
+from blueprints.response_cache import cached, record_symbol
+from services.admission import Overloaded
+from settings import (PEERS_REFRESH_SECONDS, RANKING_REFRESH_SECONDS, STATEMENT_TIMEOUT_MS,
+                      STATS_REFRESH_SECONDS)
 
 # register blueprint
 statement_bp = Blueprint("statement", __name__)
 
-# create SQLAlchemy engine, session factory, and session
-engine = create_engine(f"mysql+pymysql://root:{os.getenv('PASSWORD')}@{HOST}/{DATABASE_NAME}")
-Session = sessionmaker(bind=engine)
-session = Session()
+# admission control: clients over their rate are refused first, then every query waits for a slot
+statement_bp.before_request(limit_rate)
+statement_bp.register_error_handler(Overloaded, overloaded)
+
+# symbols requested, for the cache warmup after ingestion
+statement_bp.after_request(record_symbol)
+
+
+# handlers are built on first use, once per app, so importing the app neither loads the DB stack nor connects
+@per_app
+def income_handler():
+    import database
+    from handlers.income_handler import IncomeHandler
+    return IncomeHandler(database.get_session(), database.get_read_session())
+
+
+@per_app
+def balance_sheet_handler():
+    import database
+    from handlers.balance_sheet_handler import BalanceSheetHandler
+    return BalanceSheetHandler(database.get_session(), database.get_read_session())
+
+
+@per_app
+def cash_flow_handler():
+    import database
+    from handlers.cash_flow_handler import CashFlowHandler
+    return CashFlowHandler(database.get_session(), database.get_read_session())
+
+
+@per_app
+def latest_fundamentals_handler():
+    import database
+    from handlers.latest_fundamentals_handler import LatestFundamentalsHandler
+    return LatestFundamentalsHandler(database.get_session(), database.get_read_session())
+
+
+@per_app
+def ranking_service():
+    """
+    in-memory rankings (numpy), on a session of their own since syncing ends its read transactions
+    """
+    import database
+    from services.ranking_service import RankingService
+    return RankingService(database.create_read_session(), interval=RANKING_REFRESH_SECONDS)
+
+
+@per_app
+def peer_index():
+    """
+    in-memory peer similarity index (numpy), on a session of its own like the rankings
+    """
+    import database
+    from services.peer_index import PeerIndex
+    return PeerIndex(database.create_read_session(), interval=PEERS_REFRESH_SECONDS)
+
+
+@per_app
+def metric_stats_service():
+    import database
+    from services.metric_stats import MetricStatsService
+    return MetricStatsService(database.get_read_session(), interval=STATS_REFRESH_SECONDS)
+
 
-# handlers for all types of statements
-income_handler = IncomeHandler(session)
-balance_sheet_handler = BalanceSheetHandler(session)
-cash_flow_handler = CashFlowHandler(session)
+@statement_bp.before_request
+def start_query_budget():
+    """
+    every SELECT of a request runs under the statement timeout from settings
+    """
+    from database import set_query_budget
+    g.query_budget = set_query_budget(STATEMENT_TIMEOUT_MS)
+
+
+@statement_bp.teardown_request
+def end_query_budget(exc):
+    """
+    lift the budget and end the read transaction, so the next request sees fresh data and may
+    be routed to another replica
+    """
+    from database import close_read_session, reset_query_budget
+    close_read_session()
+    token = g.pop("query_budget", None)
+    if token is not None:
+        reset_query_budget(token)
 
 
 @statement_bp.route("/income-statement", methods=["GET"])
+@cached
+@coalesced
+@admitted
 def get_income_statement():
     """
     fetches a list of income statements with pagination
@@ -37,11 +114,14 @@ def get_income_statement():
     symbol = request.args.get("symbol")         # company symbol
     page = int(request.args.get("page", 1))
     
-    records = income_handler.read(symbol=symbol, page=page)
+    records = income_handler().read(symbol=symbol, page=page)
     return jsonify(records)
 
 
 @statement_bp.route("/balance-sheet-statement", methods=["GET"])
+@cached
+@coalesced
+@admitted
 def get_balance_sheet_statement():
     """
     fetches a list of balance sheet statements with pagination
@@ -55,11 +135,14 @@ def get_balance_sheet_statement():
     symbol = request.args.get("symbol")
     page = int(request.args.get("page", 1))
     
-    records = balance_sheet_handler.read(symbol=symbol, page=page)
+    records = balance_sheet_handler().read(symbol=symbol, page=page)
     return jsonify(records)
 
 
 @statement_bp.route('cash-flow-statement', methods=['GET'])
+@cached
+@coalesced
+@admitted
 def get_cash_flow_statements():
     """
     fetches a list of cash flow statements with pagination
@@ -76,9 +159,149 @@ def get_cash_flow_statements():
     if not symbol:
         return jsonify({"error": "Symbol is required"}), 400
         
-    result = cash_flow_handler.read(symbol, page)
+    result = cash_flow_handler().read(symbol, page)
     
     if "error" in result:
         return jsonify(result), 500
         
-    return jsonify(result)
\ No newline at end of file
+    return jsonify(result)
+
+
+@statement_bp.route("/latest-fundamentals", methods=["GET"])
+@cached
+@coalesced
+@admitted
+def get_latest_fundamentals():
+    """
+    fetches the latest fiscal year snapshot, either of one company or a screen over all companies
+
+    :parameter:
+        symbol: company symbol, returns that company's snapshot only
+        sort: column to sort the screen by, default revenue
+        order: asc or desc, default desc
+        min_<column>, max_<column>: range filters on any numeric column, e.g. min_revenue=1000000000
+        page: page number, default 1
+
+    :return: the snapshot of one company, or a list of snapshots in json format
+    """
+    symbol = request.args.get("symbol")
+    if symbol:
+        result = latest_fundamentals_handler().read(symbol)
+    else:
+        try:
+            filters = {}
+            for key, value in request.args.items():
+                bound, _, column = key.partition("_")
+                if bound in ("min", "max") and column:
+                    low, high = filters.get(column, (None, None))
+                    filters[column] = (float(value), high) if bound == "min" else (low, float(value))
+
+            result = latest_fundamentals_handler().screen(filters=filters,
+                                                          sort=request.args.get("sort", "revenue"),
+                                                          order=request.args.get("order", "desc"),
+                                                          page=int(request.args.get("page", 1)))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    if "error" in result:
+        return jsonify(result), 500
+    return jsonify(result)
+
+
+@statement_bp.route("/rankings", methods=["GET"])
+@coalesced
+@admitted
+def get_rankings():
+    """
+    ranks a company on a metric against all companies or its peers, or lists the top companies
+
+    :parameter:
+        metric: metric name, e.g. gross_margin, fcf_margin, revenue
+        symbol: company symbol, omit to get the top companies instead
+        year: fiscal year, default the newest available
+        peers: comma separated symbols to rank against instead of the whole universe
+        top: number of companies listed when no symbol is given, default 10, at most 100
+        order: desc (highest first) or asc, for the top list, default desc
+
+    :return: rank, count and percentile of the company, or the top list, in json format
+    """
+    metric = request.args.get("metric")
+    symbol = request.args.get("symbol")
+    if not metric:
+        return jsonify({"error": "Metric is required"}), 400
+
+    try:
+        year = request.args.get("year", type=int)
+        rankings = ranking_service()
+        rankings.sync()
+        if symbol:
+            peers = [peer for peer in request.args.get("peers", "").split(",") if peer]
+            result = rankings.rank(metric, symbol, year=year, peers=peers or None)
+        else:
+            result = rankings.top(metric, year=year, n=request.args.get("top", 10, type=int),
+                                  ascending=request.args.get("order") == "asc")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    return jsonify(result)
+
+
+@statement_bp.route("/peers", methods=["GET"])
+@coalesced
+@admitted
+def get_peers():
+    """
+    companies most like a company in their latest fiscal year: size, margins, leverage and revenue growth
+
+    :parameter:
+        symbol: company symbol
+        k: number of peers, default 20, at most 100
+        metric: cosine (similarity, highest first) or euclidean (distance, lowest first), default cosine
+
+    :return: the company's features and a list of {symbol, score, features}, closest first, in json format
+    """
+    symbol = request.args.get("symbol")
+    if not symbol:
+        return jsonify({"error": "Symbol is required"}), 400
+
+    try:
+        result = peer_index().peers(symbol, k=request.args.get("k", 20, type=int),
+                                    metric=request.args.get("metric", "cosine"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    return jsonify(result)
+
+
+@statement_bp.route("/stats", methods=["GET"])
+@cached
+@coalesced
+@admitted
+def get_stats():
+    """
+    distribution of every numeric column of a statement table, to size the filter ranges of the UI
+
+    :parameter:
+        statement: income-statement, balance-sheet-statement or cash-flow-statement
+        symbol: company symbol, omit to summarize all companies
+        bins: number of histogram buckets per column, default 20
+
+    :return: row count, date range and min / max / mean / quantiles / histogram per column in json format
+    """
+    statement = request.args.get("statement")
+    if not statement:
+        return jsonify({"error": "Statement is required"}), 400
+
+    try:
+        result = metric_stats_service().stats(statement, symbol=request.args.get("symbol"),
+                                              bins=request.args.get("bins", 20, type=int))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    return jsonify(result)
@@ -0,0 +1,89 @@
+import json
+import threading
+
+from flask import Blueprint, Response, request
+
+from blueprints.admission import overloaded
+from blueprints.components import per_app
+from services.admission import Overloaded
+from settings import STREAM_BUFFER_SIZE, STREAM_KEEPALIVE_SECONDS, STREAM_MAX_CLIENTS, STREAM_POLL_SECONDS
+
+# register blueprint
+stream_bp = Blueprint("stream", __name__)
+stream_bp.register_error_handler(Overloaded, overloaded)
+
+# open streams of this worker process
+STREAMS = threading.BoundedSemaphore(STREAM_MAX_CLIENTS)
+
+
+@per_app
+def filing_feed():
+    """
+    filing events feed of this process, tailing the outbox on a session of its own
+    """
+    import database
+    from services.filing_feed import FilingFeed
+    return FilingFeed(database.create_read_session(), interval=STREAM_POLL_SECONDS, buffer_size=STREAM_BUFFER_SIZE)
+
+
+def _sse(event, data, id=None):
+    """one Server-Sent Event frame"""
+    head = f"id: {id}\n" if id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@stream_bp.route("/stream/filings", methods=["GET"])
+def stream_filings():
+    """
+    Server-Sent Events stream of statements stored new or changed by ingestion, as `filing` events
+    with {id, symbol, statement, date}. A `dropped` event tells a client that fell behind how many
+    events it missed, so it can refetch. Reconnecting clients (Last-Event-ID) get the events they missed.
+
+    every open stream holds a worker thread, run gunicorn with threads, e.g. --worker-class gthread.
+    past STREAM_MAX_CLIENTS open streams a worker answers 503
+
+    :parameter:
+        symbols: comma separated symbols to follow, default all
+        statements: comma separated statement types to follow, default all
+
+    :return: text/event-stream
+    """
+    symbols = {symbol for symbol in request.args.get("symbols", "").split(",") if symbol}
+    statements = {statement for statement in request.args.get("statements", "").split(",") if statement}
+    last_id = request.headers.get("Last-Event-ID", type=int)
+
+    feed = filing_feed()
+
+    def wanted(event):
+        return (not symbols or event["symbol"] in symbols) and (not statements or event["statement"] in statements)
+
+    def generate():
+        dropped = 0
+        # subscribed once the stream starts, a response the server never iterates leaves no subscription
+        with feed.subscribe() as subscription:
+            backlog = feed.replay(last_id) if last_id is not None else []
+            # replayed events may come again from the feed
+            replayed = {event["id"] for event in backlog}
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                if wanted(event):
+                    yield _sse("filing", event, id=event["id"])
+            while True:
+                events = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                for event in events:
+                    if event["id"] not in replayed and wanted(event):
+                        yield _sse("filing", event, id=event["id"])
+                if subscription.dropped > dropped:
+                    yield _sse("dropped", {"count": subscription.dropped - dropped})
+                    dropped = subscription.dropped
+                if not events:
+                    # comment line, keeps proxies from closing the idle connection
+                    yield ": keep-alive\n\n"
+
+    if not STREAMS.acquire(blocking=False):
+        raise Overloaded("Too many open streams, try again later", 503, STREAM_KEEPALIVE_SECONDS)
+    response = Response(generate(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    # called when the server closes the response, whether the stream ran or not
+    response.call_on_close(STREAMS.release)
+    return response
@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify, request
+
+from blueprints.components import per_app
+
+from settings import SYMBOL_INDEX_REFRESH_SECONDS
+
+# register blueprint
+symbols_bp = Blueprint("symbols", __name__)
+
+
+@per_app
+def symbol_search_service():
+    """
+    in-memory symbol index, built on first use on a session of its own
+    """
+    import database
+    from services.symbol_index import SymbolSearchService
+    return SymbolSearchService(database.create_read_session(), interval=SYMBOL_INDEX_REFRESH_SECONDS)
+
+
+@symbols_bp.route("/symbols/search", methods=["GET"])
+def search_symbols():
+    """
+    autocompletes symbols and company names, companies with stored statements first
+
+    :parameter:
+        q: symbol or company name prefix, case insensitive
+        limit: maximum number of results, default 10, clamped to 1..50
+
+    :return: a list of {symbol, name, has_data} in json format
+    """
+    query = request.args.get("q", "")
+    limit = max(1, min(request.args.get("limit", 10, type=int), 50))
+    if not query.strip():
+        return jsonify({"error": "Query is required"}), 400
+
+    service = symbol_search_service()
+    service.sync()
+    return jsonify({"data": service.search(query, limit), "message": "Symbols retrieved successfully"})
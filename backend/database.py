@@ -0,0 +1,322 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from services.slow_query_log import SlowQueryLog
+from settings import (DATABASE_NAME, DB_MAX_OVERFLOW, DB_POOL_SIZE, HOST, REPLICA_HOSTS, SLOW_QUERY_LOG_SIZE,
+                      SLOW_QUERY_MS, SQLITE_PATH, STORAGE_BACKEND)
+
+# MySQL errors of a query that ran out of budget, retrying those on another replica would not help
+_BUDGET_ERROR_CODES = {1317, 3024}     # query interrupted, max_execution_time exceeded
+
+# applied to every SQLite connection: read the file through a memory map instead of read() calls,
+# keep a 64MB page cache and temporary sort/group tables in memory
+SQLITE_PRAGMAS = ("PRAGMA mmap_size=268435456", "PRAGMA cache_size=-65536", "PRAGMA temp_store=MEMORY")
+
+# budget of the queries issued by the current request, None means unlimited
+_budget = ContextVar("query_budget", default=None)
+
+# statements over SLOW_QUERY_MS of every engine, with their plans
+slow_queries = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE)
+
+# engines and sessions of the app, created on first use by _connect()
+_lock = threading.Lock()
+_config = {"url": None, "replica_urls": None}
+_state = None
+
+
+def database_url(host, database=DATABASE_NAME):
+    return f"mysql+pymysql://root:{os.getenv('PASSWORD')}@{host}/{database}"
+
+
+def sqlite_url(path, readonly=True):
+    """
+    :param path: SQLite file
+    :param readonly: open the file read-only and immutable, as the sqlite storage backend serves it:
+                     no locks and no change detection, a new export is only read after a restart
+    :return: database url
+    """
+    if readonly:
+        return f"sqlite:///file:{os.path.abspath(path)}?mode=ro&immutable=1&uri=true"
+    return f"sqlite:///{path}"
+
+
+def storage_url(backend=STORAGE_BACKEND):
+    """
+    :param backend: "mysql" or "sqlite", default STORAGE_BACKEND from settings
+    :return: database url of the primary of the storage backend
+    """
+    if backend == "mysql":
+        return database_url(HOST)
+    if backend == "sqlite":
+        return sqlite_url(SQLITE_PATH)
+    raise ValueError(f"Unsupported storage backend: {backend}")
+
+
+def configure(url=None, replica_urls=None):
+    """
+    point the app at another database, e.g. a local MySQL or SQLite file. the sessions and engines of
+    the previous database are closed. defaults are the STORAGE_BACKEND, HOST and REPLICA_HOSTS from settings
+
+    :param url: database url of the primary
+    :param replica_urls: list of database urls of the read replicas
+    :return: None
+    """
+    global _state
+    with _lock:
+        if _state is not None:
+            _state["session"].remove()
+            _state["read_session"].remove()
+            for engine in [_state["engine"], *_state["router"].replicas]:
+                engine.dispose()
+        _config.update(url=url, replica_urls=replica_urls)
+        _state = None
+
+
+def _connect():
+    """
+    create the engines, session factories and the shared sessions once, on first use, so importing
+    the app never touches the database. the shared sessions are thread-local: request threads of one
+    worker use the same handlers but never the same Session
+    """
+    global _state
+    if _state is None:
+        with _lock:
+            if _state is None:
+                engine = make_engine(_config["url"] or storage_url())
+                replica_urls = _config["replica_urls"]
+                if replica_urls is None:
+                    serves_mysql = not _config["url"] and STORAGE_BACKEND == "mysql"
+                    replica_urls = [database_url(host) for host in REPLICA_HOSTS] if serves_mysql else []
+                router = ReplicaRouter(engine, [make_engine(url) for url in replica_urls])
+                Session = sessionmaker(bind=engine)
+                ReadSession = sessionmaker(class_=ReplicaSession, router=router)
+                _state = {
+                    "engine": engine,
+                    "router": router,
+                    "Session": Session,
+                    "ReadSession": ReadSession,
+                    "session": scoped_session(Session),
+                    "read_session": scoped_session(ReadSession),
+                }
+    return _state
+
+
+def get_engine():
+    """
+    :return: engine of the primary
+    """
+    return _connect()["engine"]
+
+
+def get_session():
+    """
+    :return: shared session bound to the primary, used for writes
+    """
+    return _connect()["session"]
+
+
+def get_read_session():
+    """
+    :return: shared session routed to the read replicas
+    """
+    return _connect()["read_session"]
+
+
+def create_session():
+    """
+    :return: a new session bound to the primary, for components writing in transactions of their own
+    """
+    return _connect()["Session"]()
+
+
+def create_read_session():
+    """
+    :return: a new session routed to the read replicas, for components managing their own transactions
+    """
+    return _connect()["ReadSession"]()
+
+
+def close_read_session():
+    """
+    end the shared read transaction of the current thread, if the read session exists at all
+    """
+    if _state is not None:
+        _state["read_session"].remove()
+
+
+def make_engine(url, **kwargs):
+    """
+    create an engine whose SELECTs honour the query budget of the current context and whose slow
+    statements go to `slow_queries`, SQLite connections also get SQLITE_PRAGMAS. the connection
+    pool is sized by DB_POOL_SIZE and DB_MAX_OVERFLOW, the API's admission control admits as many
+    concurrent queries
+
+    :param url: database url
+    :return: SQLAlchemy engine
+    """
+    if make_url(url).database not in (None, "", ":memory:"):
+        # in-memory SQLite uses a pool of one connection per thread, without overflow
+        kwargs.setdefault("pool_size", DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", DB_MAX_OVERFLOW)
+    engine = create_engine(url, pool_pre_ping=True, **kwargs)
+    event.listen(engine, "before_cursor_execute", _apply_budget, retval=True)
+    slow_queries.instrument(engine)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _tune_sqlite)
+    return engine
+
+
+def _tune_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+class QueryBudget:
+    """
+    limits applied to every SELECT issued while the budget is active
+
+    MySQL enforces the timeout through the MAX_EXECUTION_TIME optimizer hint, SQLite, the local
+    stand-in, through a progress handler. There is no row cap: MySQL can only cut a result short
+    (sql_select_limit), which would serve truncated pages as if they were complete, so API queries
+    bound their rows with LIMIT instead.
+
+    Attributes:
+        timeout_ms (int): statement timeout in milliseconds, None for no timeout
+    """
+
+    __slots__ = ("timeout_ms",)
+
+    def __init__(self, timeout_ms=None):
+        self.timeout_ms = timeout_ms
+
+    def mysql_hint(self):
+        return f"/*+ MAX_EXECUTION_TIME({int(self.timeout_ms)}) */ " if self.timeout_ms else ""
+
+
+@contextmanager
+def query_budget(timeout_ms=None):
+    """
+    run the block under a query budget, `query_budget()` lifts any budget set by an outer block
+
+    :param timeout_ms: statement timeout in milliseconds
+    """
+    token = set_query_budget(timeout_ms)
+    try:
+        yield
+    finally:
+        reset_query_budget(token)
+
+
+def set_query_budget(timeout_ms=None):
+    """
+    non context manager form of `query_budget`, for request hooks
+
+    :return: token for `reset_query_budget`
+    """
+    return _budget.set(QueryBudget(timeout_ms) if timeout_ms else None)
+
+
+def reset_query_budget(token):
+    _budget.reset(token)
+
+
+def _apply_budget(conn, cursor, statement, parameters, context, executemany):
+    budget = _budget.get()
+    dialect = conn.dialect.name
+
+    if dialect == "mysql":
+        if budget and statement.startswith("SELECT"):
+            statement = "SELECT " + budget.mysql_hint() + statement[len("SELECT "):]
+    elif dialect == "sqlite":
+        # local stand-in for MAX_EXECUTION_TIME, sqlite interrupts the statement once the handler returns True
+        raw = conn.connection.driver_connection
+        if budget and budget.timeout_ms:
+            deadline = time.monotonic() + budget.timeout_ms / 1000
+            raw.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+        else:
+            raw.set_progress_handler(None, 0)
+    return statement, parameters
+
+
+def is_budget_error(error):
+    """
+    :param error: OperationalError
+    :return: True if the query was stopped by its budget rather than by a failing server
+    """
+    args = getattr(error.orig, "args", ())
+    code = args[0] if args else None
+    return code in _BUDGET_ERROR_CODES or str(code) == "interrupted"
+
+
+class ReplicaRouter:
+    """
+    picks the engine serving reads: a random healthy replica, or the primary when none is left
+
+    a replica failing at the connection level is skipped for `cooldown` seconds
+
+    Attributes:
+        primary: engine of the primary, which takes every write
+        replicas: list of read replica engines
+    """
+
+    def __init__(self, primary, replicas, cooldown=30):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.__cooldown = cooldown
+        self.__down_until = {}
+
+    def pick(self):
+        now = time.monotonic()
+        healthy = [engine for engine in self.replicas if self.__down_until.get(engine, 0) <= now]
+        return random.choice(healthy) if healthy else self.primary
+
+    def mark_down(self, engine):
+        self.__down_until[engine] = time.monotonic() + self.__cooldown
+        print(f"Read replica {engine.url.host or engine.url.database} is unavailable, skipping it for {self.__cooldown}s")
+
+
+class ReplicaSession(Session):
+    """
+    read-only session routed to the read replicas.
+
+    one engine is pinned per transaction, so the count and page queries of a read see the same
+    replica. a replica failing at the connection level is marked down and the statement is retried
+    on the next healthy replica, falling back to the primary. statements stopped by their query
+    budget are never retried.
+    """
+
+    def __init__(self, router, **kwargs):
+        super().__init__(**kwargs)
+        self.__router = router
+        self.__pinned = None
+        event.listen(self, "after_transaction_end", self.__unpin)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.__pinned is None:
+            self.__pinned = self.__router.pick()
+        return self.__pinned
+
+    def execute(self, *args, **kwargs):
+        while True:
+            bind = self.get_bind()
+            try:
+                return super().execute(*args, **kwargs)
+            except OperationalError as e:
+                if bind is self.__router.primary or is_budget_error(e):
+                    raise
+                self.__router.mark_down(bind)
+                self.rollback()
+
+    def __unpin(self, session, transaction):
+        if transaction.parent is None:
+            self.__pinned = None
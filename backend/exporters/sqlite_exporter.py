@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+
+from sqlalchemy import create_engine, insert, select
+
+from models.balance_sheet_statement import BalanceSheetStatement
+from models.cached_response import CachedResponse
+from models.cash_flow_statement import CashFlowStatement
+from models.company import Company
+from models.data_version import DataVersion
+from models.filing_event import FilingEvent
+from models.income_statement import IncomeStatement
+from models.latest_fundamentals import LatestFundamentals
+
+# tables of the serving file, referenced tables first, with the warmed responses, valid as long as the
+# data they were computed from. filing events only matter to the ingesting deployment, the file gets
+# the empty table so the filing stream still works on it
+TABLES = (Company, IncomeStatement, BalanceSheetStatement, CashFlowStatement, LatestFundamentals, DataVersion,
+          CachedResponse)
+SCHEMA_ONLY = (FilingEvent,)
+
+
+class SQLiteExporter:
+    """
+    Builds the read-only SQLite file served by the sqlite storage backend from another database,
+    usually the MySQL primary.
+
+    Tables and indexes are created from the models, the same DDL the handlers are written against.
+
+    The file is written next to the target and swapped in with a single rename, so an instance never
+    reads a half written file. Instances open the file as immutable and keep reading the one they
+    opened, even after it was replaced, so restart them after every export to serve the new data.
+
+    Attributes:
+        __source: SQLAlchemy engine of the database exported
+        __chunk_size: rows read and inserted per batch
+    """
+
+    def __init__(self, source, chunk_size=5000):
+        self.__source = source
+        self.__chunk_size = chunk_size
+
+    def export(self, path):
+        """
+        export every table into a new SQLite file at `path`, replacing the existing one
+
+        :param path: SQLite file to write
+        :return: {table name: rows exported}
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        building = path + ".building"
+        for leftover in (building, building + "-journal"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+        target = create_engine(f"sqlite:///{building}")
+        counts = {}
+        try:
+            with target.connect() as connection:
+                # nothing to recover from while building, the file is thrown away on failure
+                connection.exec_driver_sql("PRAGMA journal_mode=OFF")
+                connection.exec_driver_sql("PRAGMA synchronous=OFF")
+                for model in TABLES + SCHEMA_ONLY:
+                    model.__table__.create(connection)
+                for model in TABLES:
+                    counts[model.__tablename__] = self.__copy(model.__table__, connection)
+                connection.commit()
+
+                # planner statistics for the indexes, then compact the file. it is served immutable, so
+                # it must not need a -wal or -shm file next to it, which the rename would not move along
+                connection.exec_driver_sql("ANALYZE")
+                connection.commit()
+                connection.exec_driver_sql("VACUUM")
+                connection.exec_driver_sql("PRAGMA journal_mode=DELETE")
+        finally:
+            target.dispose()
+
+        os.replace(building, path)
+        return counts
+
+    def __copy(self, table, connection):
+        count = 0
+        stmt = select(*table.columns).order_by(*table.primary_key.columns)
+        with self.__source.connect() as source:
+            result = source.execution_options(yield_per=self.__chunk_size).execute(stmt)
+            for rows in result.partitions():
+                connection.execute(insert(table), [row._asdict() for row in rows])
+                count += len(rows)
+        return count
+
+
+if __name__ == '__main__':
+    from database import database_url, make_engine
+    from settings import HOST, SQLITE_PATH
+
+    # usage (from the backend dir): python -m exporters.sqlite_exporter [path] [source url]
+    path = sys.argv[1] if len(sys.argv) > 1 else SQLITE_PATH
+    source = make_engine(sys.argv[2] if len(sys.argv) > 2 else database_url(HOST))
+
+    start = time.perf_counter()
+    for table, count in SQLiteExporter(source).export(path).items():
+        print(f"Exported {count} rows of {table}")
+    print(f"Wrote {path} ({os.path.getsize(path) / 2 ** 20:.1f} MB) in {time.perf_counter() - start:.1f}s")
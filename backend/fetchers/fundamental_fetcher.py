@@ -1,14 +1,7 @@
-import requests
 import os
 import time
 
-
-from handlers.cash_flow_handler import CashFlowHandler
-from handlers.balance_sheet_handler import BalanceSheetHandler
-from handlers.income_handler import IncomeHandler
 from settings import *
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
 
 class FundamentalFetcher:
@@ -36,14 +29,31 @@ class FundamentalFetcher:
 
         :return: a list of symbols
         """
+        import requests     # deferred, importing the fetcher stays cheap for the API workers
+
         try:
-            res = requests.get(self.__symbol_url)
+            res = requests.get(f"{self.__symbol_url}?apikey={self.__api_key}")
             if res and res.status_code == 200:
                 data = res.json()
                 return data
         except Exception as e:
             print(e)
 
+    def fetch_company_list(self):
+        """
+        Fetches symbols with their company names from the FMP API.
+
+        :return: a list of dicts like {"symbol": "AAPL", "name": "Apple Inc.", ...}
+        """
+        import requests
+
+        try:
+            res = requests.get(f"{self.__base_url}/stock/list?apikey={self.__api_key}")
+            if res and res.status_code == 200:
+                return res.json()
+        except Exception as e:
+            print(e)
+
     def fetch_statement(self, company_symbol, statement_type="income-statement", period="annual"):
         """
         Fetches a list of statements for given company
@@ -53,6 +63,8 @@ class FundamentalFetcher:
         :param period: period of the statement, ["annual", "quarter"]
         :return: a list of statements for given company
         """
+        import requests
+
         url = f"{self.__base_url}/{statement_type}/{company_symbol}?period={period}&apikey={self.__api_key}"
         try:
             res = requests.get(url)
@@ -66,7 +78,16 @@ class FundamentalFetcher:
 
 
 if __name__ == '__main__':
-    engine = create_engine(f"mysql+pymysql://root:{os.getenv('PASSWORD')}@{HOST}/{DATABASE_NAME}")
+    from sqlalchemy.orm import sessionmaker
+
+    from database import database_url, make_engine
+    from handlers.balance_sheet_handler import BalanceSheetHandler
+    from handlers.cash_flow_handler import CashFlowHandler
+    from handlers.filing_event_handler import FilingEventHandler
+    from handlers.income_handler import IncomeHandler
+
+    # ingestion always writes to the primary
+    engine = make_engine(database_url(HOST))
     Session = sessionmaker(bind=engine)
     session = Session()
     # handlers for db operations
@@ -104,16 +125,29 @@ if __name__ == '__main__':
                 continue
                 
             try:
-                for item in data:
-                    result = handler.create(item)
+                # one batched upsert per symbol instead of a commit per statement
+                result = handler.create_many(data)
 
-                    if "error" in result:
-                        print(f"Error creating record for {symbol}:", result["error"])
-                    else:
-                        print(f"Successfully created record for {symbol}")
+                if "error" in result:
+                    print(f"Error creating records for {symbol}:", result["error"])
+                else:
+                    print(f"Successfully stored {result['count']} records for {symbol}")
                 session.commit()
             except Exception as e:
                 print(f"Error processing {symbol}|{statement_type}:", str(e))
                 session.rollback()
             print(f"Finished processing {symbol}|{statement_type}")
             time.sleep(1)
+
+    # filing events only need to outlive the web app's reconnect window
+    print("Pruned filing events:", FilingEventHandler(session).prune(FILING_EVENT_RETENTION_DAYS))
+    session.commit()
+
+    # precompute the first reads after the refresh, rendered by the API reading from the primary
+    from app import create_app
+    from services.cache_warmer import CacheWarmer
+
+    start = time.time()
+    warmer = CacheWarmer(create_app(database_url(HOST), replica_urls=[]), session, workers=WARMUP_WORKERS,
+                         top=WARMUP_TOP_SYMBOLS, traffic_days=WARMUP_TRAFFIC_DAYS, screen_sorts=WARMUP_SCREEN_SORTS)
+    print(f"Warmed {warmer.run()} responses in {time.time() - start:.1f}s")
@@ -1,5 +1,10 @@
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
-from models.balance_sheet_statement import BalanceSheetStatement
+from handlers.company_handler import CompanyHandler
+from handlers.filing_event_handler import FilingEventHandler
+from handlers.latest_fundamentals_handler import LatestFundamentalsHandler
+from models.balance_sheet_statement import BalanceSheetStatement, BALANCE_SHEET_MAP
+from models.company import Company
 
 
 class BalanceSheetHandler:
@@ -9,9 +14,17 @@ class BalanceSheetHandler:
     Attributes:
 
     __session: session for MySQL db connection
+    __read_session: session for reads, usually routed to the read replicas, default __session
     """
-    def __init__(self, session):
+    # statement type, as in the API routes and filing events
+    STATEMENT = "balance-sheet-statement"
+
+    def __init__(self, session, read_session=None):
         self.__session = session
+        self.__read_session = read_session or session
+        self.__latest = LatestFundamentalsHandler(session)
+        self.__companies = CompanyHandler(session)
+        self.__events = FilingEventHandler(session)
 
     def create(self, data):
         """
@@ -21,66 +34,41 @@ class BalanceSheetHandler:
         :return: dict with the message and statement.id
         """
         try:
-            balance_sheet = BalanceSheetStatement(
-                symbol=data["symbol"],
-                date=data["date"],
-                reportedCurrency=data.get("reportedCurrency"),
-                cik=data.get("cik"),
-                fillingDate=data.get("fillingDate"),
-                acceptedDate=data.get("acceptedDate"),
-                calendarYear=data.get("calendarYear"),
-                period=data.get("period"),
-                totalAssets=data["totalAssets"],
-                totalLiabilities=data["totalLiabilities"],
-                totalEquity=data.get("totalEquity"),
-                totalStockholdersEquity=data.get("totalStockholdersEquity"),
-                totalLiabilitiesAndStockholdersEquity=data.get("totalLiabilitiesAndStockholdersEquity"),
-                totalLiabilitiesAndTotalEquity=data.get("totalLiabilitiesAndTotalEquity"),
-                cashAndCashEquivalents=data.get("cashAndCashEquivalents"),
-                shortTermInvestments=data.get("shortTermInvestments"),
-                cashAndShortTermInvestments=data.get("cashAndShortTermInvestments"),
-                netReceivables=data.get("netReceivables"),
-                inventory=data.get("inventory"),
-                otherCurrentAssets=data.get("otherCurrentAssets"),
-                totalCurrentAssets=data.get("totalCurrentAssets"),
-                propertyPlantEquipmentNet=data.get("propertyPlantEquipmentNet"),
-                goodwill=data.get("goodwill"),
-                intangibleAssets=data.get("intangibleAssets"),
-                goodwillAndIntangibleAssets=data.get("goodwillAndIntangibleAssets"),
-                longTermInvestments=data.get("longTermInvestments"),
-                taxAssets=data.get("taxAssets"),
-                otherNonCurrentAssets=data.get("otherNonCurrentAssets"),
-                totalNonCurrentAssets=data.get("totalNonCurrentAssets"),
-                otherAssets=data.get("otherAssets"),
-                accountPayables=data.get("accountPayables"),
-                shortTermDebt=data.get("shortTermDebt"),
-                taxPayables=data.get("taxPayables"),
-                deferredRevenue=data.get("deferredRevenue"),
-                otherCurrentLiabilities=data.get("otherCurrentLiabilities"),
-                totalCurrentLiabilities=data.get("totalCurrentLiabilities"),
-                longTermDebt=data.get("longTermDebt"),
-                deferredRevenueNonCurrent=data.get("deferredRevenueNonCurrent"),
-                deferredTaxLiabilitiesNonCurrent=data.get("deferredTaxLiabilitiesNonCurrent"),
-                otherNonCurrentLiabilities=data.get("otherNonCurrentLiabilities"),
-                totalNonCurrentLiabilities=data.get("totalNonCurrentLiabilities"),
-                otherLiabilities=data.get("otherLiabilities"),
-                capitalLeaseObligations=data.get("capitalLeaseObligations"),
-                preferredStock=data.get("preferredStock"),
-                commonStock=data.get("commonStock"),
-                retainedEarnings=data.get("retainedEarnings"),
-                accumulatedOtherComprehensiveIncomeLoss=data.get("accumulatedOtherComprehensiveIncomeLoss"),
-                otherTotalStockholdersEquity=data.get("otherTotalStockholdersEquity"),
-                minorityInterest=data.get("minorityInterest"),
-                totalInvestments=data.get("totalInvestments"),
-                totalDebt=data.get("totalDebt"),
-                netDebt=data.get("netDebt"),
-                link=data.get("link"),
-                finalLink=data.get("finalLink")
-            )
-            self.__session.add(balance_sheet)
+            company_id = self.__companies.resolve([BALANCE_SHEET_MAP.to_company(data)])[data["symbol"]]
+            record = BALANCE_SHEET_MAP.to_record(data, company_id)
+            result = self.__session.execute(insert(BalanceSheetStatement).values(record))
+            self.__events.record(self.STATEMENT, [(company_id, record["date"])])
+            self.__latest.refresh(BalanceSheetStatement, [data["symbol"]])
             self.__session.commit()
-            return {"message": "Record created successfully", "id": balance_sheet.id}
+            return {"message": "Record created successfully", "id": result.inserted_primary_key[0]}
+
+        except SQLAlchemyError as e:
+            self.__session.rollback()
+            return {"error": str(e)}
 
+    def create_many(self, items):
+        """
+        upsert a batch of balance sheet statements in a single executemany, rows whose (symbol, date)
+        already exists are updated. rows identical to the stored statement are skipped, the others
+        are recorded as filing events. the caller commits.
+
+        :param items: list of dict like statements we fetched from FMP API
+        :return: dict with the message and the number of new or changed rows written
+        """
+        if not items:
+            return {"message": "No records to upsert", "count": 0}
+        try:
+            connection = self.__session.connection()
+            companies = self.__companies.resolve(BALANCE_SHEET_MAP.to_company(item) for item in items)
+            rows = [BALANCE_SHEET_MAP.to_row(item, companies[item["symbol"]]) for item in items]
+            rows = self.__events.changed(BALANCE_SHEET_MAP, rows)
+            if rows:
+                connection.exec_driver_sql(BALANCE_SHEET_MAP.insert_sql(connection.dialect), rows)
+                date = BALANCE_SHEET_MAP.columns.index("date")
+                self.__events.record(self.STATEMENT, [(row[0], row[date]) for row in rows])
+                symbols = {company_id: symbol for symbol, company_id in companies.items()}
+                self.__latest.refresh(BalanceSheetStatement, {symbols[row[0]] for row in rows})
+            return {"message": "Records upserted successfully", "count": len(rows)}
         except SQLAlchemyError as e:
             self.__session.rollback()
             return {"error": str(e)}
@@ -95,16 +83,16 @@ class BalanceSheetHandler:
         :return: dict with the statements list, page info and message
         """
         try:
-            total = self.__session.query(BalanceSheetStatement.id).filter(
-                BalanceSheetStatement.symbol == symbol).count()
-            records = (self.__session.query(BalanceSheetStatement)
-                       .filter(BalanceSheetStatement.symbol == symbol)
-                       .order_by(BalanceSheetStatement.date.desc())
-                       .offset((page - 1) * offset)
-                       .limit(offset)
-                       .all())
+            total = self.__read_session.query(BalanceSheetStatement.id).join(BalanceSheetStatement.company).filter(
+                Company.symbol == symbol).count()
+            rows = self.__read_session.execute(BALANCE_SHEET_MAP.select()
+                                          .where(Company.symbol == symbol)
+                                          .order_by(BalanceSheetStatement.date.desc())
+                                          .offset((page - 1) * offset)
+                                          .limit(offset)).all()
+            to_json = BALANCE_SHEET_MAP.to_json
             return {
-                "data": [record.to_dict() for record in records],
+                "data": [to_json(row) for row in rows],
                 "pagination": {
                     "total": total,
                     "page": page,
@@ -129,8 +117,17 @@ class BalanceSheetHandler:
             if not record:
                 return {"error": "Record not found"}
 
+            symbols = {record.symbol}
             for k, v in data.items():
-                setattr(record, k, v)
+                if k == "symbol":
+                    # moves the statement to another company rather than renaming its company
+                    record.company_id = self.__companies.resolve([{"symbol": v}])[v]
+                    symbols.add(v)
+                else:
+                    setattr(record, k, v)
+            self.__session.flush()
+            self.__events.record(self.STATEMENT, [(record.company_id, record.date)])
+            self.__latest.refresh(BalanceSheetStatement, symbols)
 
             self.__session.commit()
             return {"message": "Record updated successfully"}
@@ -151,6 +148,7 @@ class BalanceSheetHandler:
                 return {"error": "Record not found"}
 
             self.__session.delete(record)
+            self.__latest.refresh(BalanceSheetStatement, [record.symbol])
             self.__session.commit()
             return {"message": "Record deleted successfully"}
         except SQLAlchemyError as e:
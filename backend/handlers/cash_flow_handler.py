@@ -1,5 +1,10 @@
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
-from models.cash_flow_statement import CashFlowStatement
+from handlers.company_handler import CompanyHandler
+from handlers.filing_event_handler import FilingEventHandler
+from handlers.latest_fundamentals_handler import LatestFundamentalsHandler
+from models.cash_flow_statement import CashFlowStatement, CASH_FLOW_MAP
+from models.company import Company
 
 
 class CashFlowHandler:
@@ -8,10 +13,18 @@ class CashFlowHandler:
 
     Attributes:
         __session: SQLAlchemy session for MySQL database connection
+        __read_session: session serving reads, usually routed to the read replicas, default __session
     """
 
-    def __init__(self, session):
+    # statement type, as in the API routes and filing events
+    STATEMENT = "cash-flow-statement"
+
+    def __init__(self, session, read_session=None):
         self.__session = session
+        self.__read_session = read_session or session
+        self.__latest = LatestFundamentalsHandler(session)
+        self.__companies = CompanyHandler(session)
+        self.__events = FilingEventHandler(session)
 
     def create(self, data):
         """
@@ -24,51 +37,44 @@ class CashFlowHandler:
             dict: Message indicating success/failure and the record ID if successful
         """
         try:
-            cash_flow = CashFlowStatement(
-                symbol=data["symbol"],
-                date=data["date"],
-                reported_currency=data.get("reportedCurrency"),
-                cik=data.get("cik"),
-                filling_date=data.get("fillingDate"),
-                accepted_date=data.get("acceptedDate"),
-                calendar_year=data.get("calendarYear"),
-                period=data.get("period"),
-                net_income=data.get("netIncome"),
-                depreciation_and_amortization=data.get("depreciationAndAmortization"),
-                deferred_income_tax=data.get("deferredIncomeTax"),
-                stock_based_compensation=data.get("stockBasedCompensation"),
-                change_in_working_capital=data.get("changeInWorkingCapital"),
-                accounts_receivables=data.get("accountsReceivables"),
-                inventory=data.get("inventory"),
-                accounts_payables=data.get("accountsPayables"),
-                other_working_capital=data.get("otherWorkingCapital"),
-                other_non_cash_items=data.get("otherNonCashItems"),
-                net_cash_provided_by_operating_activities=data.get("netCashProvidedByOperatingActivities"),
-                investments_in_property_plant_and_equipment=data.get("investmentsInPropertyPlantAndEquipment"),
-                acquisitions_net=data.get("acquisitionsNet"),
-                purchases_of_investments=data.get("purchasesOfInvestments"),
-                sales_maturities_of_investments=data.get("salesMaturitiesOfInvestments"),
-                other_investing_activities=data.get("otherInvestingActivities"),
-                net_cash_used_for_investing_activities=data.get("netCashUsedForInvestingActivities"),
-                debt_repayment=data.get("debtRepayment"),
-                common_stock_issued=data.get("commonStockIssued"),
-                common_stock_repurchased=data.get("commonStockRepurchased"),
-                dividends_paid=data.get("dividendsPaid"),
-                other_financing_activities=data.get("otherFinancingActivities"),
-                net_cash_used_provided_by_financing_activities=data.get("netCashUsedProvidedByFinancingActivities"),
-                free_cash_flow=data.get("freeCashFlow"),
-                net_change_in_cash=data.get("netChangeInCash"),
-                cash_at_end_of_period=data.get("cashAtEndOfPeriod"),
-                cash_at_beginning_of_period=data.get("cashAtBeginningOfPeriod"),
-                operating_cash_flow=data.get("operatingCashFlow"),
-                capital_expenditure=data.get("capitalExpenditure"),
-                link=data.get("link"),
-                final_link=data.get("finalLink")
-            )
-            self.__session.add(cash_flow)
+            company_id = self.__companies.resolve([CASH_FLOW_MAP.to_company(data)])[data["symbol"]]
+            record = CASH_FLOW_MAP.to_record(data, company_id)
+            result = self.__session.execute(insert(CashFlowStatement).values(record))
+            self.__events.record(self.STATEMENT, [(company_id, record["date"])])
+            self.__latest.refresh(CashFlowStatement, [data["symbol"]])
             self.__session.commit()
-            return {"message": "Record created successfully", "id": cash_flow.id}
+            return {"message": "Record created successfully", "id": result.inserted_primary_key[0]}
+
+        except SQLAlchemyError as e:
+            self.__session.rollback()
+            return {"error": str(e)}
+
+    def create_many(self, items):
+        """
+        Upsert a batch of cash flow statements from the FMP API in a single executemany, updating rows
+        whose (symbol, date) already exists. Rows identical to the stored statement are skipped, the
+        others are recorded as filing events. The caller commits.
+
+        Args:
+            items (list): List of cash flow statement dicts from FMP API
 
+        Returns:
+            dict: Message indicating success/failure and the number of new or changed rows written
+        """
+        if not items:
+            return {"message": "No records to upsert", "count": 0}
+        try:
+            connection = self.__session.connection()
+            companies = self.__companies.resolve(CASH_FLOW_MAP.to_company(item) for item in items)
+            rows = [CASH_FLOW_MAP.to_row(item, companies[item["symbol"]]) for item in items]
+            rows = self.__events.changed(CASH_FLOW_MAP, rows)
+            if rows:
+                connection.exec_driver_sql(CASH_FLOW_MAP.insert_sql(connection.dialect), rows)
+                date = CASH_FLOW_MAP.columns.index("date")
+                self.__events.record(self.STATEMENT, [(row[0], row[date]) for row in rows])
+                symbols = {company_id: symbol for symbol, company_id in companies.items()}
+                self.__latest.refresh(CashFlowStatement, {symbols[row[0]] for row in rows})
+            return {"message": "Records upserted successfully", "count": len(rows)}
         except SQLAlchemyError as e:
             self.__session.rollback()
             return {"error": str(e)}
@@ -86,15 +92,16 @@ class CashFlowHandler:
             dict: Dictionary containing list of statements, pagination info and status message
         """
         try:
-            total = self.__session.query(CashFlowStatement.id).filter(CashFlowStatement.symbol == symbol).count()
-            records = (self.__session.query(CashFlowStatement)
-                       .filter(CashFlowStatement.symbol == symbol)
-                       .order_by(CashFlowStatement.date.desc())
-                       .offset((page - 1) * offset)
-                       .limit(offset)
-                       .all())
+            total = self.__read_session.query(CashFlowStatement.id).join(CashFlowStatement.company).filter(
+                Company.symbol == symbol).count()
+            rows = self.__read_session.execute(CASH_FLOW_MAP.select()
+                                          .where(Company.symbol == symbol)
+                                          .order_by(CashFlowStatement.date.desc())
+                                          .offset((page - 1) * offset)
+                                          .limit(offset)).all()
+            to_json = CASH_FLOW_MAP.to_json
             return {
-                "data": [record.to_dict() for record in records],
+                "data": [to_json(row) for row in rows],
                 "pagination": {
                     "total": total,
                     "page": page,
@@ -120,8 +127,17 @@ class CashFlowHandler:
         try:
             record = self.__session.query(CashFlowStatement).filter(CashFlowStatement.id == id).first()
             if record:
+                symbols = {record.symbol}
                 for key, value in data.items():
-                    setattr(record, key, value)
+                    if key == "symbol":
+                        # moves the statement to another company rather than renaming its company
+                        record.company_id = self.__companies.resolve([{"symbol": value}])[value]
+                        symbols.add(value)
+                    else:
+                        setattr(record, key, value)
+                self.__session.flush()
+                self.__events.record(self.STATEMENT, [(record.company_id, record.date)])
+                self.__latest.refresh(CashFlowStatement, symbols)
                 self.__session.commit()
                 return {"message": "Record updated successfully", "id": id}
             return {"error": "Record not found"}
@@ -143,6 +159,7 @@ class CashFlowHandler:
             record = self.__session.query(CashFlowStatement).filter(CashFlowStatement.id == id).first()
             if record:
                 self.__session.delete(record)
+                self.__latest.refresh(CashFlowStatement, [record.symbol])
                 self.__session.commit()
                 return {"message": "Record deleted successfully", "id": id}
             return {"error": "Record not found"}
@@ -0,0 +1,69 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from handlers.upsert import upsert
+from models.company import Company
+
+# date of the statements given without one, older than any dated statement
+_OLDEST = date.min
+
+
+class CompanyHandler:
+    """
+    MySQL operations on the companies dimension, resolving symbols to the integer keys the statement
+    tables are stored under.
+
+    Attributes:
+        __session: SQLAlchemy session for MySQL database connection
+    """
+
+    ATTRIBUTES = ("cik",)
+
+    def __init__(self, session):
+        self.__session = session
+
+    def resolve(self, companies):
+        """
+        Get the ids of the given companies, inserting the unknown ones and filling in attributes
+        that changed. Attributes missing from the input never overwrite stored values, and of several
+        statements of one company the newest (by date) wins, whatever the order of the batch.
+        Runs inside the caller's transaction, the caller commits.
+
+        Args:
+            companies (iterable): Dicts with a symbol, optionally cik and the date of the statement
+
+        Returns:
+            dict: {symbol: company id}
+        """
+        incoming, dates = {}, {}
+        for company in companies:
+            symbol, filed = company["symbol"], company.get("date") or _OLDEST
+            merged = incoming.setdefault(symbol, dict.fromkeys(self.ATTRIBUTES))
+            for key in self.ATTRIBUTES:
+                value = company.get(key)
+                if value is not None and (merged[key] is None or filed >= dates[symbol, key]):
+                    merged[key], dates[symbol, key] = value, filed
+        if not incoming:
+            return {}
+
+        stored = {row.symbol: row for row in self.__session.execute(
+            select(Company.id, Company.symbol, *[Company.__table__.c[key] for key in self.ATTRIBUTES])
+            .where(Company.symbol.in_(incoming)))}
+
+        rows = []
+        for symbol, attributes in incoming.items():
+            row = stored.get(symbol)
+            if row is not None:
+                attributes = {key: value if value is not None else getattr(row, key) for key, value in attributes.items()}
+                if all(attributes[key] == getattr(row, key) for key in self.ATTRIBUTES):
+                    continue
+            rows.append(dict(attributes, symbol=symbol))
+        upsert(self.__session, Company.__table__, rows, key_columns=("symbol",), update_columns=self.ATTRIBUTES)
+
+        ids = {symbol: row.id for symbol, row in stored.items()}
+        missing = set(incoming) - set(ids)
+        if missing:
+            ids.update(self.__session.execute(select(Company.symbol, Company.id)
+                                              .where(Company.symbol.in_(missing))).all())
+        return ids
@@ -0,0 +1,116 @@
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+
+from models.company import Company
+from models.filing_event import FilingEvent
+
+
+def _same(stored, new):
+    """compare a stored value with a freshly coerced one"""
+    if isinstance(stored, float) and isinstance(new, (int, float)):
+        # FLOAT columns are single precision in MySQL, 6.11 reads back as 6.110000133514404
+        return math.isclose(stored, new, rel_tol=1e-6, abs_tol=1e-9)
+    if isinstance(stored, datetime) and not isinstance(new, datetime):
+        # DATETIME columns mapped as Date
+        return stored.date() == new
+    return stored == new
+
+
+class FilingEventHandler:
+    """
+    MySQL operations on the filing events outbox: detecting which statements of a batch are new or
+    changed, recording them, and reading them back for the filing stream.
+
+    Attributes:
+        __session: SQLAlchemy session for MySQL database connection
+    """
+
+    def __init__(self, session):
+        self.__session = session
+
+    def changed(self, field_map, rows):
+        """
+        Keep the rows of a batch that are not stored yet or differ from the stored statement.
+
+        Args:
+            field_map: FieldMap of the statement table, rows are its `to_row(data, company_id)` tuples
+            rows (list): Rows to be upserted
+
+        Returns:
+            list: The new or changed rows, in input order
+        """
+        if not rows:
+            return []
+        table = field_map.table
+        date = field_map.columns.index("date")
+        stmt = (select(*[table.c[column] for column in field_map.columns])
+                .where(table.c.company_id.in_({row[0] for row in rows}),
+                       table.c.date.in_({row[date] for row in rows})))
+        stored = {(row[0], row[date]): row for row in self.__session.execute(stmt)}
+
+        changed = []
+        for row in rows:
+            old = stored.get((row[0], row[date]))
+            if old is None or not all(_same(a, b) for a, b in zip(old, row)):
+                changed.append(row)
+        return changed
+
+    def record(self, statement, keys):
+        """
+        Record the given statements as stored. Runs inside the caller's transaction, the caller commits.
+
+        Args:
+            statement (str): Statement type, e.g. income-statement
+            keys (iterable): (company_id, date) pairs of the stored statements
+
+        Returns:
+            int: Number of events recorded
+        """
+        now = datetime.utcnow()
+        events = [{"company_id": company_id, "statement": statement, "date": date, "created_at": now}
+                  for company_id, date in keys]
+        if events:
+            self.__session.execute(insert(FilingEvent), events)
+        return len(events)
+
+    def latest_id(self):
+        """
+        Returns:
+            int: Id of the newest event, 0 when there is none
+        """
+        return self.__session.execute(select(func.max(FilingEvent.id))).scalar() or 0
+
+    def since(self, after_id, limit=500):
+        """
+        Events recorded after the given one, oldest first.
+
+        Args:
+            after_id (int): Id of the last event already seen
+            limit (int): Maximum number of events
+
+        Returns:
+            list: Dicts with id, symbol, statement and date (ISO format)
+        """
+        rows = self.__session.execute(
+            select(FilingEvent.id, Company.symbol, FilingEvent.statement, FilingEvent.date)
+            .join(Company, Company.id == FilingEvent.company_id)
+            .where(FilingEvent.id > after_id)
+            .order_by(FilingEvent.id)
+            .limit(limit))
+        return [{"id": id, "symbol": symbol, "statement": statement, "date": date.isoformat()}
+                for id, symbol, statement, date in rows]
+
+    def prune(self, days):
+        """
+        Delete events older than the given number of days. The caller commits.
+
+        Args:
+            days (int): Retention in days
+
+        Returns:
+            int: Number of events deleted
+        """
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        return self.__session.execute(delete(FilingEvent).where(FilingEvent.created_at < cutoff)).rowcount
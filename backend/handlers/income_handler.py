@@ -1,6 +1,11 @@
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
 
-from models.income_statement import IncomeStatement
+from handlers.company_handler import CompanyHandler
+from handlers.filing_event_handler import FilingEventHandler
+from handlers.latest_fundamentals_handler import LatestFundamentalsHandler
+from models.income_statement import IncomeStatement, INCOME_STATEMENT_MAP
+from models.company import Company
 
 
 class IncomeHandler:
@@ -9,10 +14,18 @@ class IncomeHandler:
 
     Attributes:
         __session: SQLAlchemy session for MySQL database connection
+        __read_session: session serving reads, usually routed to the read replicas, default __session
     """
 
-    def __init__(self, session):
+    # statement type, as in the API routes and filing events
+    STATEMENT = "income-statement"
+
+    def __init__(self, session, read_session=None):
         self.__session = session
+        self.__read_session = read_session or session
+        self.__latest = LatestFundamentalsHandler(session)
+        self.__companies = CompanyHandler(session)
+        self.__events = FilingEventHandler(session)
 
     def create(self, data):
         """
@@ -25,32 +38,44 @@ class IncomeHandler:
             dict: Message indicating success/failure and the record ID if successful
         """
         try:
-            income_statement = IncomeStatement(
-                symbol=data["symbol"],
-                date=data["date"],
-                revenue=data["revenue"],
-                gross_profit=data["grossProfit"],
-                gross_profit_ratio=data.get("grossProfitRatio"),
-                operating_income=data["operatingIncome"],
-                operating_income_ratio=data.get("operatingIncomeRatio"),
-                net_income=data["netIncome"],
-                net_income_ratio=data.get("netIncomeRatio"),
-                eps=data["eps"],
-                operating_expenses=data.get("operatingExpenses"),
-                research_and_development_expenses=data.get("researchAndDevelopmentExpenses"),
-                income_tax_expense=data.get("incomeTaxExpense"),
-                depreciation_and_amortization=data.get("depreciationAndAmortization"),
-                ebitda=data.get("ebitda"),
-                total_other_income_expenses_net=data.get("totalOtherIncomeExpensesNet"),
-                reported_currency=data.get("reportedCurrency"),
-                filling_date=data.get("fillingDate"),
-                accepted_date=data.get("acceptedDate"),
-                period=data.get("period")
-            )
-            self.__session.add(income_statement)
+            company_id = self.__companies.resolve([INCOME_STATEMENT_MAP.to_company(data)])[data["symbol"]]
+            record = INCOME_STATEMENT_MAP.to_record(data, company_id)
+            result = self.__session.execute(insert(IncomeStatement).values(record))
+            self.__events.record(self.STATEMENT, [(company_id, record["date"])])
+            self.__latest.refresh(IncomeStatement, [data["symbol"]])
             self.__session.commit()
-            return {"message": "Record created successfully", "id": income_statement.id}
+            return {"message": "Record created successfully", "id": result.inserted_primary_key[0]}
+
+        except SQLAlchemyError as e:
+            self.__session.rollback()
+            return {"error": str(e)}
+
+    def create_many(self, items):
+        """
+        Upsert a batch of income statements from the FMP API in a single executemany, updating rows
+        whose (symbol, date) already exists. Rows identical to the stored statement are skipped, the
+        others are recorded as filing events. The caller commits.
+
+        Args:
+            items (list): List of income statement dicts from FMP API
 
+        Returns:
+            dict: Message indicating success/failure and the number of new or changed rows written
+        """
+        if not items:
+            return {"message": "No records to upsert", "count": 0}
+        try:
+            connection = self.__session.connection()
+            companies = self.__companies.resolve(INCOME_STATEMENT_MAP.to_company(item) for item in items)
+            rows = [INCOME_STATEMENT_MAP.to_row(item, companies[item["symbol"]]) for item in items]
+            rows = self.__events.changed(INCOME_STATEMENT_MAP, rows)
+            if rows:
+                connection.exec_driver_sql(INCOME_STATEMENT_MAP.insert_sql(connection.dialect), rows)
+                date = INCOME_STATEMENT_MAP.columns.index("date")
+                self.__events.record(self.STATEMENT, [(row[0], row[date]) for row in rows])
+                symbols = {company_id: symbol for symbol, company_id in companies.items()}
+                self.__latest.refresh(IncomeStatement, {symbols[row[0]] for row in rows})
+            return {"message": "Records upserted successfully", "count": len(rows)}
         except SQLAlchemyError as e:
             self.__session.rollback()
             return {"error": str(e)}
@@ -68,15 +93,16 @@ class IncomeHandler:
             dict: Dictionary containing list of statements, pagination info and status message
         """
         try:
-            total = self.__session.query(IncomeStatement.id).filter(IncomeStatement.symbol == symbol).count()
-            records = (self.__session.query(IncomeStatement)
-                       .filter(IncomeStatement.symbol == symbol)
-                       .order_by(IncomeStatement.date.desc())
-                       .offset((page - 1) * offset)
-                       .limit(offset)
-                       .all())
+            total = self.__read_session.query(IncomeStatement.id).join(IncomeStatement.company).filter(
+                Company.symbol == symbol).count()
+            rows = self.__read_session.execute(INCOME_STATEMENT_MAP.select()
+                                          .where(Company.symbol == symbol)
+                                          .order_by(IncomeStatement.date.desc())
+                                          .offset((page - 1) * offset)
+                                          .limit(offset)).all()
+            to_json = INCOME_STATEMENT_MAP.to_json
             return {
-                "data": [record.to_dict() for record in records],
+                "data": [to_json(row) for row in rows],
                 "pagination": {
                     "total": total,
                     "page": page,
@@ -104,8 +130,17 @@ class IncomeHandler:
             if not record:
                 return {"error": "Record not found"}
 
+            symbols = {record.symbol}
             for k, v in data.items():
-                record[k] = v
+                if k == "symbol":
+                    # moves the statement to another company rather than renaming its company
+                    record.company_id = self.__companies.resolve([{"symbol": v}])[v]
+                    symbols.add(v)
+                else:
+                    setattr(record, k, v)
+            self.__session.flush()
+            self.__events.record(self.STATEMENT, [(record.company_id, record.date)])
+            self.__latest.refresh(IncomeStatement, symbols)
 
             self.__session.commit()
             return {"message": "Record updated successfully"}
@@ -128,5 +163,6 @@ class IncomeHandler:
             return {"error": "Record not found"}
 
         self.__session.delete(record)
+        self.__latest.refresh(IncomeStatement, [record.symbol])
         self.__session.commit()
         return {"message": "Record deleted successfully"}
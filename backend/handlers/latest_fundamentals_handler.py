@@ -0,0 +1,177 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from handlers.upsert import upsert
+from models.company import Company
+from models.data_version import DataVersion
+from models.latest_fundamentals import LatestFundamentals, LATEST_FUNDAMENTALS_MAP, SECTIONS
+
+
+class LatestFundamentalsHandler:
+    """
+    MySQL operations on the latest fundamentals snapshot, keeping it in sync with the statement
+    tables and serving single-symbol lookups and screens from it.
+
+    Attributes:
+        __session: SQLAlchemy session for MySQL database connection
+        __read_session: session serving reads, usually routed to the read replicas, default __session
+    """
+
+    # numeric columns a screen may filter or sort on
+    SCREEN_COLUMNS = tuple(column for column in LATEST_FUNDAMENTALS_MAP.columns
+                           if column != "company_id" and not column.endswith(("_date", "_at")))
+
+    def __init__(self, session, read_session=None):
+        self.__session = session
+        self.__read_session = read_session or session
+
+    def refresh(self, model, symbols=None):
+        """
+        Recompute the section of `model` for the given symbols from their newest statement, and stamp
+        the rows with a new data version. Runs inside the caller's transaction, the caller commits.
+
+        Args:
+            model: Statement model whose section is refreshed, a key of SECTIONS
+            symbols (iterable): Symbols to refresh, None refreshes every symbol in the statement table
+
+        Returns:
+            int: Number of snapshot rows written
+        """
+        section = SECTIONS[model]
+        symbols = None if symbols is None else set(symbols)
+        if symbols is not None and not symbols:
+            return 0
+
+        # groupwise max served by the unique (company_id, date) index
+        newest = select(model.company_id, func.max(model.date).label("date")).group_by(model.company_id)
+        company_ids = None
+        if symbols is not None:
+            company_ids = set(self.__session.execute(select(Company.id).where(Company.symbol.in_(symbols))).scalars())
+            newest = newest.where(model.company_id.in_(company_ids))
+        newest = newest.subquery()
+        stmt = (select(model.company_id, *[column.label(name) for name, column in section.items()])
+                .join(newest, and_(model.company_id == newest.c.company_id, model.date == newest.c.date)))
+
+        now, version = datetime.utcnow(), self.__next_version()
+        rows = [dict(row._mapping, updated_at=now, version=version) for row in self.__session.execute(stmt)]
+
+        # companies that no longer have any statement of this type get their section cleared
+        missing = (company_ids or set()) - {row["company_id"] for row in rows}
+        empty = dict.fromkeys(section, None)
+        rows.extend(dict(empty, company_id=company_id, updated_at=now, version=version) for company_id in missing)
+
+        upsert(self.__session, LatestFundamentals.__table__, rows,
+               key_columns=("company_id",), update_columns=list(section) + ["updated_at", "version"])
+        if missing:
+            self.__session.execute(delete(LatestFundamentals).where(
+                LatestFundamentals.company_id.in_(missing),
+                LatestFundamentals.income_date.is_(None),
+                LatestFundamentals.balance_sheet_date.is_(None),
+                LatestFundamentals.cash_flow_date.is_(None)))
+        return len(rows)
+
+    def __next_version(self):
+        """
+        Increment the data version counter. Its row stays locked until the caller's transaction ends,
+        so concurrent writers commit their versions in order.
+
+        Returns:
+            int: The new data version
+        """
+        bumped = self.__session.execute(update(DataVersion).where(DataVersion.id == 1)
+                                        .values(version=DataVersion.version + 1))
+        if not bumped.rowcount:
+            self.__session.execute(insert(DataVersion).values(id=1, version=1))
+        return self.__session.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar()
+
+    def rebuild(self):
+        """
+        Rebuild the whole snapshot from the statement tables, used to backfill existing data.
+
+        Returns:
+            dict: Message indicating success/failure and the number of rows written
+        """
+        try:
+            count = sum(self.refresh(model) for model in SECTIONS)
+            self.__session.commit()
+            return {"message": "Snapshot rebuilt successfully", "count": count}
+        except SQLAlchemyError as e:
+            self.__session.rollback()
+            return {"error": str(e)}
+
+    def read(self, symbol):
+        """
+        Retrieve the latest fundamentals of one symbol, a unique key lookup of the company and a
+        primary key lookup of its snapshot.
+
+        Args:
+            symbol (str): Company stock symbol
+
+        Returns:
+            dict: Dictionary containing the snapshot row (or None) and status message
+        """
+        try:
+            row = self.__read_session.execute(LATEST_FUNDAMENTALS_MAP.select()
+                                         .where(Company.symbol == symbol)).first()
+            return {
+                "data": LATEST_FUNDAMENTALS_MAP.to_json(row) if row else None,
+                "message": "Record retrieved successfully" if row else "Record not found"
+            }
+        except SQLAlchemyError as e:
+            return {"error": str(e)}
+
+    def screen(self, filters=None, sort="revenue", order="desc", page=1, offset=10):
+        """
+        Screen the latest year of every company with range filters, sorting and pagination.
+
+        Args:
+            filters (dict): {column: (min, max)}, either bound may be None
+            sort (str): Column to sort by, default revenue
+            order (str): "asc" or "desc", default desc
+            page (int): Page number, default 1
+            offset (int): Number of records per page, default 10
+
+        Returns:
+            dict: Dictionary containing list of snapshot rows, pagination info and status message
+
+        Raises:
+            ValueError: If a filter or sort column is not one of SCREEN_COLUMNS
+        """
+        if sort not in self.SCREEN_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort}")
+
+        conditions = []
+        for name, (low, high) in (filters or {}).items():
+            if name not in self.SCREEN_COLUMNS:
+                raise ValueError(f"Unsupported filter column: {name}")
+            column = LatestFundamentals.__table__.c[name]
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                conditions.append(column <= high)
+
+        sort_column = LatestFundamentals.__table__.c[sort]
+        try:
+            total = self.__read_session.execute(
+                select(func.count()).select_from(LatestFundamentals).where(*conditions)).scalar()
+            rows = self.__read_session.execute(LATEST_FUNDAMENTALS_MAP.select()
+                                          .where(*conditions)
+                                          .order_by(sort_column.asc() if order == "asc" else sort_column.desc(),
+                                                    LatestFundamentals.company_id)
+                                          .offset((page - 1) * offset)
+                                          .limit(offset)).all()
+            to_json = LATEST_FUNDAMENTALS_MAP.to_json
+            return {
+                "data": [to_json(row) for row in rows],
+                "pagination": {
+                    "total": total,
+                    "page": page,
+                    "offset": offset,
+                    "pages": (total + offset - 1) // offset if total > 0 else 0
+                },
+                "message": "Records retrieved successfully"
+            }
+        except SQLAlchemyError as e:
+            return {"error": str(e)}
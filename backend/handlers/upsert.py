@@ -0,0 +1,34 @@
+from sqlalchemy.dialects import mysql, sqlite
+
+
+def upsert(session, table, rows, key_columns, update_columns, increment_columns=()):
+    """
+    insert rows, updating `update_columns` of rows whose `key_columns` already exist
+
+    :param session: SQLAlchemy session, the statement joins its current transaction
+    :param table: target table
+    :param rows: list of dicts keyed by column name, all with the same keys
+    :param key_columns: columns of the unique key the conflict is detected on
+    :param update_columns: columns overwritten on conflict
+    :param increment_columns: counter columns the inserted value is added to on conflict
+    :return: None
+    """
+    if not rows:
+        return
+
+    dialect = session.connection().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in update_columns}
+                                            | {column: table.c[column] + stmt.inserted[column]
+                                               for column in increment_columns})
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=list(key_columns),
+                                          set_={column: stmt.excluded[column] for column in update_columns}
+                                          | {column: table.c[column] + stmt.excluded[column]
+                                             for column in increment_columns})
+    else:
+        raise NotImplementedError(f"upsert is not supported on {dialect}")
+
+    session.execute(stmt, rows)
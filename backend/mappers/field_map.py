@@ -0,0 +1,217 @@
+from datetime import date, datetime
+from operator import attrgetter
+
+from sqlalchemy import select
+
+
+def to_int(value):
+    """coerce FMP numbers (sometimes sent as floats or numeric strings) to int"""
+    if value is None or value == "":
+        return None
+    return int(float(value)) if isinstance(value, str) else int(value)
+
+
+def to_float(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def to_str(value):
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def to_date(value):
+    """parse "2024-09-28" or "2024-11-01 06:01:36" into a date"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def to_datetime(value):
+    """parse "2024-11-01 06:01:36" (or a bare date) into a datetime"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return datetime.fromisoformat(value)
+
+
+# coercions whose stored values are serialized with isoformat() on output
+_TEMPORAL = (to_date, to_datetime)
+
+
+class Field:
+    """
+    one entry of a statement field map.
+
+    Attributes:
+        key (str): key in the FMP API payload, like "grossProfit"
+        column (str): column name in the statement table, like "gross_profit", also the key in API output
+        coerce (callable): type coercion applied on ingestion, None keeps the raw value
+        required (bool): raise KeyError when the key is missing, like the old constructors did
+        company (str): column of the companies dimension holding the value instead of the statement
+                       table, like "cik"
+    """
+
+    __slots__ = ("key", "column", "coerce", "required", "company")
+
+    def __init__(self, key, column=None, coerce=None, required=False, company=None):
+        self.key = key
+        self.column = column or key
+        self.coerce = coerce
+        self.required = required
+        self.company = company
+
+
+class FieldMap:
+    """
+    Declarative FMP key -> column -> coercion map for one statement table.
+
+    The map is compiled once into plain functions, so ingestion and output never go
+    through per-field ORM attribute instrumentation:
+
+        to_row(data) -> tuple of column values, in `columns` order, for bulk inserts
+        to_record(data) -> {column: value} for single Core inserts
+        to_json(row) -> API dict from a row selected with `select()`
+
+    Tables referencing the companies dimension store fields marked with `company` there; their
+    rows take the company id, which comes first in `columns`:
+
+        to_company(data) -> {companies column: value, "date": statement date} for CompanyHandler.resolve
+        to_row(data, company_id), to_record(data, company_id)
+
+    Attributes:
+        model: SQLAlchemy model the map belongs to
+        fields: tuple of Field in output order
+        columns: ingested column names of the table, in `to_row` order
+        output_columns: primary key (if any) followed by every field's column, in `to_json` order
+        unique_columns: natural key used for upserts
+        companies: companies table, None when the table does not reference it
+    """
+
+    def __init__(self, model, fields, unique_columns=("symbol", "date"), primary_key="id", companies=None):
+        self.model = model
+        self.table = model.__table__
+        self.fields = tuple(fields)
+        self.companies = companies
+        table_fields = tuple(field for field in self.fields if not field.company)
+        self.columns = (("company_id",) if companies is not None else ()) + tuple(field.column for field in table_fields)
+        self.output_columns = ((primary_key,) if primary_key else ()) + tuple(field.column for field in self.fields)
+        self.unique_columns = tuple(unique_columns)
+
+        self.to_row = _compile_to_row(table_fields, companies is not None)
+        self.to_record = _compile_to_record(table_fields, companies is not None)
+        self.to_json = _compile_to_json(self.output_columns, self.fields)
+        if companies is not None:
+            # the date tells CompanyHandler.resolve which statement of a batch is the newest
+            self.to_company = _compile_to_record(tuple(field for field in self.fields
+                                                       if field.company or field.column == "date"), False,
+                                                 name="to_company")
+        self.__getter = attrgetter(*self.output_columns)
+        self.__insert_sql = {}
+
+    def select(self):
+        """
+        :return: SELECT of `output_columns`, rows of which feed `to_json`, joined to the companies
+                 dimension if the table references it
+        """
+        if self.companies is None:
+            return select(*[self.table.c[column] for column in self.output_columns])
+
+        company_columns = {field.column: self.companies.c[field.company] for field in self.fields if field.company}
+        return (select(*[company_columns[column] if column in company_columns else self.table.c[column]
+                         for column in self.output_columns])
+                .select_from(self.table.join(self.companies, self.table.c.company_id == self.companies.c.id)))
+
+    def to_dict(self, instance):
+        """
+        serialize a model instance through the compiled output mapper
+
+        :param instance: model instance
+        :return: API dict
+        """
+        return self.to_json(self.__getter(instance))
+
+    def insert_sql(self, dialect):
+        """
+        build (and cache per dialect) a positional upsert statement taking `to_row` tuples,
+        so the DBAPI cursor can batch a whole statement list in one executemany
+
+        :param dialect: SQLAlchemy dialect of the target connection
+        :return: SQL string
+        :raises NotImplementedError: on dialects other than MySQL and SQLite
+        """
+        sql = self.__insert_sql.get(dialect.name)
+        if sql is None:
+            sql = self.__insert_sql[dialect.name] = self.__build_insert_sql(dialect)
+        return sql
+
+    def __build_insert_sql(self, dialect):
+        quote = dialect.identifier_preparer.quote
+        marker = "?" if dialect.paramstyle == "qmark" else "%s"
+        columns = ", ".join(quote(column) for column in self.columns)
+        markers = ", ".join([marker] * len(self.columns))
+        updates = [column for column in self.columns if column not in self.unique_columns]
+        sql = f"INSERT INTO {quote(self.table.name)} ({columns}) VALUES ({markers})"
+
+        if dialect.name == "mysql":
+            assignments = ", ".join(f"{quote(c)} = VALUES({quote(c)})" for c in updates)
+            return f"{sql} ON DUPLICATE KEY UPDATE {assignments}"
+        if dialect.name == "sqlite":
+            conflict = ", ".join(quote(column) for column in self.unique_columns)
+            assignments = ", ".join(f"{quote(c)} = excluded.{quote(c)}" for c in updates)
+            return f"{sql} ON CONFLICT ({conflict}) DO UPDATE SET {assignments}"
+        raise NotImplementedError(f"upsert is not supported on {dialect.name}")
+
+
+def _value_expr(field, namespace):
+    """source expression reading and coercing one field from `data`"""
+    read = f"data[{field.key!r}]" if field.required else f"data.get({field.key!r})"
+    if field.coerce is None:
+        return read
+    name = f"_coerce_{field.coerce.__name__}"
+    namespace[name] = field.coerce
+    return f"{name}({read})"
+
+
+def _compile(name, body, namespace):
+    source = f"def {name}({body[0]}):\n    return {body[1]}\n"
+    exec(compile(source, f"<field_map {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def _compile_to_row(fields, company_id):
+    namespace = {}
+    values = "".join(f"{_value_expr(field, namespace)}, " for field in fields)
+    if company_id:
+        return _compile("to_row", ("data, company_id", f"(company_id, {values})"), namespace)
+    return _compile("to_row", ("data", f"({values})"), namespace)
+
+
+def _compile_to_record(fields, company_id, name="to_record"):
+    namespace = {}
+    items = [f"{(field.company or field.column)!r}: {_value_expr(field, namespace)}" for field in fields]
+    if company_id:
+        return _compile(name, ("data, company_id", f"{{'company_id': company_id, {', '.join(items)}}}"), namespace)
+    return _compile(name, ("data", f"{{{', '.join(items)}}}"), namespace)
+
+
+def _compile_to_json(output_columns, fields):
+    temporal = {field.column for field in fields if field.coerce in _TEMPORAL}
+    namespace = {}
+    items = []
+    for index, column in enumerate(output_columns):
+        if column in temporal:
+            items.append(f"{column!r}: row[{index}].isoformat() if row[{index}] else None")
+        else:
+            items.append(f"{column!r}: row[{index}]")
+    return _compile("to_json", ("row", f"{{{', '.join(items)}}}"), namespace)
@@ -1,5 +1,10 @@
-from sqlalchemy import Column, Integer, String, BigInteger, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, BigInteger, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+from mappers.field_map import Field, FieldMap, to_date, to_int, to_str
+from models.company import Company
 
 Base = declarative_base()
 
@@ -7,10 +12,9 @@ class BalanceSheetStatement(Base):
     __tablename__ = "balance_sheet_statements"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    symbol = Column(String(10), nullable=False)
+    company_id = Column(Integer, ForeignKey(Company.id), nullable=False)
     date = Column(Date, nullable=False)
     reportedCurrency = Column(String(10), nullable=False)
-    cik = Column(String(20))
     fillingDate = Column(Date)
     acceptedDate = Column(Date)
     calendarYear = Column(Integer)
@@ -72,68 +76,74 @@ class BalanceSheetStatement(Base):
     link = Column(String(255))
     finalLink = Column(String(255))
 
+    # Company attributes, stored once per company
+    company = relationship(Company, lazy="joined", innerjoin=True)
+    symbol = association_proxy("company", "symbol")
+    cik = association_proxy("company", "cik")
+
     __table_args__ = (
-        UniqueConstraint('symbol', 'date', name='uq_symbol_date'),
+        UniqueConstraint('company_id', 'date', name='uq_company_date'),
     )
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'symbol': self.symbol,
-            'date': self.date.isoformat() if self.date else None,
-            'reportedCurrency': self.reportedCurrency,
-            'cik': self.cik,
-            'fillingDate': self.fillingDate.isoformat() if self.fillingDate else None,
-            'acceptedDate': self.acceptedDate.isoformat() if self.acceptedDate else None,
-            'calendarYear': self.calendarYear,
-            'period': self.period,
-            # Assets
-            'cashAndCashEquivalents': self.cashAndCashEquivalents,
-            'shortTermInvestments': self.shortTermInvestments,
-            'cashAndShortTermInvestments': self.cashAndShortTermInvestments,
-            'netReceivables': self.netReceivables,
-            'inventory': self.inventory,
-            'otherCurrentAssets': self.otherCurrentAssets,
-            'totalCurrentAssets': self.totalCurrentAssets,
-            'propertyPlantEquipmentNet': self.propertyPlantEquipmentNet,
-            'goodwill': self.goodwill,
-            'intangibleAssets': self.intangibleAssets,
-            'goodwillAndIntangibleAssets': self.goodwillAndIntangibleAssets,
-            'longTermInvestments': self.longTermInvestments,
-            'taxAssets': self.taxAssets,
-            'otherNonCurrentAssets': self.otherNonCurrentAssets,
-            'totalNonCurrentAssets': self.totalNonCurrentAssets,
-            'otherAssets': self.otherAssets,
-            'totalAssets': self.totalAssets,
-            'totalInvestments': self.totalInvestments,
-            # Liabilities
-            'accountPayables': self.accountPayables,
-            'shortTermDebt': self.shortTermDebt,
-            'taxPayables': self.taxPayables,
-            'deferredRevenue': self.deferredRevenue,
-            'otherCurrentLiabilities': self.otherCurrentLiabilities,
-            'totalCurrentLiabilities': self.totalCurrentLiabilities,
-            'longTermDebt': self.longTermDebt,
-            'deferredRevenueNonCurrent': self.deferredRevenueNonCurrent,
-            'deferredTaxLiabilitiesNonCurrent': self.deferredTaxLiabilitiesNonCurrent,
-            'otherNonCurrentLiabilities': self.otherNonCurrentLiabilities,
-            'totalNonCurrentLiabilities': self.totalNonCurrentLiabilities,
-            'otherLiabilities': self.otherLiabilities,
-            'capitalLeaseObligations': self.capitalLeaseObligations,
-            'totalLiabilities': self.totalLiabilities,
-            'totalDebt': self.totalDebt,
-            'netDebt': self.netDebt,
-            # Equity
-            'preferredStock': self.preferredStock,
-            'commonStock': self.commonStock,
-            'retainedEarnings': self.retainedEarnings,
-            'accumulatedOtherComprehensiveIncomeLoss': self.accumulatedOtherComprehensiveIncomeLoss,
-            'otherTotalStockholdersEquity': self.otherTotalStockholdersEquity,
-            'totalStockholdersEquity': self.totalStockholdersEquity,
-            'minorityInterest': self.minorityInterest,
-            'totalEquity': self.totalEquity,
-            'totalLiabilitiesAndStockholdersEquity': self.totalLiabilitiesAndStockholdersEquity,
-            'totalLiabilitiesAndTotalEquity': self.totalLiabilitiesAndTotalEquity,
-            'link': self.link,
-            'finalLink': self.finalLink
-        }
\ No newline at end of file
+        return BALANCE_SHEET_MAP.to_dict(self)
+
+
+# FMP keys double as column names for balance sheets,
+# fields with `company` are stored once per company in the companies dimension
+BALANCE_SHEET_MAP = FieldMap(BalanceSheetStatement, [
+    Field("symbol", coerce=to_str, required=True, company="symbol"),
+    Field("date", coerce=to_date, required=True),
+    Field("reportedCurrency", coerce=to_str),
+    Field("cik", coerce=to_str, company="cik"),
+    Field("fillingDate", coerce=to_date),
+    Field("acceptedDate", coerce=to_date),
+    Field("calendarYear", coerce=to_int),
+    Field("period", coerce=to_str),
+    Field("cashAndCashEquivalents", coerce=to_int),
+    Field("shortTermInvestments", coerce=to_int),
+    Field("cashAndShortTermInvestments", coerce=to_int),
+    Field("netReceivables", coerce=to_int),
+    Field("inventory", coerce=to_int),
+    Field("otherCurrentAssets", coerce=to_int),
+    Field("totalCurrentAssets", coerce=to_int),
+    Field("propertyPlantEquipmentNet", coerce=to_int),
+    Field("goodwill", coerce=to_int),
+    Field("intangibleAssets", coerce=to_int),
+    Field("goodwillAndIntangibleAssets", coerce=to_int),
+    Field("longTermInvestments", coerce=to_int),
+    Field("taxAssets", coerce=to_int),
+    Field("otherNonCurrentAssets", coerce=to_int),
+    Field("totalNonCurrentAssets", coerce=to_int),
+    Field("otherAssets", coerce=to_int),
+    Field("totalAssets", coerce=to_int, required=True),
+    Field("totalInvestments", coerce=to_int),
+    Field("accountPayables", coerce=to_int),
+    Field("shortTermDebt", coerce=to_int),
+    Field("taxPayables", coerce=to_int),
+    Field("deferredRevenue", coerce=to_int),
+    Field("otherCurrentLiabilities", coerce=to_int),
+    Field("totalCurrentLiabilities", coerce=to_int),
+    Field("longTermDebt", coerce=to_int),
+    Field("deferredRevenueNonCurrent", coerce=to_int),
+    Field("deferredTaxLiabilitiesNonCurrent", coerce=to_int),
+    Field("otherNonCurrentLiabilities", coerce=to_int),
+    Field("totalNonCurrentLiabilities", coerce=to_int),
+    Field("otherLiabilities", coerce=to_int),
+    Field("capitalLeaseObligations", coerce=to_int),
+    Field("totalLiabilities", coerce=to_int, required=True),
+    Field("totalDebt", coerce=to_int),
+    Field("netDebt", coerce=to_int),
+    Field("preferredStock", coerce=to_int),
+    Field("commonStock", coerce=to_int),
+    Field("retainedEarnings", coerce=to_int),
+    Field("accumulatedOtherComprehensiveIncomeLoss", coerce=to_int),
+    Field("otherTotalStockholdersEquity", coerce=to_int),
+    Field("totalStockholdersEquity", coerce=to_int),
+    Field("minorityInterest", coerce=to_int),
+    Field("totalEquity", coerce=to_int),
+    Field("totalLiabilitiesAndStockholdersEquity", coerce=to_int),
+    Field("totalLiabilitiesAndTotalEquity", coerce=to_int),
+    Field("link", coerce=to_str),
+    Field("finalLink", coerce=to_str),
+], unique_columns=("company_id", "date"), companies=Company.__table__)
@@ -0,0 +1,29 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, Text
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class CachedResponse(Base):
+    """
+    SQLAlchemy model for the response cache, API responses precomputed by the warmup stage of ingestion
+    and served by the web app as long as the data they were computed from is current.
+
+    Attributes:
+        key (str): Primary key, request path and sorted query string (e.g., /api/income-statement?symbol=AAPL)
+        body (str): Serialized JSON response
+        data_version (int): Data version the response was computed from, see services.data_version
+        created_at (DateTime): When the response was computed
+    """
+
+    __tablename__ = "response_cache"
+
+    key = Column(String(500), primary_key=True, comment="Request path and sorted query string")
+    body = Column(Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=False, comment="Serialized JSON response")
+    data_version = Column(BigInteger, nullable=False, comment="Data version the response was computed from")
+    created_at = Column(DateTime, nullable=False, comment="When the response was computed")
+
+    __table_args__ = (
+        Index("idx_response_cache_data_version", "data_version"),
+    )
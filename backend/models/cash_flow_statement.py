@@ -1,5 +1,10 @@
-from sqlalchemy import Column, Integer, String, BigInteger, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, BigInteger, Date, ForeignKey, UniqueConstraint
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+from mappers.field_map import Field, FieldMap, to_date, to_int, to_str
+from models.company import Company
 
 Base = declarative_base()
 
@@ -10,17 +15,17 @@ class CashFlowStatement(Base):
 
     Attributes:
         id (int): Primary key
-        symbol (str): Company stock symbol
+        company_id (int): Company the statement belongs to
+        symbol (str): Company stock symbol, read through the company
         date (Date): Statement date
         ...etc
     """
     __tablename__ = "cash_flow_statements"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    symbol = Column(String(10), nullable=False)
+    company_id = Column(Integer, ForeignKey(Company.id), nullable=False)
     date = Column(Date, nullable=False)
     reported_currency = Column(String(10), nullable=False)
-    cik = Column(String(20))
     filling_date = Column(Date)
     accepted_date = Column(Date)
     calendar_year = Column(Integer)
@@ -67,8 +72,13 @@ class CashFlowStatement(Base):
     link = Column(String(255))
     final_link = Column(String(255))
 
+    # Company attributes, stored once per company
+    company = relationship(Company, lazy="joined", innerjoin=True)
+    symbol = association_proxy("company", "symbol")
+    cik = association_proxy("company", "cik")
+
     __table_args__ = (
-        UniqueConstraint('symbol', 'date', name='uq_symbol_date'),
+        UniqueConstraint('company_id', 'date', name='uq_company_date'),
     )
 
     def to_dict(self):
@@ -79,45 +89,49 @@ class CashFlowStatement(Base):
             dict: Dictionary containing all cash flow statement data with
                  dates converted to ISO format strings
         """
-        return {
-            'id': self.id,
-            'symbol': self.symbol,
-            'date': self.date.isoformat() if self.date else None,
-            'reported_currency': self.reported_currency,
-            'cik': self.cik,
-            'filling_date': self.filling_date.isoformat() if self.filling_date else None,
-            'accepted_date': self.accepted_date.isoformat() if self.accepted_date else None,
-            'calendar_year': self.calendar_year,
-            'period': self.period,
-            'net_income': self.net_income,
-            'depreciation_and_amortization': self.depreciation_and_amortization,
-            'deferred_income_tax': self.deferred_income_tax,
-            'stock_based_compensation': self.stock_based_compensation,
-            'change_in_working_capital': self.change_in_working_capital,
-            'accounts_receivables': self.accounts_receivables,
-            'inventory': self.inventory,
-            'accounts_payables': self.accounts_payables,
-            'other_working_capital': self.other_working_capital,
-            'other_non_cash_items': self.other_non_cash_items,
-            'net_cash_provided_by_operating_activities': self.net_cash_provided_by_operating_activities,
-            'investments_in_property_plant_and_equipment': self.investments_in_property_plant_and_equipment,
-            'acquisitions_net': self.acquisitions_net,
-            'purchases_of_investments': self.purchases_of_investments,
-            'sales_maturities_of_investments': self.sales_maturities_of_investments,
-            'other_investing_activities': self.other_investing_activities,
-            'net_cash_used_for_investing_activities': self.net_cash_used_for_investing_activities,
-            'debt_repayment': self.debt_repayment,
-            'common_stock_issued': self.common_stock_issued,
-            'common_stock_repurchased': self.common_stock_repurchased,
-            'dividends_paid': self.dividends_paid,
-            'other_financing_activities': self.other_financing_activities,
-            'net_cash_used_provided_by_financing_activities': self.net_cash_used_provided_by_financing_activities,
-            'free_cash_flow': self.free_cash_flow,
-            'net_change_in_cash': self.net_change_in_cash,
-            'cash_at_end_of_period': self.cash_at_end_of_period,
-            'cash_at_beginning_of_period': self.cash_at_beginning_of_period,
-            'operating_cash_flow': self.operating_cash_flow,
-            'capital_expenditure': self.capital_expenditure,
-            'link': self.link,
-            'final_link': self.final_link
-        }
\ No newline at end of file
+        return CASH_FLOW_MAP.to_dict(self)
+
+
+# FMP key -> column -> coercion, compiled into the ingestion and output mappers,
+# fields with `company` are stored once per company in the companies dimension
+CASH_FLOW_MAP = FieldMap(CashFlowStatement, [
+    Field("symbol", "symbol", to_str, required=True, company="symbol"),
+    Field("date", "date", to_date, required=True),
+    Field("reportedCurrency", "reported_currency", to_str),
+    Field("cik", "cik", to_str, company="cik"),
+    Field("fillingDate", "filling_date", to_date),
+    Field("acceptedDate", "accepted_date", to_date),
+    Field("calendarYear", "calendar_year", to_int),
+    Field("period", "period", to_str),
+    Field("netIncome", "net_income", to_int),
+    Field("depreciationAndAmortization", "depreciation_and_amortization", to_int),
+    Field("deferredIncomeTax", "deferred_income_tax", to_int),
+    Field("stockBasedCompensation", "stock_based_compensation", to_int),
+    Field("changeInWorkingCapital", "change_in_working_capital", to_int),
+    Field("accountsReceivables", "accounts_receivables", to_int),
+    Field("inventory", "inventory", to_int),
+    Field("accountsPayables", "accounts_payables", to_int),
+    Field("otherWorkingCapital", "other_working_capital", to_int),
+    Field("otherNonCashItems", "other_non_cash_items", to_int),
+    Field("netCashProvidedByOperatingActivities", "net_cash_provided_by_operating_activities", to_int),
+    Field("investmentsInPropertyPlantAndEquipment", "investments_in_property_plant_and_equipment", to_int),
+    Field("acquisitionsNet", "acquisitions_net", to_int),
+    Field("purchasesOfInvestments", "purchases_of_investments", to_int),
+    Field("salesMaturitiesOfInvestments", "sales_maturities_of_investments", to_int),
+    Field("otherInvestingActivities", "other_investing_activities", to_int),
+    Field("netCashUsedForInvestingActivities", "net_cash_used_for_investing_activities", to_int),
+    Field("debtRepayment", "debt_repayment", to_int),
+    Field("commonStockIssued", "common_stock_issued", to_int),
+    Field("commonStockRepurchased", "common_stock_repurchased", to_int),
+    Field("dividendsPaid", "dividends_paid", to_int),
+    Field("otherFinancingActivities", "other_financing_activities", to_int),
+    Field("netCashUsedProvidedByFinancingActivities", "net_cash_used_provided_by_financing_activities", to_int),
+    Field("freeCashFlow", "free_cash_flow", to_int),
+    Field("netChangeInCash", "net_change_in_cash", to_int),
+    Field("cashAtEndOfPeriod", "cash_at_end_of_period", to_int),
+    Field("cashAtBeginningOfPeriod", "cash_at_beginning_of_period", to_int),
+    Field("operatingCashFlow", "operating_cash_flow", to_int),
+    Field("capitalExpenditure", "capital_expenditure", to_int),
+    Field("link", "link", to_str),
+    Field("finalLink", "final_link", to_str),
+], unique_columns=("company_id", "date"), companies=Company.__table__)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class Company(Base):
+    """
+    SQLAlchemy model for the companies dimension. Statement rows reference a company by its integer id
+    instead of repeating the symbol and company attributes on every row.
+
+    Attributes:
+        id (int): Primary key, surrogate key referenced by the statement tables
+        symbol (str): Company stock symbol, unique
+        cik (str): SEC Central Index Key
+    """
+
+    __tablename__ = "companies"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="Surrogate key of the company")
+    symbol = Column(String(10), nullable=False, unique=True, comment="Stock ticker symbol (e.g., AAPL)")
+    cik = Column(String(20), comment="SEC Central Index Key")
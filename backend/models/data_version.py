@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Column, Integer
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class DataVersion(Base):
+    """
+    SQLAlchemy model for the data version counter, a single row incremented in the transaction of every
+    write to the statements, see services.data_version.
+
+    Attributes:
+        id (int): Primary key, always 1
+        version (int): Number of writes committed so far
+    """
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True, comment="Always 1, the table holds a single row")
+    version = Column(BigInteger, nullable=False, default=0, comment="Incremented by every write to the statements")
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.ext.declarative import declarative_base
+
+from models.company import Company
+
+Base = declarative_base()
+
+
+class FilingEvent(Base):
+    """
+    SQLAlchemy model for the filing events outbox, one row per statement stored new or changed.
+
+    Rows are written by the statement handlers in the same transaction as the statement itself, and
+    tailed by id by the web app to push filing notifications. Old rows are pruned by ingestion.
+
+    Attributes:
+        id (int): Primary key, increasing, doubles as the SSE event id
+        company_id (int): Company of the statement
+        statement (str): Statement type, as in the API routes (e.g., income-statement)
+        date (Date): Fiscal year-end date of the statement
+        created_at (DateTime): When the statement was stored
+    """
+
+    __tablename__ = "filing_events"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    company_id = Column(Integer, ForeignKey(Company.id), nullable=False)
+    statement = Column(String(30), nullable=False)
+    date = Column(Date, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_filing_events_created_at", "created_at"),
+    )
@@ -1,5 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, BigInteger, Date, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, BigInteger, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+from mappers.field_map import Field, FieldMap, to_date, to_datetime, to_float, to_int, to_str
+from models.company import Company
 
 Base = declarative_base()
 
@@ -10,7 +15,8 @@ class IncomeStatement(Base):
 
     Attributes:
         id (int): Primary key
-        symbol (str): Company stock symbol
+        company_id (int): Company the statement belongs to
+        symbol (str): Company stock symbol, read through the company
         date (Date): Statement date
         revenue (int): Total company revenue
         gross_profit (int): Gross profit
@@ -23,7 +29,7 @@ class IncomeStatement(Base):
     __tablename__ = "income_statements"
 
     id = Column(Integer, primary_key=True, autoincrement=True, comment="Unique ID for each record")
-    symbol = Column(String(10), nullable=False, comment="Stock ticker symbol (e.g., AAPL)")
+    company_id = Column(Integer, ForeignKey(Company.id), nullable=False, comment="Company the statement belongs to")
     date = Column(Date, nullable=False, comment="Fiscal year-end date (e.g., 2024-09-28)")
     revenue = Column(BigInteger, nullable=False, comment="Total revenue or sales generated by the company")
     gross_profit = Column(BigInteger, nullable=False, comment="Gross profit (revenue - cost of goods sold)")
@@ -44,8 +50,11 @@ class IncomeStatement(Base):
     accepted_date = Column(DateTime, comment='Date when the financial report was accepted by the SEC')
     period = Column(String(5), comment='Reporting period, typically "FY" for fiscal year')
 
+    company = relationship(Company, lazy="joined", innerjoin=True)
+    symbol = association_proxy("company", "symbol")
+
     __table_args__ = (
-        UniqueConstraint('symbol', 'date', name='unique_symbol_date'),
+        UniqueConstraint('company_id', 'date', name='unique_company_date'),
     )
 
     def to_dict(self):
@@ -56,26 +65,30 @@ class IncomeStatement(Base):
             dict: Dictionary containing all income statement data with
                  dates converted to ISO format strings
         """
-        return {
-            'id': self.id,
-            'symbol': self.symbol,
-            'date': self.date.isoformat() if self.date else None,
-            'revenue': self.revenue,
-            'gross_profit': self.gross_profit,
-            'gross_profit_ratio': self.gross_profit_ratio,
-            'operating_income': self.operating_income,
-            'operating_income_ratio': self.operating_income_ratio,
-            'net_income': self.net_income,
-            'net_income_ratio': self.net_income_ratio,
-            'eps': self.eps,
-            'operating_expenses': self.operating_expenses,
-            'research_and_development_expenses': self.research_and_development_expenses,
-            'income_tax_expense': self.income_tax_expense,
-            'depreciation_and_amortization': self.depreciation_and_amortization,
-            'ebitda': self.ebitda,
-            'total_other_income_expenses_net': self.total_other_income_expenses_net,
-            'reported_currency': self.reported_currency,
-            'filling_date': self.filling_date.isoformat() if self.filling_date else None,
-            'accepted_date': self.accepted_date.isoformat() if self.accepted_date else None,
-            'period': self.period
-        }
\ No newline at end of file
+        return INCOME_STATEMENT_MAP.to_dict(self)
+
+
+# FMP key -> column -> coercion, compiled into the ingestion and output mappers,
+# fields with `company` are stored once per company in the companies dimension
+INCOME_STATEMENT_MAP = FieldMap(IncomeStatement, [
+    Field("symbol", "symbol", to_str, required=True, company="symbol"),
+    Field("date", "date", to_date, required=True),
+    Field("revenue", "revenue", to_int, required=True),
+    Field("grossProfit", "gross_profit", to_int, required=True),
+    Field("grossProfitRatio", "gross_profit_ratio", to_float),
+    Field("operatingIncome", "operating_income", to_int, required=True),
+    Field("operatingIncomeRatio", "operating_income_ratio", to_float),
+    Field("netIncome", "net_income", to_int, required=True),
+    Field("netIncomeRatio", "net_income_ratio", to_float),
+    Field("eps", "eps", to_float, required=True),
+    Field("operatingExpenses", "operating_expenses", to_int),
+    Field("researchAndDevelopmentExpenses", "research_and_development_expenses", to_int),
+    Field("incomeTaxExpense", "income_tax_expense", to_int),
+    Field("depreciationAndAmortization", "depreciation_and_amortization", to_int),
+    Field("ebitda", "ebitda", to_int),
+    Field("totalOtherIncomeExpensesNet", "total_other_income_expenses_net", to_int),
+    Field("reportedCurrency", "reported_currency", to_str),
+    Field("fillingDate", "filling_date", to_date),
+    Field("acceptedDate", "accepted_date", to_datetime),
+    Field("period", "period", to_str),
+], unique_columns=("company_id", "date"), companies=Company.__table__)
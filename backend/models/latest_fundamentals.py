@@ -0,0 +1,144 @@
+from sqlalchemy import Column, Integer, Float, BigInteger, Date, DateTime, ForeignKey, Index
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+from mappers.field_map import Field, FieldMap, to_date, to_datetime, to_float, to_int, to_str
+from models.balance_sheet_statement import BalanceSheetStatement
+from models.cash_flow_statement import CashFlowStatement
+from models.company import Company
+from models.income_statement import IncomeStatement
+
+Base = declarative_base()
+
+
+class LatestFundamentals(Base):
+    """
+    SQLAlchemy model for the materialized latest snapshot, one wide row per company holding
+    key metrics of its newest income, balance sheet and cash flow statements.
+
+    Rows are maintained by the statement handlers whenever they write, each statement type only
+    refreshes its own section (columns prefixed by the section date).
+
+    Attributes:
+        company_id (int): Primary key, company of the snapshot
+        symbol (str): Company stock symbol, read through the company
+        income_date (Date): Date of the newest income statement
+        balance_sheet_date (Date): Date of the newest balance sheet statement
+        cash_flow_date (Date): Date of the newest cash flow statement
+        version (int): Data version of the last refresh of the row, see services.data_version
+        ...etc
+    """
+
+    __tablename__ = "latest_fundamentals"
+
+    company_id = Column(Integer, ForeignKey(Company.id), primary_key=True, comment="Company of the snapshot")
+
+    # Income statement
+    income_date = Column(Date, comment="Fiscal year-end date of the newest income statement")
+    revenue = Column(BigInteger)
+    gross_profit = Column(BigInteger)
+    gross_profit_ratio = Column(Float)
+    operating_income = Column(BigInteger)
+    operating_income_ratio = Column(Float)
+    net_income = Column(BigInteger)
+    net_income_ratio = Column(Float)
+    ebitda = Column(BigInteger)
+    eps = Column(Float)
+
+    # Balance sheet
+    balance_sheet_date = Column(Date, comment="Fiscal year-end date of the newest balance sheet")
+    total_assets = Column(BigInteger)
+    total_liabilities = Column(BigInteger)
+    total_stockholders_equity = Column(BigInteger)
+    cash_and_cash_equivalents = Column(BigInteger)
+    total_debt = Column(BigInteger)
+    net_debt = Column(BigInteger)
+
+    # Cash flow
+    cash_flow_date = Column(Date, comment="Fiscal year-end date of the newest cash flow statement")
+    operating_cash_flow = Column(BigInteger)
+    capital_expenditure = Column(BigInteger)
+    free_cash_flow = Column(BigInteger)
+    dividends_paid = Column(BigInteger)
+    common_stock_repurchased = Column(BigInteger)
+
+    updated_at = Column(DateTime, comment="Last time any section of the row was refreshed")
+    version = Column(BigInteger, comment="Data version of the last refresh of the row, see data_version")
+
+    company = relationship(Company, lazy="joined", innerjoin=True)
+    symbol = association_proxy("company", "symbol")
+
+    __table_args__ = (
+        Index("idx_latest_revenue", "revenue"),
+        Index("idx_latest_net_income", "net_income"),
+        Index("idx_latest_total_assets", "total_assets"),
+        Index("idx_latest_free_cash_flow", "free_cash_flow"),
+        Index("idx_latest_updated_at", "updated_at"),
+        Index("idx_latest_version", "version"),
+    )
+
+    def to_dict(self):
+        return LATEST_FUNDAMENTALS_MAP.to_dict(self)
+
+
+LATEST_FUNDAMENTALS_MAP = FieldMap(LatestFundamentals, [
+    Field("symbol", coerce=to_str, company="symbol"),
+    Field("income_date", coerce=to_date),
+    Field("revenue", coerce=to_int),
+    Field("gross_profit", coerce=to_int),
+    Field("gross_profit_ratio", coerce=to_float),
+    Field("operating_income", coerce=to_int),
+    Field("operating_income_ratio", coerce=to_float),
+    Field("net_income", coerce=to_int),
+    Field("net_income_ratio", coerce=to_float),
+    Field("ebitda", coerce=to_int),
+    Field("eps", coerce=to_float),
+    Field("balance_sheet_date", coerce=to_date),
+    Field("total_assets", coerce=to_int),
+    Field("total_liabilities", coerce=to_int),
+    Field("total_stockholders_equity", coerce=to_int),
+    Field("cash_and_cash_equivalents", coerce=to_int),
+    Field("total_debt", coerce=to_int),
+    Field("net_debt", coerce=to_int),
+    Field("cash_flow_date", coerce=to_date),
+    Field("operating_cash_flow", coerce=to_int),
+    Field("capital_expenditure", coerce=to_int),
+    Field("free_cash_flow", coerce=to_int),
+    Field("dividends_paid", coerce=to_int),
+    Field("common_stock_repurchased", coerce=to_int),
+    Field("updated_at", coerce=to_datetime),
+], unique_columns=("company_id",), primary_key=None, companies=Company.__table__)
+
+# statement model -> {snapshot column: statement column}, the first entry is the section date
+SECTIONS = {
+    IncomeStatement: {
+        "income_date": IncomeStatement.date,
+        "revenue": IncomeStatement.revenue,
+        "gross_profit": IncomeStatement.gross_profit,
+        "gross_profit_ratio": IncomeStatement.gross_profit_ratio,
+        "operating_income": IncomeStatement.operating_income,
+        "operating_income_ratio": IncomeStatement.operating_income_ratio,
+        "net_income": IncomeStatement.net_income,
+        "net_income_ratio": IncomeStatement.net_income_ratio,
+        "ebitda": IncomeStatement.ebitda,
+        "eps": IncomeStatement.eps,
+    },
+    BalanceSheetStatement: {
+        "balance_sheet_date": BalanceSheetStatement.date,
+        "total_assets": BalanceSheetStatement.totalAssets,
+        "total_liabilities": BalanceSheetStatement.totalLiabilities,
+        "total_stockholders_equity": BalanceSheetStatement.totalStockholdersEquity,
+        "cash_and_cash_equivalents": BalanceSheetStatement.cashAndCashEquivalents,
+        "total_debt": BalanceSheetStatement.totalDebt,
+        "net_debt": BalanceSheetStatement.netDebt,
+    },
+    CashFlowStatement: {
+        "cash_flow_date": CashFlowStatement.date,
+        "operating_cash_flow": CashFlowStatement.operating_cash_flow,
+        "capital_expenditure": CashFlowStatement.capital_expenditure,
+        "free_cash_flow": CashFlowStatement.free_cash_flow,
+        "dividends_paid": CashFlowStatement.dividends_paid,
+        "common_stock_repurchased": CashFlowStatement.common_stock_repurchased,
+    },
+}
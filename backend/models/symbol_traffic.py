@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class SymbolTraffic(Base):
+    """
+    SQLAlchemy model for the daily request counts per symbol, written by the web app and read by the
+    warmup stage of ingestion to pick the symbols worth precomputing.
+
+    Attributes:
+        day (Date): Day of the requests, part of the primary key
+        symbol (str): Requested symbol, part of the primary key
+        hits (int): Successful requests of the symbol that day
+    """
+
+    __tablename__ = "symbol_traffic"
+
+    day = Column(Date, primary_key=True, comment="Day of the requests")
+    symbol = Column(String(10), primary_key=True, comment="Requested stock ticker symbol")
+    hits = Column(Integer, nullable=False, default=0, comment="Successful requests of the symbol that day")
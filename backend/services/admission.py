@@ -0,0 +1,128 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# priority classes: cheap lookups of one company, expensive screens over all companies
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+
+class Overloaded(Exception):
+    """
+    a request refused by admission control
+
+    Attributes:
+        status: 429 when the client is over its rate, 503 when the service is over capacity
+        retry_after: whole seconds the client should wait before retrying
+    """
+
+    def __init__(self, message, status, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Decides which requests run when the API is under more load than the database can take, and
+    refuses the others right away instead of letting every request queue until gunicorn times out.
+
+    Two checks:
+    - rate: every client has a token bucket of `burst` tokens refilled at `rate` tokens per second,
+      a request takes `costs[priority]` tokens. an empty bucket refuses with 429.
+    - capacity: at most `limits[priority]` queries run at once, counting the running queries of every
+      class. the cheap class gets all slots, expensive screens only part of them, so a burst of screens
+      never takes the slots of the single company lookups. a request waits at most `queue_seconds`
+      for a slot, then is refused with 503. the wait bounds the latency of every admitted request.
+
+    Attributes:
+        __buckets: {client: (tokens, refill timestamp)}, least recently seen first
+        __in_flight: number of admitted requests running
+    """
+
+    MAX_CLIENTS = 10000
+
+    def __init__(self, rate, burst, limits, costs, queue_seconds):
+        """
+        :param rate: tokens refilled per client per second
+        :param burst: tokens of a full bucket
+        :param limits: {priority: running requests at most}
+        :param costs: {priority: tokens taken per request}
+        :param queue_seconds: longest wait for a free slot
+        """
+        self.__rate = rate
+        self.__burst = burst
+        self.__limits = limits
+        self.__costs = {priority: min(cost, burst) for priority, cost in costs.items()}
+        self.__queue_seconds = queue_seconds
+        self.__lock = threading.Lock()
+        self.__slots = threading.Condition(self.__lock)
+        self.__buckets = OrderedDict()
+        self.__in_flight = 0
+        self.__counters = {priority: {"admitted": 0, "rate_limited": 0, "shed": 0} for priority in limits}
+
+    def check_rate(self, client, priority):
+        """
+        take the tokens of one request from the client's bucket
+
+        :param client: client identity, e.g. its address
+        :param priority: CHEAP or EXPENSIVE
+        :raise Overloaded: 429 when the bucket holds too few tokens
+        """
+        cost = self.__costs[priority]
+        now = time.monotonic()
+        with self.__lock:
+            tokens, stamp = self.__buckets.pop(client, (self.__burst, now))
+            tokens = min(self.__burst, tokens + (now - stamp) * self.__rate)
+            enough = tokens >= cost
+            if enough:
+                tokens -= cost
+            else:
+                self.__counters[priority]["rate_limited"] += 1
+            self.__buckets[client] = (tokens, now)
+            if len(self.__buckets) > self.MAX_CLIENTS:
+                self.__buckets.popitem(last=False)
+        if not enough:
+            raise Overloaded("Too many requests", 429, math.ceil((cost - tokens) / self.__rate))
+
+    @contextmanager
+    def slot(self, priority):
+        """
+        hold one of the concurrent query slots of `priority` while the block runs
+
+        :param priority: CHEAP or EXPENSIVE
+        :raise Overloaded: 503 when no slot frees up within queue_seconds
+        """
+        limit = self.__limits[priority]
+        deadline = time.monotonic() + self.__queue_seconds
+        with self.__slots:
+            while self.__in_flight >= limit:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.__counters[priority]["shed"] += 1
+                    raise Overloaded("Service over capacity", 503, 1)
+                self.__slots.wait(remaining)
+            self.__in_flight += 1
+            self.__counters[priority]["admitted"] += 1
+        try:
+            yield
+        finally:
+            with self.__slots:
+                self.__in_flight -= 1
+                # waiters of both classes, a freed slot may fit either
+                self.__slots.notify_all()
+
+    def stats(self):
+        """
+        :return: dict with the running requests, the slot limits and the admitted / rate limited /
+                 shed counters per priority
+        """
+        with self.__lock:
+            return {
+                "in_flight": self.__in_flight,
+                "clients": len(self.__buckets),
+                "limits": dict(self.__limits),
+                "by_priority": {priority: dict(counters) for priority, counters in self.__counters.items()},
+            }
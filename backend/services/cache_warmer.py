@@ -0,0 +1,129 @@
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from flask import request
+from sqlalchemy import delete, func, select
+
+import database
+from blueprints.response_cache import cache_key
+from handlers.upsert import upsert
+from models.cached_response import CachedResponse
+from models.company import Company
+from models.latest_fundamentals import LatestFundamentals
+from models.symbol_traffic import SymbolTraffic
+from services.data_version import data_version
+
+# reads of one company warmed per symbol
+SYMBOL_PATHS = ("/api/income-statement", "/api/balance-sheet-statement", "/api/cash-flow-statement",
+                "/api/latest-fundamentals")
+STATEMENTS = ("income-statement", "balance-sheet-statement", "cash-flow-statement")
+
+
+class CacheWarmer:
+    """
+    Warmup stage of ingestion: precomputes the responses the first requests after a refresh would ask
+    for, and stores them in the response cache for the data version they were computed from.
+
+    Responses are rendered by the API's own views, so they are the bytes the API would have sent, and by
+    up to `workers` threads at once. The views run without the API's coalescing and admission control,
+    `workers` is the only cap. Responses of older data versions and traffic older than `traffic_days` are
+    deleted.
+
+    Warmed reads:
+    - the first page of every statement and the latest fundamentals of the `top` most requested symbols
+      of the last `traffic_days` days, topped up with the companies with the largest revenue
+    - the first page of the latest year screen sorted by each of `screen_sorts`
+    - the distribution stats of every statement table
+
+    Attributes:
+        __app: Flask app rendering the responses, reading from the primary so no replica lag is cached
+        __session: SQLAlchemy session bound to the primary
+    """
+
+    def __init__(self, app, session, workers=8, top=200, traffic_days=7, screen_sorts=("revenue",)):
+        self.__app = app
+        self.__session = session
+        self.__workers = workers
+        self.__top = top
+        self.__traffic_days = traffic_days
+        self.__screen_sorts = screen_sorts
+
+    def top_symbols(self):
+        """
+        :return: up to `top` symbols, most requested first, then by revenue
+        """
+        since = date.today() - timedelta(days=self.__traffic_days)
+        hits = func.sum(SymbolTraffic.hits)
+        requested = self.__session.execute(
+            select(SymbolTraffic.symbol)
+            .join(Company, Company.symbol == SymbolTraffic.symbol)
+            .where(SymbolTraffic.day >= since)
+            .group_by(SymbolTraffic.symbol)
+            .order_by(hits.desc())
+            .limit(self.__top)
+        ).scalars().all()
+        largest = self.__session.execute(
+            select(Company.symbol)
+            .select_from(LatestFundamentals)
+            .join(Company, Company.id == LatestFundamentals.company_id)
+            .order_by(LatestFundamentals.revenue.desc())
+            .limit(self.__top)
+        ).scalars().all()
+        return list(dict.fromkeys(requested + largest))[:self.__top]
+
+    def targets(self):
+        """
+        :return: list of (path, query args) to warm
+        """
+        targets = [(path, {"symbol": symbol}) for symbol in self.top_symbols() for path in SYMBOL_PATHS]
+        targets += [("/api/latest-fundamentals", {"sort": sort}) for sort in self.__screen_sorts]
+        targets += [("/api/stats", {"statement": statement}) for statement in STATEMENTS]
+        return targets
+
+    def run(self):
+        """
+        warm the response cache for the current data version
+
+        :return: number of responses stored
+        """
+        version = data_version(self.__session)
+        if not version:
+            return 0
+        targets = self.targets()
+        self.__session.rollback()
+
+        with ThreadPoolExecutor(max_workers=self.__workers) as pool:
+            rendered = [row for row in pool.map(lambda target: self.__render(*target), targets) if row]
+
+        now = datetime.utcnow()
+        for row in rendered:
+            row.update(data_version=version, created_at=now)
+        upsert(self.__session, CachedResponse.__table__, rendered, key_columns=("key",),
+               update_columns=("body", "data_version", "created_at"))
+        self.__session.execute(delete(CachedResponse).where(CachedResponse.data_version != version))
+        self.__session.execute(delete(SymbolTraffic)
+                               .where(SymbolTraffic.day < date.today() - timedelta(days=self.__traffic_days)))
+        self.__session.commit()
+        return len(rendered)
+
+    def __render(self, path, args):
+        """
+        :return: {key, body} of the response of a GET request, None unless it succeeded
+        """
+        with self.__app.test_request_context(path, query_string=args):
+            try:
+                view = inspect.unwrap(self.__app.view_functions[request.endpoint])
+                response = self.__app.make_response(view())
+            except Exception as e:
+                print(f"Could not warm {path} {args}: {e}")
+                return None
+            finally:
+                database.close_read_session()
+            if response.status_code != 200 or response.mimetype != "application/json":
+                return None
+            # some routes report handler errors with a 200
+            body = response.get_json()
+            if isinstance(body, dict) and "error" in body:
+                return None
+            return {"key": cache_key(), "body": response.get_data(as_text=True)}
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from sqlalchemy import select
+
+from database import query_budget
+from models.company import Company
+from models.data_version import DataVersion
+from models.latest_fundamentals import LatestFundamentals
+
+
+def data_version(session):
+    """
+    version of the stored statements: the statement handlers increment the data_version counter in the
+    transaction of every write, and stamp the snapshot rows they refresh with the new value.
+
+    Writers hold the counter's row lock until they commit, so versions are committed in order: once a
+    reader sees version N, every row stamped with N or less is visible to it, and incremental reloads
+    can follow `latest_fundamentals.version > watermark` without missing a write.
+
+    :param session: SQLAlchemy session
+    :return: int, 0 before the first write, None while the counter row does not exist
+    """
+    return session.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar()
+
+
+class VersionedSnapshot:
+    """
+    Keeps an in-memory view of the company universe in step with the statement tables through the
+    data version, for the services answering from memory (rankings, peers).
+
+    The first sync loads every company, later ones only the companies whose latest_fundamentals row
+    was stamped since the last watermark, plus the companies whose row was deleted.
+
+    Attributes:
+        lock: held while the view is reloaded, callers changing it outside `sync()` take it too
+        __session: SQLAlchemy session of the owning service, its read transaction ends after every sync
+        __reload: callable(symbols), (re)loads the set of symbols, None the whole universe; a symbol
+                  without data any more must leave the view
+        __loaded: callable returning the symbols currently in the view
+        __interval: minimum number of seconds between two syncs
+        __watermark: data version already loaded
+    """
+
+    def __init__(self, session, reload, loaded, interval=60):
+        self.__session = session
+        self.__reload = reload
+        self.__loaded = loaded
+        self.__interval = interval
+        self.__watermark = None
+        self.__synced_at = None
+        self.lock = threading.Lock()
+
+    def sync(self, force=False):
+        """
+        load the universe on first use, afterwards reload the companies changed or deleted since the last sync
+
+        :param force: ignore the sync interval
+        :return: None
+        """
+        if not force and self.__synced_at and time.monotonic() - self.__synced_at < self.__interval:
+            return
+
+        with self.lock:
+            if not force and self.__synced_at and time.monotonic() - self.__synced_at < self.__interval:
+                return
+
+            # loading the universe is a bulk job, it runs outside the request's query budget
+            with query_budget():
+                watermark = data_version(self.__session)
+                if self.__watermark is None:
+                    self.__reload(None)
+                elif watermark is not None and watermark > self.__watermark:
+                    symbols = (select(Company.symbol)
+                               .select_from(LatestFundamentals)
+                               .join(Company, Company.id == LatestFundamentals.company_id))
+                    changed = set(self.__session.execute(symbols.where(LatestFundamentals.version > self.__watermark))
+                                  .scalars())
+                    # companies whose snapshot row was deleted leave no stamped row behind, reloading them
+                    # drops them from the view
+                    changed |= set(self.__loaded()) - set(self.__session.execute(symbols).scalars())
+                    if changed:
+                        self.__reload(changed)
+            # end the read transaction so the next sync sees fresh data
+            self.__session.rollback()
+            self.__watermark = watermark or self.__watermark
+            self.__synced_at = time.monotonic()
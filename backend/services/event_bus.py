@@ -0,0 +1,92 @@
+import threading
+from collections import deque
+
+
+class Subscription:
+    """
+    bounded buffer of one subscriber. when the subscriber falls behind, the oldest events are dropped
+    so a slow client never holds memory or blocks the publisher
+
+    Attributes:
+        dropped: number of events dropped since the subscription started
+    """
+
+    def __init__(self, bus, maxsize):
+        self.__bus = bus
+        self.__events = deque(maxlen=maxsize)
+        self.__ready = threading.Condition()
+        self.__closed = False
+        self.dropped = 0
+
+    def put(self, event):
+        with self.__ready:
+            if len(self.__events) == self.__events.maxlen:
+                self.dropped += 1
+            self.__events.append(event)
+            self.__ready.notify()
+
+    def get(self, timeout=None):
+        """
+        wait for events
+
+        :param timeout: seconds to wait, None waits until an event arrives
+        :return: list of the buffered events, oldest first, empty on timeout or once closed
+        """
+        with self.__ready:
+            if not self.__events and not self.__closed:
+                self.__ready.wait(timeout)
+            events = list(self.__events)
+            self.__events.clear()
+            return events
+
+    def close(self):
+        self.__bus.unsubscribe(self)
+        with self.__ready:
+            self.__closed = True
+            self.__ready.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus:
+    """
+    in-process publish/subscribe. publishing never blocks: every subscriber has its own bounded
+    buffer with drop-oldest semantics
+    """
+
+    def __init__(self, maxsize=256):
+        self.__maxsize = maxsize
+        self.__subscriptions = set()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__subscriptions)
+
+    def subscribe(self, maxsize=None):
+        """
+        :param maxsize: buffer size of the subscriber, default the bus' maxsize
+        :return: Subscription, close it (or use it as a context manager) to unsubscribe
+        """
+        subscription = Subscription(self, maxsize or self.__maxsize)
+        with self.__lock:
+            self.__subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.__lock:
+            self.__subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """
+        :param event: any object, delivered as is to every subscriber
+        :return: number of subscribers the event was delivered to
+        """
+        with self.__lock:
+            subscriptions = list(self.__subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+        return len(subscriptions)
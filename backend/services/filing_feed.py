@@ -0,0 +1,100 @@
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from handlers.filing_event_handler import FilingEventHandler
+from services.event_bus import EventBus
+
+
+class FilingFeed:
+    """
+    Publishes the filing events recorded by ingestion to an in-process EventBus.
+
+    Ingestion runs in its own process, so the feed tails the `filing_events` outbox: one thread per
+    web process polls it by id every `interval` seconds while anyone is subscribed, however many
+    clients are connected. Events recorded while nobody listens are skipped, reconnecting clients
+    catch up with `replay`.
+
+    An event id is allocated when a writer inserts it but only visible once the writer commits, so
+    with concurrent writers a lower id can appear after a higher one was read. Every poll re-reads
+    the last TAIL ids and publishes the ones not published yet; an event committed more than TAIL
+    ids late is missed.
+
+    Attributes:
+        bus: EventBus the events are published to, as dicts with id, symbol, statement and date
+        __session: SQLAlchemy session for MySQL database connection
+        __interval: seconds between two polls
+        __last_id: highest id read, None while nobody is subscribed
+        __published: ids within TAIL of __last_id already published
+    """
+
+    TAIL = 100
+
+    def __init__(self, session, interval=1.0, buffer_size=256):
+        self.bus = EventBus(buffer_size)
+        self.__session = session
+        self.__events = FilingEventHandler(session)
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__last_id = None
+        self.__published = set()
+
+    def subscribe(self):
+        """
+        :return: Subscription to the feed, starts the polling thread on first use
+        """
+        subscription = self.bus.subscribe()
+        with self.__lock:
+            if self.__last_id is None:
+                # start from now, history is only served through replay
+                try:
+                    self.__last_id = self.__events.latest_id()
+                    self.__published = {event["id"] for event in self.__tail()}
+                finally:
+                    self.__session.rollback()
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name="filing-feed", daemon=True)
+                self.__thread.start()
+        return subscription
+
+    def replay(self, after_id, limit=256):
+        """
+        events recorded after the given id, for clients reconnecting with Last-Event-ID
+
+        :param after_id: id of the last event the client received
+        :param limit: maximum number of events
+        :return: list of events, oldest first
+        """
+        with self.__lock:
+            try:
+                return self.__events.since(after_id, limit)
+            finally:
+                self.__session.rollback()
+
+    def __run(self):
+        while True:
+            time.sleep(self.__interval)
+            with self.__lock:
+                try:
+                    self.__poll()
+                except SQLAlchemyError as e:
+                    print("Filing feed poll failed:", e)
+                finally:
+                    # end the read transaction, so the next poll sees new events
+                    self.__session.rollback()
+
+    def __poll(self):
+        if not len(self.bus) or self.__last_id is None:
+            self.__last_id = None
+            return
+        for event in self.__tail():
+            if event["id"] not in self.__published:
+                self.bus.publish(event)
+                self.__published.add(event["id"])
+            self.__last_id = max(self.__last_id, event["id"])
+        self.__published = {id for id in self.__published if id > self.__last_id - self.TAIL}
+
+    def __tail(self):
+        return self.__events.since(max(self.__last_id - self.TAIL, 0))
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from sqlalchemy import select
+
+from database import query_budget
+from mappers.field_map import to_float, to_int
+from models.balance_sheet_statement import BALANCE_SHEET_MAP
+from models.cash_flow_statement import CASH_FLOW_MAP
+from models.income_statement import INCOME_STATEMENT_MAP
+from services.data_version import data_version
+
+# statement name, as in the API routes -> field map of its table
+STATEMENTS = {
+    "income-statement": INCOME_STATEMENT_MAP,
+    "balance-sheet-statement": BALANCE_SHEET_MAP,
+    "cash-flow-statement": CASH_FLOW_MAP,
+}
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# numeric columns that are labels rather than metrics
+_NOT_METRICS = {"calendarYear", "calendar_year"}
+
+# version of a service that never checked the data version, distinct from None (no data stored)
+_NEVER = object()
+
+
+def metric_columns(field_map):
+    """
+    :param field_map: FieldMap of a statement table
+    :return: names of the numeric metric columns, in field map order
+    """
+    return tuple(field.column for field in field_map.fields
+                 if field.coerce in (to_int, to_float) and field.column not in _NOT_METRICS)
+
+
+def distribution(values, bins=20):
+    """
+    summary of one metric column
+
+    :param values: float64 NumPy array, missing values already dropped
+    :param bins: number of equal width histogram buckets between min and max
+    :return: dict with count, min, max, mean, quantiles {p5, p25, p50, p75, p95} and histogram {edges, counts}
+    """
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return {"count": 0, "min": None, "max": None, "mean": None, "quantiles": None, "histogram": None}
+
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "count": int(len(values)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "quantiles": {f"p{round(q * 100)}": float(v) for q, v in zip(QUANTILES, np.quantile(values, QUANTILES))},
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+    }
+
+
+class MetricStatsService:
+    """
+    Per column distributions (min / max / quantiles / histogram) of the statement tables, for one symbol
+    or the whole universe, so the UI can size its filter sliders from one small response.
+
+    A table is loaded with one SELECT and summarized column by column with NumPy. Results are cached
+    per data version (services.data_version), which is checked at most once every `interval` seconds;
+    a new version drops the whole cache. Summaries are computed outside the lock guarding the cache, and
+    the universe summaries are usually precomputed by the warmup stage of ingestion anyway.
+
+    Attributes:
+        __session: thread-local SQLAlchemy session, summaries of different requests are computed concurrently
+        __interval: minimum number of seconds between two data version checks
+        __cache: {(statement, symbol, bins): stats}, least recently used first
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self, session, interval=60):
+        self.__session = session
+        self.__interval = interval
+        self.__cache = OrderedDict()
+        self.__version = _NEVER
+        self.__checked_at = None
+        self.__lock = threading.Lock()
+
+    def stats(self, statement, symbol=None, bins=20):
+        """
+        :param statement: income-statement, balance-sheet-statement or cash-flow-statement
+        :param symbol: company symbol, None summarizes every company
+        :param bins: number of histogram buckets per metric
+        :return: dict with the row count, date range and {metric column: distribution}
+        """
+        field_map = STATEMENTS.get(statement)
+        if field_map is None:
+            raise ValueError(f"Unsupported statement: {statement}")
+        if not 1 <= bins <= 100:
+            raise ValueError("bins must be between 1 and 100")
+
+        key = (statement, symbol, bins)
+        version = self.__check_version()
+        with self.__lock:
+            result = self.__cache.get(key)
+            if result is not None:
+                self.__cache.move_to_end(key)
+
+        if result is None:
+            # computed outside the lock, so one slow summary never holds up the cached lookups
+            result = self.__compute(field_map, symbol, bins)
+            with self.__lock:
+                # a result of a data version the cache was dropped for is not kept
+                if version == self.__version:
+                    self.__cache[key] = result
+                    if len(self.__cache) > self.MAX_ENTRIES:
+                        self.__cache.popitem(last=False)
+
+        if not result["count"]:
+            raise LookupError(f"No {statement} data for {symbol}" if symbol else f"No {statement} data")
+        return result
+
+    def __check_version(self):
+        """
+        :return: the current data version, read from the database at most once every `interval` seconds
+        """
+        now = time.monotonic()
+        if self.__checked_at and now - self.__checked_at < self.__interval:
+            return self.__version
+        with query_budget():
+            version = data_version(self.__session)
+        self.__session.rollback()
+        with self.__lock:
+            self.__checked_at = now
+            if version != self.__version:
+                self.__version = version
+                self.__cache.clear()
+        return version
+
+    def __compute(self, field_map, symbol, bins):
+        columns = metric_columns(field_map)
+        table = field_map.table
+        stmt = select(table.c.date, *[table.c[column] for column in columns])
+        if symbol:
+            companies = field_map.companies
+            stmt = (stmt.join_from(table, companies, table.c.company_id == companies.c.id)
+                    .where(companies.c.symbol == symbol))
+
+        # summarizing the universe is a bulk read, it runs outside the request's query budget
+        with query_budget():
+            rows = self.__session.execute(stmt).all()
+        self.__session.rollback()
+
+        data = np.array(rows, dtype=object).reshape(len(rows), len(columns) + 1)
+        dates = [d for d in data[:, 0] if d is not None]
+        metrics = {}
+        for index, column in enumerate(columns, start=1):
+            values = data[:, index]
+            metrics[column] = distribution(values[values != None].astype(np.float64), bins)   # noqa: E711
+
+        return {
+            "symbol": symbol,
+            "count": len(rows),
+            "date": {
+                "min": min(dates).isoformat() if dates else None,
+                "max": max(dates).isoformat() if dates else None,
+            },
+            "metrics": metrics,
+        }
@@ -0,0 +1,119 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def frame_name(frame):
+    """
+    :return: "module:function" of a stack frame, without the ";" and " " of the folded stack format
+    """
+    code = frame.f_code
+    # co_qualname (with the class name) is Python 3.11+
+    name = f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+    return name.replace(";", ",").replace(" ", "_")
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler of the next N requests of the process.
+
+    Once started, the threads serving the next `requests` requests are tracked, and a sampler thread
+    records their Python stacks every `interval` seconds through sys._current_frames(). Untracked
+    threads, e.g. other requests or SSE streams, are never sampled. Since nothing is traced, the
+    requests run at full speed.
+
+    The report is in folded stack format, one "outer;...;inner count" line per distinct stack, as read
+    by flamegraph.pl, speedscope and most flame graph viewers.
+
+    Attributes:
+        __remaining: requests still to track
+        __threads: ids of the threads serving a tracked request
+        __stacks: Counter of the sampled stacks, root first
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__running = False
+        self.__remaining = 0
+        self.__threads = set()
+        self.__stacks = Counter()
+        self.__samples = 0
+        self.__done = threading.Event()
+
+    def start(self, requests, interval=0.005):
+        """
+        track the next `requests` requests
+
+        :param requests: number of requests to profile
+        :param interval: seconds between two samples
+        :raise RuntimeError: if a profile is already running
+        """
+        with self.__lock:
+            if self.__running:
+                raise RuntimeError("A profile is already running")
+            self.__running = True
+            self.__remaining = requests
+            self.__threads = set()
+            self.__stacks = Counter()
+            self.__samples = 0
+            self.__done = threading.Event()
+        threading.Thread(target=self.__sample, args=(interval, self.__done), name="profiler", daemon=True).start()
+
+    def enter(self):
+        """
+        called by every request when it starts, tracks it if the profile still needs requests
+        """
+        with self.__lock:
+            if self.__remaining > 0:
+                self.__remaining -= 1
+                self.__threads.add(threading.get_ident())
+
+    def exit(self):
+        """
+        called by every request when it ends
+        """
+        with self.__lock:
+            if self.__running and threading.get_ident() in self.__threads:
+                self.__threads.discard(threading.get_ident())
+                if not self.__remaining and not self.__threads:
+                    self.__done.set()
+
+    def wait(self, timeout):
+        """
+        wait for the tracked requests to end, or for `timeout` seconds, then stop the profile
+
+        :return: dict with the requests profiled, the number of samples and the folded stacks
+        """
+        self.__done.wait(timeout)
+        with self.__lock:
+            requested_left, unfinished = self.__remaining, len(self.__threads)
+            self.__remaining = 0
+            self.__threads = set()
+            self.__running = False
+            self.__done.set()
+            stacks, samples = self.__stacks, self.__samples
+        return {
+            "samples": samples,
+            "unfinished": unfinished,
+            "untracked": requested_left,
+            "folded": "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()),
+        }
+
+    def __sample(self, interval, done):
+        me = threading.get_ident()
+        while not done.is_set():
+            frames = sys._current_frames()
+            with self.__lock:
+                for ident in self.__threads:
+                    frame = frames.get(ident)
+                    if frame is None or ident == me:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(frame_name(frame))
+                        frame = frame.f_back
+                    self.__stacks[";".join(reversed(stack))] += 1
+                    self.__samples += 1
+            del frames
+            time.sleep(interval)
@@ -0,0 +1,230 @@
+import numpy as np
+from sqlalchemy import Float, and_, cast, func, select
+
+from database import query_budget
+from models.balance_sheet_statement import BalanceSheetStatement
+from models.cash_flow_statement import CashFlowStatement
+from models.company import Company
+from models.income_statement import IncomeStatement
+from services.data_version import VersionedSnapshot
+
+
+def _ratio(numerator, denominator):
+    return cast(numerator, Float) / func.nullif(denominator, 0)
+
+
+# source query -> {metric name: value expression}, one SELECT per source loads all of its metrics
+SOURCES = {
+    "income": (IncomeStatement, None, {
+        "revenue": IncomeStatement.revenue,
+        "net_income": IncomeStatement.net_income,
+        "eps": IncomeStatement.eps,
+        "gross_margin": IncomeStatement.gross_profit_ratio,
+        "operating_margin": IncomeStatement.operating_income_ratio,
+        "net_margin": IncomeStatement.net_income_ratio,
+    }),
+    "balance_sheet": (BalanceSheetStatement, None, {
+        "total_assets": BalanceSheetStatement.totalAssets,
+        "debt_to_equity": _ratio(BalanceSheetStatement.totalDebt, BalanceSheetStatement.totalStockholdersEquity),
+    }),
+    "cash_flow": (CashFlowStatement, None, {
+        "free_cash_flow": CashFlowStatement.free_cash_flow,
+        "operating_cash_flow": CashFlowStatement.operating_cash_flow,
+    }),
+    # metrics mixing two statements of the same fiscal year end
+    "cash_flow_income": (CashFlowStatement, IncomeStatement, {
+        "fcf_margin": _ratio(CashFlowStatement.free_cash_flow, IncomeStatement.revenue),
+    }),
+}
+
+METRICS = tuple(metric for _, _, metrics in SOURCES.values() for metric in metrics)
+
+
+class _Bucket:
+    """
+    values of one metric in one fiscal year, sorted ascending, with the symbols in the same order
+
+    Attributes:
+        values: float64 NumPy array, ascending
+        symbols: object NumPy array aligned with values
+        by_symbol: {symbol: value}
+    """
+
+    __slots__ = ("values", "symbols", "by_symbol")
+
+    def __init__(self, by_symbol):
+        self.by_symbol = by_symbol
+        symbols = np.array(list(by_symbol), dtype=object)
+        values = np.fromiter(by_symbol.values(), dtype=np.float64, count=len(by_symbol))
+        order = np.argsort(values, kind="stable")
+        self.values = values[order]
+        self.symbols = symbols[order]
+
+    def __len__(self):
+        return len(self.values)
+
+    def position(self, value):
+        """number of companies whose value is <= the given one, O(log n)"""
+        return int(np.searchsorted(self.values, value, side="right"))
+
+
+class RankingService:
+    """
+    In-memory rank / percentile / top-N over the whole company universe, per metric and fiscal year.
+
+    Every (metric, year) pair is a sorted NumPy array, so rank and percentile are one binary search.
+    The service follows the statement tables through the data version, which the statement handlers
+    increment on every write and stamp on the snapshot rows they refresh (services.data_version):
+    `sync()` reloads only the symbols stamped since the last watermark and re-sorts only the buckets
+    they belong to.
+
+    Attributes:
+        __session: SQLAlchemy session for MySQL database connection
+        __buckets: {metric: {year: _Bucket}}
+        __symbols: symbols with at least one value in __buckets
+        __snapshot: VersionedSnapshot following the data version
+    """
+
+    def __init__(self, session, interval=60):
+        self.__session = session
+        self.__buckets = {metric: {} for metric in METRICS}
+        self.__symbols = set()
+        self.__snapshot = VersionedSnapshot(session, self.__load, lambda: self.__symbols, interval=interval)
+
+    def sync(self, force=False):
+        """
+        load the universe on first use, afterwards reload the symbols changed or deleted since the last sync
+
+        :param force: ignore the sync interval
+        :return: None
+        """
+        self.__snapshot.sync(force)
+
+    def refresh(self, symbols):
+        """
+        reload the given symbols right away, for callers that just wrote their statements
+
+        :param symbols: iterable of symbols
+        :return: None
+        """
+        with self.__snapshot.lock, query_budget():
+            self.__load(set(symbols))
+
+    def years(self, metric):
+        """
+        :param metric: metric name
+        :return: fiscal years with data for the metric, ascending
+        """
+        self.__check(metric)
+        return sorted(self.__buckets[metric])
+
+    def rank(self, metric, symbol, year=None, peers=None):
+        """
+        rank of a company on a metric, 1 being the highest value, ties share the best rank
+
+        :param metric: metric name, one of METRICS
+        :param symbol: company symbol
+        :param year: fiscal year, default the newest year the company has the metric for
+        :param peers: optional list of symbols, ranks the company within them instead of the universe
+        :return: dict with value, rank, count and percentile (share of companies at or below the value)
+        """
+        self.__check(metric)
+        buckets = self.__buckets[metric]
+        if year is None:
+            year = max((y for y, bucket in buckets.items() if symbol in bucket.by_symbol), default=None)
+        bucket = buckets.get(year)
+        if bucket is None or symbol not in bucket.by_symbol:
+            raise LookupError(f"No {metric} for {symbol} in {year or 'any year'}")
+
+        value = bucket.by_symbol[symbol]
+        if peers:
+            group = np.array([bucket.by_symbol[peer] for peer in set(peers) | {symbol} if peer in bucket.by_symbol])
+            count, below = len(group), int(np.count_nonzero(group <= value))
+        else:
+            count, below = len(bucket), bucket.position(value)
+
+        return {
+            "symbol": symbol,
+            "metric": metric,
+            "year": year,
+            "value": value,
+            "rank": count - below + 1,
+            "count": count,
+            "percentile": round(below / count * 100, 2)
+        }
+
+    def top(self, metric, year=None, n=10, ascending=False):
+        """
+        :param metric: metric name, one of METRICS
+        :param year: fiscal year, default the newest year with data
+        :param n: number of companies, 1 to 100
+        :param ascending: lowest values first instead of highest
+        :return: dict with the year and a list of {symbol, value}
+        """
+        self.__check(metric)
+        if not 1 <= n <= 100:
+            raise ValueError("top must be between 1 and 100")
+        buckets = self.__buckets[metric]
+        year = year if year is not None else max(buckets, default=None)
+        bucket = buckets.get(year)
+        if bucket is None:
+            raise LookupError(f"No {metric} data for {year or 'any year'}")
+
+        symbols, values = (bucket.symbols, bucket.values) if ascending else (bucket.symbols[::-1], bucket.values[::-1])
+        return {
+            "metric": metric,
+            "year": year,
+            "count": len(bucket),
+            "data": [{"symbol": s, "value": float(v)} for s, v in zip(symbols[:n], values[:n])]
+        }
+
+    def __check(self, metric):
+        if metric not in self.__buckets:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+    def __load(self, symbols):
+        """
+        (re)load metric values of the given symbols, None loads the whole universe
+
+        only buckets holding one of the symbols before or after the reload are re-sorted
+        """
+        fresh = {metric: {} for metric in METRICS}
+        for model, joined, metrics in SOURCES.values():
+            stmt = (select(Company.symbol, model.date, *[expr.label(name) for name, expr in metrics.items()])
+                    .select_from(model)
+                    .join(Company, Company.id == model.company_id))
+            if joined is not None:
+                stmt = stmt.join(joined, and_(joined.company_id == model.company_id, joined.date == model.date))
+            if symbols is not None:
+                stmt = stmt.where(Company.symbol.in_(symbols))
+            # ascending dates, so a second statement in the same fiscal year overwrites the first
+            for row in self.__session.execute(stmt.order_by(model.company_id, model.date)):
+                year = row[1].year
+                for index, metric in enumerate(metrics, start=2):
+                    value = row[index]
+                    if value is not None and np.isfinite(value):
+                        fresh[metric].setdefault(year, {})[row[0]] = float(value)
+
+        loaded = {symbol for years in fresh.values() for values in years.values() for symbol in values}
+        self.__symbols = loaded if symbols is None else (self.__symbols - symbols) | loaded
+
+        # readers hold on to the {year: _Bucket} dict of a metric without the lock, so a reload builds a
+        # new dict and swaps it in with one assignment instead of changing the one being read
+        for metric, years in fresh.items():
+            if symbols is None:
+                self.__buckets[metric] = {year: _Bucket(values) for year, values in years.items()}
+                continue
+
+            buckets = dict(self.__buckets[metric])
+            for year in set(years) | set(buckets):
+                bucket = buckets.get(year)
+                stale = bucket is not None and not symbols.isdisjoint(bucket.by_symbol)
+                if not stale and year not in years:
+                    continue
+                values = {s: v for s, v in bucket.by_symbol.items() if s not in symbols} if bucket else {}
+                values.update(years.get(year, {}))
+                if values:
+                    buckets[year] = _Bucket(values)
+                else:
+                    buckets.pop(year, None)
+            self.__buckets[metric] = buckets
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import query_budget
+from models.cached_response import CachedResponse
+from services.data_version import data_version
+
+
+class ResponseCache:
+    """
+    Serves the responses precomputed by the warmup stage of ingestion (services.cache_warmer) from memory.
+
+    The responses of the current data version are loaded in one SELECT whenever the data version or the
+    number of warmed responses changed, which is checked at most once every `interval` seconds. Responses
+    of an older data version are never served, so a refresh of the statements invalidates the whole cache.
+
+    Attributes:
+        __session: SQLAlchemy session for MySQL database connection
+        __interval: minimum number of seconds between two checks
+        __bodies: {key: serialized response} of the loaded data version
+    """
+
+    def __init__(self, session, interval=15):
+        self.__session = session
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        self.__bodies = {}
+        self.__loaded = None
+        self.__checked_at = None
+
+    def get(self, key):
+        """
+        :param key: key of the request, see blueprints.response_cache.cache_key
+        :return: serialized response, None when it was not warmed for the current data version
+        """
+        now = time.monotonic()
+        if self.__checked_at is None or now - self.__checked_at >= self.__interval:
+            with self.__lock:
+                if self.__checked_at is None or now - self.__checked_at >= self.__interval:
+                    self.__sync()
+                    self.__checked_at = now
+        return self.__bodies.get(key)
+
+    def __sync(self):
+        try:
+            # reloading the warmed responses is a bulk job, it runs outside the request's query budget
+            with query_budget():
+                version = data_version(self.__session)
+                count = self.__session.execute(select(func.count()).select_from(CachedResponse)
+                                               .where(CachedResponse.data_version == version)).scalar()
+                if (version, count) != self.__loaded:
+                    rows = self.__session.execute(select(CachedResponse.key, CachedResponse.body)
+                                                  .where(CachedResponse.data_version == version))
+                    self.__bodies = dict(rows.all())
+                    self.__loaded = (version, count)
+        except SQLAlchemyError as e:
+            # requests are served uncached, e.g. before the response_cache table is created
+            print(f"Response cache unavailable: {e}")
+            self.__bodies, self.__loaded = {}, None
+        finally:
+            # the next check must see the data committed meanwhile
+            self.__session.rollback()
@@ -0,0 +1,81 @@
+import threading
+
+
+class _Call:
+    """one in-flight execution, shared by its caller and every caller that joined it"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls into one execution.
+
+    The first caller of a key runs the function, callers arriving with the same key while it runs
+    wait for it and get the same result (or the same exception). Once it finishes the key is free
+    again, so results are never served after the fact: this is coalescing, not caching.
+
+    Counters are kept per name (e.g. per endpoint): requests, executions, and coalesced = requests
+    that waited for another one's execution instead of running their own.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+        self.__counters = {}
+
+    def do(self, key, func, name=None):
+        """
+        :param key: hashable identity of the call, equal keys share one execution
+        :param func: function without arguments
+        :param name: counter the call is accounted under, default str(key)
+        :return: the result of func, possibly computed for another caller
+        """
+        with self.__lock:
+            call = self.__calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls[key] = _Call()
+            counters = self.__counters.setdefault(name or str(key), {"requests": 0, "executions": 0})
+            counters["requests"] += 1
+            counters["executions"] += leader
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        :return: dict with the totals, the number of calls in flight and the counters per name
+        """
+        with self.__lock:
+            by_name = {name: dict(counters, coalesced=counters["requests"] - counters["executions"])
+                       for name, counters in self.__counters.items()}
+            in_flight = len(self.__calls)
+        requests = sum(counters["requests"] for counters in by_name.values())
+        executions = sum(counters["executions"] for counters in by_name.values())
+        return {
+            "requests": requests,
+            "executions": executions,
+            "coalesced": requests - executions,
+            "in_flight": in_flight,
+            "by_name": by_name,
+        }
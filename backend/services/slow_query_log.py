@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+
+class SlowQueryLog:
+    """
+    Records every statement of an instrumented engine that runs longer than a threshold, with its
+    parameters and, for SELECTs, the query plan, to find missing indexes before users notice them.
+
+    Plans are captured by a background thread on a connection of its own, so the request that ran
+    the slow query is not slowed down further. a plan is captured once per statement text and reused
+    for its later occurrences; when the explain queue is full, entries are recorded without a plan.
+
+    Attributes:
+        threshold_ms: statements at least this slow are recorded
+        __entries: most recent entries, oldest dropped first
+        __plans: {(engine url, statement): plan}, least recently used first
+    """
+
+    MAX_PLANS = 256
+    MAX_PARAMETERS_LENGTH = 500
+
+    def __init__(self, threshold_ms, size=200):
+        """
+        :param threshold_ms: duration from which a statement is recorded
+        :param size: number of entries kept
+        """
+        self.threshold_ms = threshold_ms
+        self.__entries = deque(maxlen=size)
+        self.__plans = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__pending = queue.Queue(maxsize=100)
+        self.__worker = None
+
+    def instrument(self, engine):
+        """
+        time every statement the engine executes
+
+        :param engine: SQLAlchemy engine
+        """
+        event.listen(engine, "before_cursor_execute", self.__start)
+        event.listen(engine, "after_cursor_execute", self.__end)
+
+    def entries(self):
+        """
+        :return: list of {at, duration_ms, database, statement, parameters, plan}, newest first
+        """
+        return list(reversed(self.__entries))
+
+    def __start(self, conn, cursor, statement, parameters, context, executemany):
+        # on the execution context, which is dropped with the statement whether or not it fails
+        context._query_start = time.perf_counter()
+
+    def __end(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - context._query_start) * 1000
+        if duration_ms < self.threshold_ms or statement.startswith("EXPLAIN"):
+            return
+
+        engine = conn.engine
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "duration_ms": round(duration_ms, 1),
+            "database": engine.url.host or engine.url.database,
+            "statement": statement,
+            "parameters": repr(parameters)[:self.MAX_PARAMETERS_LENGTH],
+            "plan": None,
+        }
+        self.__entries.append(entry)
+
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            self.__print(entry)
+            return
+        with self.__lock:
+            plan = self.__plans.get((str(engine.url), statement))
+        if plan is not None:
+            entry["plan"] = plan
+            self.__print(entry)
+            return
+        try:
+            self.__pending.put_nowait((engine, statement, parameters, entry))
+        except queue.Full:
+            self.__print(entry)
+            return
+        self.__start_worker()
+
+    def __start_worker(self):
+        with self.__lock:
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__explain_loop, name="slow-query-explain", daemon=True)
+                self.__worker.start()
+
+    def __explain_loop(self):
+        while True:
+            engine, statement, parameters, entry = self.__pending.get()
+            key = (str(engine.url), statement)
+            with self.__lock:
+                plan = self.__plans.get(key)
+            if plan is None:
+                try:
+                    plan = self.__explain(engine, statement, parameters)
+                except Exception as e:
+                    print(f"Could not explain slow query: {e}")
+                else:
+                    with self.__lock:
+                        self.__plans[key] = plan
+                        self.__plans.move_to_end(key)
+                        if len(self.__plans) > self.MAX_PLANS:
+                            self.__plans.popitem(last=False)
+            entry["plan"] = plan
+            self.__print(entry)
+
+    @staticmethod
+    def __explain(engine, statement, parameters):
+        """
+        :return: list of plan rows as dicts, EXPLAIN on MySQL, EXPLAIN QUERY PLAN on SQLite
+        """
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        with engine.connect() as conn:
+            result = conn.exec_driver_sql(prefix + statement, parameters)
+            return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    def __print(entry):
+        print(f"Slow query ({entry['duration_ms']} ms on {entry['database']}): {' '.join(entry['statement'].split())} "
+              f"parameters: {entry['parameters']}")
+        for row in entry["plan"] or ():
+            print(f"    plan: {row}")
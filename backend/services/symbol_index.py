@@ -0,0 +1,197 @@
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import select
+
+from database import query_budget
+from models.company import Company
+from models.latest_fundamentals import LatestFundamentals
+from services.data_version import data_version
+
+# watermark of a service that never synced, distinct from None (an empty snapshot table)
+_NEVER = object()
+
+# name words that start too many company names to be useful as a search prefix
+_STOPWORDS = {"inc", "inc.", "corp", "corp.", "corporation", "co", "co.", "company", "ltd", "ltd.", "plc",
+              "the", "and", "&", "group", "holdings", "sa", "ag", "nv", "se", "llc", "lp", "-"}
+
+
+class _SortedKeys:
+    """
+    sorted search keys with the symbol each key points to, answering prefix queries with bisect
+    """
+
+    __slots__ = ("keys", "symbols")
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.symbols = [symbol for _, symbol in pairs]
+
+    def prefixed(self, prefix):
+        """symbols whose key starts with prefix, in key order, lazily"""
+        keys = self.keys
+        for index in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[index].startswith(prefix):
+                return
+            yield self.symbols[index]
+
+
+class SymbolIndex:
+    """
+    Immutable prefix index over symbols and company names.
+
+    Companies with stored statements rank before the rest of the FMP universe, and within each group
+    symbol matches rank before name matches. Every group is a sorted array scanned from one binary
+    search, and scanning stops once `limit` results are found, so a query costs O(log n + limit).
+
+    Attributes:
+        companies: {symbol: (name, has_data)}
+    """
+
+    def __init__(self, companies):
+        self.companies = companies
+        tiers = {True: ([], []), False: ([], [])}
+        for symbol, (name, has_data) in companies.items():
+            symbol_keys, name_keys = tiers[bool(has_data)]
+            symbol_keys.append((symbol.casefold(), symbol))
+            if name:
+                words = name.casefold().split()
+                for index, word in enumerate(words):
+                    if index == 0 or word not in _STOPWORDS:
+                        name_keys.append((" ".join(words[index:]), symbol))
+
+        self.__groups = [_SortedKeys(pairs) for tier in (True, False) for pairs in tiers[tier]]
+
+    def __len__(self):
+        return len(self.companies)
+
+    def search(self, query, limit=10):
+        """
+        :param query: symbol or company name prefix, case insensitive
+        :param limit: maximum number of results
+        :return: list of {symbol, name, has_data}, an exact symbol match first
+        """
+        prefix = query.strip().casefold()
+        if not prefix:
+            return []
+
+        found = []
+        exact = query.strip().upper()
+        if exact in self.companies:
+            found.append(exact)
+        for group in self.__groups:
+            if len(found) >= limit:
+                break
+            for symbol in group.prefixed(prefix):
+                if symbol not in found:
+                    found.append(symbol)
+                    if len(found) >= limit:
+                        break
+
+        return [{"symbol": symbol, "name": self.companies[symbol][0], "has_data": self.companies[symbol][1]}
+                for symbol in found[:limit]]
+
+
+def fetch_universe():
+    """
+    symbols and company names of the whole FMP universe, empty when the FMP API is unavailable
+
+    :return: {symbol: name or None}
+    """
+    from fetchers.fundamental_fetcher import FundamentalFetcher
+
+    try:
+        fetcher = FundamentalFetcher()
+    except Exception as e:
+        print("Symbol index without the FMP universe:", e)
+        return {}
+
+    universe = dict.fromkeys(fetcher.fetch_all_symbols() or [])
+    for company in fetcher.fetch_company_list() or []:
+        if company.get("symbol"):
+            universe[company["symbol"]] = company.get("name")
+    return universe
+
+
+class SymbolSearchService:
+    """
+    Serves symbol autocomplete from an in-memory SymbolIndex over the stored symbols and the FMP universe.
+
+    Like the ranking service it follows the data version: once ingestion lands new
+    symbols, the index is rebuilt off to the side and swapped in with a single assignment, so searches
+    never see a half built index. The FMP universe is fetched in a background thread, searches are
+    served from the stored symbols until it arrives.
+
+    Attributes:
+        __session: SQLAlchemy session for MySQL database connection
+        __interval: minimum number of seconds between two syncs
+        __index: current SymbolIndex
+    """
+
+    UNIVERSE_REFRESH_SECONDS = 24 * 60 * 60
+
+    def __init__(self, session, interval=60, universe_loader=fetch_universe):
+        self.__session = session
+        self.__interval = interval
+        self.__universe_loader = universe_loader
+        self.__index = SymbolIndex({})
+        self.__stored = set()
+        self.__universe = {}
+        self.__universe_at = None
+        self.__watermark = _NEVER
+        self.__synced_at = None
+        self.__lock = threading.Lock()
+
+    def search(self, query, limit=10):
+        """
+        :param query: symbol or company name prefix
+        :param limit: maximum number of results
+        :return: list of {symbol, name, has_data}
+        """
+        return self.__index.search(query, limit)
+
+    def sync(self, force=False):
+        """
+        rebuild the index when ingestion stored new data since the last sync, and refresh the FMP universe daily
+
+        :param force: ignore the sync interval
+        :return: None
+        """
+        now = time.monotonic()
+        if not force and self.__synced_at and now - self.__synced_at < self.__interval:
+            return
+
+        with self.__lock:
+            if not force and self.__synced_at and now - self.__synced_at < self.__interval:
+                return
+            self.__synced_at = now
+
+            if self.__universe_at is None or now - self.__universe_at > self.UNIVERSE_REFRESH_SECONDS:
+                self.__universe_at = now
+                threading.Thread(target=self.__load_universe, daemon=True).start()
+
+            with query_budget():
+                watermark = data_version(self.__session)
+                if watermark == self.__watermark:
+                    self.__session.rollback()
+                    return
+                self.__stored = set(self.__session.execute(
+                    select(Company.symbol).select_from(LatestFundamentals)
+                    .join(Company, Company.id == LatestFundamentals.company_id)).scalars())
+                self.__session.rollback()
+            self.__watermark = watermark
+            self.__rebuild()
+
+    def __load_universe(self):
+        universe = self.__universe_loader()
+        with self.__lock:
+            self.__universe = universe
+            self.__rebuild()
+
+    def __rebuild(self):
+        companies = {symbol: (name, symbol in self.__stored) for symbol, name in self.__universe.items()}
+        for symbol in self.__stored:
+            companies.setdefault(symbol, (None, True))
+        self.__index = SymbolIndex(companies)
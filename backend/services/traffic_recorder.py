@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from handlers.upsert import upsert
+from models.symbol_traffic import SymbolTraffic
+
+
+class TrafficRecorder:
+    """
+    Counts the requests per symbol of a web worker in memory and adds them to the symbol_traffic table
+    every `interval` seconds from a background thread, so requests never wait for the write.
+
+    Recording stops at the first failing write, e.g. when the app serves a read-only SQLite file.
+
+    Attributes:
+        __session: SQLAlchemy session bound to the primary
+        __interval: seconds between two writes
+        __counts: Counter of the requests per symbol since the last write
+    """
+
+    def __init__(self, session, interval=60):
+        self.__session = session
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        self.__counts = Counter()
+        self.__enabled = True
+        self.__thread = None
+
+    def hit(self, symbol):
+        """
+        count one request of `symbol`
+        """
+        if not self.__enabled:
+            return
+        with self.__lock:
+            self.__counts[symbol] += 1
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__loop, name="traffic-recorder", daemon=True)
+                self.__thread.start()
+
+    def flush(self):
+        """
+        add the counted requests to today's row of every symbol
+
+        :return: number of symbols written
+        """
+        with self.__lock:
+            counts, self.__counts = self.__counts, Counter()
+        if not counts:
+            return 0
+
+        today = date.today()
+        rows = [{"day": today, "symbol": symbol, "hits": hits} for symbol, hits in counts.items()]
+        try:
+            upsert(self.__session, SymbolTraffic.__table__, rows, key_columns=("day", "symbol"),
+                   update_columns=(), increment_columns=("hits",))
+            self.__session.commit()
+        except SQLAlchemyError as e:
+            self.__session.rollback()
+            self.__enabled = False
+            print(f"Symbol traffic is not recorded: {e}")
+            return 0
+        return len(rows)
+
+    def __loop(self):
+        while self.__enabled:
+            time.sleep(self.__interval)
+            self.flush()
@@ -1,5 +1,81 @@
+import os
+
 # DB name
 DATABASE_NAME = "insight"
 
 # AWS RDS endpoint
 HOST = "database-1.cnogyiacir6u.us-east-2.rds.amazonaws.com"
+
+# storage the API serves from: "mysql" (HOST and REPLICA_HOSTS), or "sqlite", a read-only file
+# built from MySQL by `python -m exporters.sqlite_exporter` for demos, edge instances and offline use.
+# the file is opened immutable: restart the API after exporting a new one
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mysql")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/insight.db")
+
+# seconds between two syncs of the in-memory ranking service with the statement tables
+RANKING_REFRESH_SECONDS = 60
+
+# AWS RDS read replica endpoints serving the handlers' reads, empty sends reads to HOST
+REPLICA_HOSTS = []
+
+# connections of every engine: DB_POOL_SIZE kept open, up to DB_MAX_OVERFLOW more opened under load
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+
+# admission control of the statement API, per worker process. every client gets a token bucket of
+# ADMISSION_BURST tokens refilled at ADMISSION_RATE tokens per second, a request takes one token, a
+# screen over all companies ADMISSION_EXPENSIVE_COST. queries run concurrently up to the pool size,
+# screens up to DB_POOL_SIZE, and a request waits at most ADMISSION_QUEUE_SECONDS for its turn
+ADMISSION_RATE = 20
+ADMISSION_BURST = 40
+ADMISSION_EXPENSIVE_COST = 5
+ADMISSION_QUEUE_SECONDS = 0.25
+
+# proxies in front of the API (e.g. the load balancer) trusted to set X-Forwarded-For and X-Forwarded-Proto,
+# so admission control tells clients apart by their own address rather than the proxy's. 0, the default,
+# trusts none: set it only when every request comes through that many proxies, or any client could pick
+# its own address
+PROXY_HOPS = int(os.getenv("PROXY_HOPS", 0))
+
+# budget of every SELECT issued by an API request
+STATEMENT_TIMEOUT_MS = 5000
+
+# statements running at least SLOW_QUERY_MS are logged with their plan, the last SLOW_QUERY_LOG_SIZE
+# are kept for /api/admin/slow-queries
+SLOW_QUERY_MS = 500
+SLOW_QUERY_LOG_SIZE = 200
+
+# bearer token of the /api/admin endpoints, unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# seconds between two syncs of the in-memory peer similarity index with the statement tables
+PEERS_REFRESH_SECONDS = 60
+
+# seconds between two checks of the symbol search index for newly ingested symbols
+SYMBOL_INDEX_REFRESH_SECONDS = 60
+
+# seconds between two data version checks of the cached metric distribution stats
+STATS_REFRESH_SECONDS = 60
+
+# cache warming after ingestion: the responses of the WARMUP_TOP_SYMBOLS most requested symbols of the
+# last WARMUP_TRAFFIC_DAYS days (topped up with the largest companies) and the first pages of the screens
+# sorted by WARMUP_SCREEN_SORTS are precomputed by WARMUP_WORKERS threads into the response cache
+WARMUP_TOP_SYMBOLS = 200
+WARMUP_TRAFFIC_DAYS = 7
+WARMUP_WORKERS = 8
+WARMUP_SCREEN_SORTS = ("revenue", "net_income", "free_cash_flow", "gross_profit_ratio", "net_income_ratio")
+
+# seconds between two writes of the symbol request counters of a web worker, and between two checks of
+# the response cache for a new data version or newly warmed responses
+TRAFFIC_FLUSH_SECONDS = 60
+RESPONSE_CACHE_REFRESH_SECONDS = 15
+
+# filing events stream: seconds between two polls of the outbox, events buffered per client,
+# seconds between keep-alives of an idle stream, days of events kept by ingestion
+STREAM_POLL_SECONDS = 1
+STREAM_BUFFER_SIZE = 256
+STREAM_KEEPALIVE_SECONDS = 15
+# open streams per web worker, each holds a thread: keep it below the gunicorn --threads so the
+# API requests always have threads left
+STREAM_MAX_CLIENTS = 24
+FILING_EVENT_RETENTION_DAYS = 7
@@ -1,9 +1,8 @@
 CREATE TABLE balance_sheet_statements (
     id INT AUTO_INCREMENT PRIMARY KEY,
     date DATE NOT NULL,
-    symbol VARCHAR(10) NOT NULL,
+    company_id INT NOT NULL,
     reportedCurrency VARCHAR(10) NOT NULL,
-    cik VARCHAR(20),
     fillingDate DATE,
     acceptedDate DATETIME,
     calendarYear YEAR,
@@ -54,5 +53,6 @@ CREATE TABLE balance_sheet_statements (
     netDebt BIGINT,
     link VARCHAR(255),
     finalLink VARCHAR(255),
-    UNIQUE KEY uq_symbol_date (symbol, date)
+    UNIQUE KEY uq_company_date (company_id, date),
+    FOREIGN KEY (company_id) REFERENCES companies (id)
 );
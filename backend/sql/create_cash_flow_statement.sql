@@ -1,9 +1,8 @@
 CREATE TABLE cash_flow_statements (
     id INT AUTO_INCREMENT PRIMARY KEY,
     date DATE NOT NULL,
-    symbol VARCHAR(10) NOT NULL,
+    company_id INT NOT NULL,
     reported_currency VARCHAR(10) NOT NULL,
-    cik VARCHAR(20),
     filling_date DATE,
     accepted_date DATETIME,
     calendar_year YEAR,
@@ -40,5 +39,6 @@ CREATE TABLE cash_flow_statements (
     free_cash_flow BIGINT,
     link VARCHAR(255),
     final_link VARCHAR(255),
-    UNIQUE KEY uq_symbol_date (symbol, date)
+    UNIQUE KEY uq_company_date (company_id, date),
+    FOREIGN KEY (company_id) REFERENCES companies (id)
 );
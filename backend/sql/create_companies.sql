@@ -0,0 +1,6 @@
+CREATE TABLE companies (
+    id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'Surrogate key of the company',
+    symbol VARCHAR(10) NOT NULL COMMENT 'Stock ticker symbol (e.g., AAPL)',
+    cik VARCHAR(20) COMMENT 'SEC Central Index Key',
+    UNIQUE KEY uq_symbol (symbol)
+) ENGINE=InnoDB COMMENT='Company dimension, statement tables reference it by id';
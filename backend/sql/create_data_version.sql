@@ -0,0 +1,11 @@
+CREATE TABLE data_version (
+    id INT NOT NULL PRIMARY KEY COMMENT 'Always 1, the table holds a single row',
+    version BIGINT NOT NULL DEFAULT 0 COMMENT 'Incremented by every write to the statements'
+) ENGINE=InnoDB COMMENT='Monotonic version of the stored statements, followed by the caches of the web app';
+
+INSERT INTO data_version (id, version) VALUES (1, 0);
+
+-- snapshot tables created before the version column:
+-- ALTER TABLE latest_fundamentals
+--     ADD COLUMN version BIGINT COMMENT 'Data version of the last refresh of the row' AFTER updated_at,
+--     ADD KEY idx_latest_version (version);
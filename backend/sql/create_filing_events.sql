@@ -0,0 +1,9 @@
+CREATE TABLE filing_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY COMMENT 'Increasing event id, tailed by the web app',
+    company_id INT NOT NULL COMMENT 'Company of the statement, see companies',
+    statement VARCHAR(30) NOT NULL COMMENT 'Statement type (e.g., income-statement)',
+    date DATE NOT NULL COMMENT 'Fiscal year-end date of the statement',
+    created_at DATETIME NOT NULL COMMENT 'When the statement was stored',
+    KEY idx_filing_events_created_at (created_at),
+    FOREIGN KEY (company_id) REFERENCES companies (id)
+) ENGINE=InnoDB COMMENT='Outbox of new or changed statements, written with the statements, pruned by ingestion';
@@ -1,6 +1,6 @@
 CREATE TABLE income_statements (
     id INT AUTO_INCREMENT PRIMARY KEY COMMENT 'Unique ID for each record',
-    symbol VARCHAR(10) NOT NULL COMMENT 'Stock ticker symbol (e.g., AAPL)',
+    company_id INT NOT NULL COMMENT 'Company the statement belongs to, see companies',
     date DATE NOT NULL COMMENT 'Fiscal year-end date (e.g., 2024-09-28)',
     revenue BIGINT NOT NULL COMMENT 'Total revenue or sales generated by the company',
     gross_profit BIGINT NOT NULL COMMENT 'Gross profit (revenue - cost of goods sold)',
@@ -20,5 +20,6 @@ CREATE TABLE income_statements (
     filling_date DATE COMMENT 'Date when the financial report was filed',
     accepted_date DATETIME COMMENT 'Date when the financial report was accepted by the SEC',
     period VARCHAR(5) COMMENT 'Reporting period, typically "FY" for fiscal year',
-    UNIQUE KEY (symbol, date) COMMENT 'Ensures no duplicate entries for the same company and date'
+    UNIQUE KEY unique_company_date (company_id, date) COMMENT 'Ensures no duplicate entries for the same company and date',
+    FOREIGN KEY (company_id) REFERENCES companies (id)
 ) ENGINE=InnoDB COMMENT='Table storing annual income statements for companies';
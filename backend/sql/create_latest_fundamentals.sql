@@ -0,0 +1,64 @@
+CREATE TABLE latest_fundamentals (
+    company_id INT PRIMARY KEY COMMENT 'Company of the snapshot, see companies',
+    income_date DATE COMMENT 'Fiscal year-end date of the newest income statement',
+    revenue BIGINT,
+    gross_profit BIGINT,
+    gross_profit_ratio FLOAT,
+    operating_income BIGINT,
+    operating_income_ratio FLOAT,
+    net_income BIGINT,
+    net_income_ratio FLOAT,
+    ebitda BIGINT,
+    eps FLOAT,
+    balance_sheet_date DATE COMMENT 'Fiscal year-end date of the newest balance sheet',
+    total_assets BIGINT,
+    total_liabilities BIGINT,
+    total_stockholders_equity BIGINT,
+    cash_and_cash_equivalents BIGINT,
+    total_debt BIGINT,
+    net_debt BIGINT,
+    cash_flow_date DATE COMMENT 'Fiscal year-end date of the newest cash flow statement',
+    operating_cash_flow BIGINT,
+    capital_expenditure BIGINT,
+    free_cash_flow BIGINT,
+    dividends_paid BIGINT,
+    common_stock_repurchased BIGINT,
+    updated_at DATETIME COMMENT 'Last time any section of the row was refreshed',
+    version BIGINT COMMENT 'Data version of the last refresh of the row, see data_version',
+    KEY idx_latest_revenue (revenue),
+    KEY idx_latest_net_income (net_income),
+    KEY idx_latest_total_assets (total_assets),
+    KEY idx_latest_free_cash_flow (free_cash_flow),
+    KEY idx_latest_updated_at (updated_at),
+    KEY idx_latest_version (version),
+    FOREIGN KEY (company_id) REFERENCES companies (id)
+) ENGINE=InnoDB COMMENT='Newest income, balance sheet and cash flow metrics per company, maintained on ingestion';
+
+-- backfill from existing statements, the ingestion path keeps it up to date afterwards
+INSERT INTO latest_fundamentals (company_id, updated_at)
+SELECT c.id, NOW() FROM companies c
+WHERE EXISTS (SELECT 1 FROM income_statements s WHERE s.company_id = c.id)
+   OR EXISTS (SELECT 1 FROM balance_sheet_statements s WHERE s.company_id = c.id)
+   OR EXISTS (SELECT 1 FROM cash_flow_statements s WHERE s.company_id = c.id);
+
+UPDATE latest_fundamentals l
+JOIN (SELECT company_id, MAX(date) AS date FROM income_statements GROUP BY company_id) n ON n.company_id = l.company_id
+JOIN income_statements s ON s.company_id = n.company_id AND s.date = n.date
+SET l.income_date = s.date, l.revenue = s.revenue, l.gross_profit = s.gross_profit,
+    l.gross_profit_ratio = s.gross_profit_ratio, l.operating_income = s.operating_income,
+    l.operating_income_ratio = s.operating_income_ratio, l.net_income = s.net_income,
+    l.net_income_ratio = s.net_income_ratio, l.ebitda = s.ebitda, l.eps = s.eps;
+
+UPDATE latest_fundamentals l
+JOIN (SELECT company_id, MAX(date) AS date FROM balance_sheet_statements GROUP BY company_id) n ON n.company_id = l.company_id
+JOIN balance_sheet_statements s ON s.company_id = n.company_id AND s.date = n.date
+SET l.balance_sheet_date = s.date, l.total_assets = s.totalAssets, l.total_liabilities = s.totalLiabilities,
+    l.total_stockholders_equity = s.totalStockholdersEquity,
+    l.cash_and_cash_equivalents = s.cashAndCashEquivalents, l.total_debt = s.totalDebt, l.net_debt = s.netDebt;
+
+UPDATE latest_fundamentals l
+JOIN (SELECT company_id, MAX(date) AS date FROM cash_flow_statements GROUP BY company_id) n ON n.company_id = l.company_id
+JOIN cash_flow_statements s ON s.company_id = n.company_id AND s.date = n.date
+SET l.cash_flow_date = s.date, l.operating_cash_flow = s.operating_cash_flow,
+    l.capital_expenditure = s.capital_expenditure, l.free_cash_flow = s.free_cash_flow,
+    l.dividends_paid = s.dividends_paid, l.common_stock_repurchased = s.common_stock_repurchased;
@@ -0,0 +1,7 @@
+CREATE TABLE response_cache (
+    `key` VARCHAR(500) NOT NULL PRIMARY KEY COMMENT 'Request path and sorted query string',
+    body MEDIUMTEXT NOT NULL COMMENT 'Serialized JSON response',
+    data_version BIGINT NOT NULL COMMENT 'Data version the response was computed from',
+    created_at DATETIME NOT NULL COMMENT 'When the response was computed',
+    KEY idx_response_cache_data_version (data_version)
+) ENGINE=InnoDB COMMENT='API responses precomputed after ingestion, served while their data version is current';
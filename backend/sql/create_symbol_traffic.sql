@@ -0,0 +1,6 @@
+CREATE TABLE symbol_traffic (
+    day DATE NOT NULL COMMENT 'Day of the requests',
+    symbol VARCHAR(10) NOT NULL COMMENT 'Requested stock ticker symbol',
+    hits INT NOT NULL DEFAULT 0 COMMENT 'Successful requests of the symbol that day',
+    PRIMARY KEY (day, symbol)
+) ENGINE=InnoDB COMMENT='Daily request counts per symbol, picks the symbols warmed after ingestion';
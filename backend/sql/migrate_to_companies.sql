@@ -0,0 +1,65 @@
+-- moves existing statement tables onto the companies dimension (sql/create_companies.sql):
+-- the symbol and cik columns of every statement row are replaced by one integer company_id, the
+-- (symbol, date) unique keys by (company_id, date), and the symbol key of latest_fundamentals by
+-- company_id. the reported currency is per filing, it stays on the statement rows.
+-- run once, after creating the companies table and before deploying the matching models.
+
+-- every symbol seen in any statement table
+INSERT INTO companies (symbol)
+SELECT symbol FROM income_statements
+UNION SELECT symbol FROM balance_sheet_statements
+UNION SELECT symbol FROM cash_flow_statements;
+
+-- the cik of the newest statement that has one, balance sheets first
+UPDATE companies c
+JOIN (SELECT symbol, MAX(date) AS date FROM balance_sheet_statements GROUP BY symbol) n ON n.symbol = c.symbol
+JOIN balance_sheet_statements s ON s.symbol = n.symbol AND s.date = n.date
+SET c.cik = s.cik;
+
+UPDATE companies c
+JOIN (SELECT symbol, MAX(date) AS date FROM cash_flow_statements GROUP BY symbol) n ON n.symbol = c.symbol
+JOIN cash_flow_statements s ON s.symbol = n.symbol AND s.date = n.date
+SET c.cik = COALESCE(c.cik, s.cik);
+
+-- income statements, the unnamed (symbol, date) key was named after its first column by MySQL
+ALTER TABLE income_statements ADD COLUMN company_id INT AFTER id;
+UPDATE income_statements s JOIN companies c ON c.symbol = s.symbol SET s.company_id = c.id;
+ALTER TABLE income_statements
+    MODIFY company_id INT NOT NULL COMMENT 'Company the statement belongs to, see companies',
+    DROP INDEX symbol,
+    DROP COLUMN symbol,
+    ADD UNIQUE KEY unique_company_date (company_id, date),
+    ADD FOREIGN KEY (company_id) REFERENCES companies (id);
+
+ALTER TABLE balance_sheet_statements ADD COLUMN company_id INT AFTER date;
+UPDATE balance_sheet_statements s JOIN companies c ON c.symbol = s.symbol SET s.company_id = c.id;
+ALTER TABLE balance_sheet_statements
+    MODIFY company_id INT NOT NULL,
+    DROP INDEX uq_symbol_date,
+    DROP COLUMN symbol,
+    DROP COLUMN cik,
+    ADD UNIQUE KEY uq_company_date (company_id, date),
+    ADD FOREIGN KEY (company_id) REFERENCES companies (id);
+
+ALTER TABLE cash_flow_statements ADD COLUMN company_id INT AFTER date;
+UPDATE cash_flow_statements s JOIN companies c ON c.symbol = s.symbol SET s.company_id = c.id;
+ALTER TABLE cash_flow_statements
+    MODIFY company_id INT NOT NULL,
+    DROP INDEX uq_symbol_date,
+    DROP COLUMN symbol,
+    DROP COLUMN cik,
+    ADD UNIQUE KEY uq_company_date (company_id, date),
+    ADD FOREIGN KEY (company_id) REFERENCES companies (id);
+
+-- the snapshot table is keyed by the company too
+ALTER TABLE latest_fundamentals ADD COLUMN company_id INT FIRST;
+UPDATE latest_fundamentals l JOIN companies c ON c.symbol = l.symbol SET l.company_id = c.id;
+ALTER TABLE latest_fundamentals
+    MODIFY company_id INT NOT NULL COMMENT 'Company of the snapshot, see companies',
+    DROP PRIMARY KEY,
+    DROP COLUMN symbol,
+    ADD PRIMARY KEY (company_id),
+    ADD FOREIGN KEY (company_id) REFERENCES companies (id);
+
+-- the ALTERs rebuild the tables, refresh the statistics of the new keys
+ANALYZE TABLE companies, income_statements, balance_sheet_statements, cash_flow_statements, latest_fundamentals;
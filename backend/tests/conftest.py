@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+
+import pytest
+
+
+class Clock:
+    """monotonic clock moved by hand, `clock.now += 5`"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """
+    fake time.monotonic of the modules in CLOCKED of the test module, e.g. CLOCKED = (admission,).
+    other modules, pytest and SQLAlchemy among them, keep the real clock
+    """
+    clock = Clock()
+    for module in request.module.CLOCKED:
+        monkeypatch.setattr(module, "time", SimpleNamespace(monotonic=clock))
+    return clock
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from services import admission
+from services.admission import CHEAP, EXPENSIVE, AdmissionController, Overloaded
+
+# modules whose time.monotonic the clock fixture of conftest replaces
+CLOCKED = (admission,)
+
+
+def controller(rate=1, burst=3, cheap=2, expensive=1, expensive_cost=2, queue_seconds=0):
+    return AdmissionController(rate=rate, burst=burst, limits={CHEAP: cheap, EXPENSIVE: expensive},
+                               costs={CHEAP: 1, EXPENSIVE: expensive_cost}, queue_seconds=queue_seconds)
+
+
+def test_bucket_refuses_once_empty_and_refills(clock):
+    limiter = controller()
+    for _ in range(3):
+        limiter.check_rate("10.0.0.1", CHEAP)
+    with pytest.raises(Overloaded) as refused:
+        limiter.check_rate("10.0.0.1", CHEAP)
+    assert (refused.value.status, refused.value.retry_after) == (429, 1)
+
+    # other clients have buckets of their own
+    limiter.check_rate("10.0.0.2", CHEAP)
+
+    clock.now += 1
+    limiter.check_rate("10.0.0.1", CHEAP)
+    assert limiter.stats()["by_priority"][CHEAP]["rate_limited"] == 1
+
+
+def test_expensive_requests_take_more_tokens(clock):
+    limiter = controller(rate=0.5, expensive_cost=2)
+    limiter.check_rate("10.0.0.1", EXPENSIVE)
+    with pytest.raises(Overloaded) as refused:
+        limiter.check_rate("10.0.0.1", EXPENSIVE)
+    # one token left, the second takes 2 seconds at half a token per second
+    assert refused.value.retry_after == 2
+    limiter.check_rate("10.0.0.1", CHEAP)
+
+
+def test_cost_is_capped_at_the_burst(clock):
+    limiter = controller(burst=3, expensive_cost=10)
+    limiter.check_rate("10.0.0.1", EXPENSIVE)
+
+
+def test_least_recently_seen_clients_are_forgotten(clock):
+    limiter = controller()
+    limiter.MAX_CLIENTS = 2
+    for client in ("a", "b", "c"):
+        limiter.check_rate(client, CHEAP)
+    assert limiter.stats()["clients"] == 2
+
+
+def test_expensive_requests_only_get_part_of_the_slots(clock):
+    limiter = controller(cheap=2, expensive=1)
+    with limiter.slot(EXPENSIVE):
+        with pytest.raises(Overloaded) as shed:
+            with limiter.slot(EXPENSIVE):
+                pass
+        assert (shed.value.status, shed.value.retry_after) == (503, 1)
+
+        with limiter.slot(CHEAP):
+            assert limiter.stats()["in_flight"] == 2
+            with pytest.raises(Overloaded):
+                with limiter.slot(CHEAP):
+                    pass
+
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.stats()["by_priority"] == {CHEAP: {"admitted": 1, "rate_limited": 0, "shed": 1},
+                                              EXPENSIVE: {"admitted": 1, "rate_limited": 0, "shed": 1}}
+
+
+def test_slot_is_released_when_the_request_fails(clock):
+    limiter = controller(expensive=1)
+    with pytest.raises(ValueError):
+        with limiter.slot(EXPENSIVE):
+            raise ValueError("bad request")
+    with limiter.slot(EXPENSIVE):
+        pass
+
+
+def test_request_waits_for_a_slot_within_the_queue_time():
+    limiter = controller(cheap=1, queue_seconds=5)
+    holding, release = threading.Event(), threading.Event()
+
+    def hold():
+        with limiter.slot(CHEAP):
+            holding.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    holding.wait(5)
+    threading.Timer(0.05, release.set).start()
+    with limiter.slot(CHEAP):
+        assert limiter.stats()["in_flight"] == 1
+    holder.join(5)
+    assert limiter.stats()["by_priority"][CHEAP]["admitted"] == 2
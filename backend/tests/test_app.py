@@ -0,0 +1,62 @@
+import pytest
+from flask import request
+from sqlalchemy.orm import sessionmaker
+
+import app as app_module
+import database
+from app import create_app
+from database import make_engine, sqlite_url
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES
+from handlers.income_handler import IncomeHandler
+
+
+def build(path, symbol):
+    engine = make_engine(sqlite_url(path, readonly=False))
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    IncomeHandler(session).create({"symbol": symbol, "date": "2024-12-31", "reportedCurrency": "USD",
+                                   "revenue": 100, "grossProfit": 40, "operatingIncome": 20, "netIncome": 10,
+                                   "eps": 1.0})
+    session.commit()
+    session.close()
+    engine.dispose()
+    return sqlite_url(path)
+
+
+@pytest.fixture(autouse=True)
+def default_database():
+    yield
+    database.configure()
+
+
+def symbols(app, symbol):
+    response = app.test_client().get(f"/api/income-statement?symbol={symbol}")
+    assert response.status_code == 200
+    return [row["symbol"] for row in response.get_json()["data"]]
+
+
+def test_each_app_serves_its_own_database(tmp_path):
+    first = create_app(build(str(tmp_path / "a.db"), "AAA"), replica_urls=[])
+    assert symbols(first, "AAA") == ["AAA"]
+    engine = database.get_engine()
+
+    second = create_app(build(str(tmp_path / "b.db"), "BBB"), replica_urls=[])
+    assert symbols(second, "BBB") == ["BBB"]
+    assert symbols(second, "AAA") == []
+    assert database.get_engine() is not engine
+    assert second.extensions["components"] is not first.extensions["components"]
+
+
+def test_forwarded_headers_are_ignored_unless_proxies_are_configured(monkeypatch):
+    def remote_addr(app):
+        @app.route("/whoami")
+        def whoami():
+            return request.remote_addr
+
+        return app.test_client().get("/whoami", headers={"X-Forwarded-For": "203.0.113.7"},
+                                     environ_base={"REMOTE_ADDR": "10.0.0.2"}).get_data(as_text=True)
+
+    assert remote_addr(create_app()) == "10.0.0.2"
+    monkeypatch.setattr(app_module, "PROXY_HOPS", 1)
+    assert remote_addr(create_app()) == "203.0.113.7"
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, jsonify
+
+from blueprints import coalesce
+from blueprints.coalesce import coalesced
+from services.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+def test_followers_get_every_header_of_the_leader(monkeypatch):
+    flight = SingleFlight()
+    monkeypatch.setattr(coalesce, "READS", flight)
+    release, executions = threading.Event(), []
+
+    app = Flask(__name__)
+
+    @app.route("/report")
+    @coalesced
+    def report():
+        release.wait(5)
+        executions.append(1)
+        response = jsonify({"rows": 3})
+        response.status_code = 203
+        response.headers["ETag"] = '"v42"'
+        response.headers["Cache-Control"] = "max-age=60"
+        response.headers.add("Vary", "Accept-Encoding")
+        return response
+
+    def get():
+        response = app.test_client().get("/report?symbol=AAPL")
+        return response.status_code, response.get_json(), response.headers
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(get) for _ in range(CALLERS)]
+        deadline = time.monotonic() + 5
+        while flight.stats()["by_name"].get("report", {}).get("requests", 0) < CALLERS:
+            assert time.monotonic() < deadline, "requests never joined"
+            time.sleep(0.001)
+        release.set()
+
+    assert len(executions) == 1
+    for future in futures:
+        status, body, headers = future.result()
+        assert (status, body) == (203, {"rows": 3})
+        assert headers["ETag"] == '"v42"'
+        assert headers["Cache-Control"] == "max-age=60"
+        assert headers["Vary"] == "Accept-Encoding"
+        assert headers["Content-Type"] == "application/json"
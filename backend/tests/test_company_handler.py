@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES
+from handlers.balance_sheet_handler import BalanceSheetHandler
+from handlers.company_handler import CompanyHandler
+from handlers.income_handler import IncomeHandler
+from models.company import Company
+
+
+@pytest.fixture
+def session():
+    engine = make_engine("sqlite://")
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def income(date, currency):
+    return {"symbol": "TM", "date": date, "reportedCurrency": currency, "revenue": 100, "grossProfit": 40,
+            "operatingIncome": 20, "netIncome": 10, "eps": 1.0}
+
+
+def balance_sheet(date, currency, cik):
+    return {"symbol": "TM", "date": date, "reportedCurrency": currency, "cik": cik, "totalAssets": 500,
+            "totalLiabilities": 300, "totalDebt": 100, "totalStockholdersEquity": 200}
+
+
+def test_mixed_currency_batch_reads_back_per_statement(session):
+    # FMP lists statements newest first
+    handler = IncomeHandler(session)
+    handler.create_many([income("2024-03-31", "USD"), income("2015-03-31", "JPY")])
+    session.commit()
+    handler.create(income("2010-03-31", "JPY"))
+
+    rows = handler.read("TM")["data"]
+    assert {row["date"]: row["reported_currency"] for row in rows} == {
+        "2024-03-31": "USD", "2015-03-31": "JPY", "2010-03-31": "JPY"}
+
+
+def test_newest_statement_of_a_batch_sets_the_company_attributes(session):
+    handler = BalanceSheetHandler(session)
+    handler.create_many([balance_sheet("2024-03-31", "USD", "0001094517"),
+                         balance_sheet("2015-03-31", "JPY", "0000000001"),
+                         balance_sheet("2020-03-31", "JPY", None)])
+    session.commit()
+
+    assert session.execute(select(Company.cik).where(Company.symbol == "TM")).scalar() == "0001094517"
+    rows = handler.read("TM")["data"]
+    assert {row["date"]: (row["reportedCurrency"], row["cik"]) for row in rows} == {
+        "2024-03-31": ("USD", "0001094517"), "2020-03-31": ("JPY", "0001094517"),
+        "2015-03-31": ("JPY", "0001094517")}
+
+
+def test_resolve_keeps_stored_attributes_the_batch_lacks(session):
+    companies = CompanyHandler(session)
+    first = companies.resolve([{"symbol": "TM", "cik": "0001094517"}])
+    again = companies.resolve([{"symbol": "TM", "cik": None}, {"symbol": "SONY"}])
+    assert again["TM"] == first["TM"]
+    assert set(again) == {"TM", "SONY"}
+    assert session.execute(select(Company.cik).where(Company.symbol == "TM")).scalar() == "0001094517"
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import database
+from database import ReplicaRouter, ReplicaSession, make_engine, query_budget
+
+# modules whose time.monotonic the clock fixture of conftest replaces
+CLOCKED = (database,)
+
+
+def sqlite_engine(path, name):
+    engine = make_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE source (name TEXT)"))
+        connection.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+    return engine
+
+
+def served_by(session):
+    name = session.execute(text("SELECT name FROM source")).scalar()
+    session.rollback()
+    return name
+
+
+@pytest.fixture
+def primary(tmp_path):
+    engine = sqlite_engine(tmp_path / "primary.db", "primary")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica(tmp_path):
+    engine = sqlite_engine(tmp_path / "replica.db", "replica")
+    yield engine
+    engine.dispose()
+
+
+def test_unreachable_replica_falls_back_to_primary(primary, tmp_path, clock):
+    unreachable = make_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = ReplicaRouter(primary, [unreachable], cooldown=30)
+    session = sessionmaker(class_=ReplicaSession, router=router)()
+
+    assert served_by(session) == "primary"
+    # skipped without another connection attempt while it cools down
+    assert router.pick() is primary
+
+
+def test_replica_is_retried_after_its_cooldown(primary, replica, clock):
+    router = ReplicaRouter(primary, [replica], cooldown=30)
+    session = sessionmaker(class_=ReplicaSession, router=router)()
+    assert served_by(session) == "replica"
+
+    router.mark_down(replica)
+    clock.now += 29
+    assert served_by(session) == "primary"
+    clock.now += 1
+    assert served_by(session) == "replica"
+
+
+def test_budget_timeout_is_not_retried(primary, replica):
+    router = ReplicaRouter(primary, [replica], cooldown=30)
+    session = sessionmaker(class_=ReplicaSession, router=router)()
+    primary_statements = []
+    event.listen(primary, "before_cursor_execute", lambda *args: primary_statements.append(args[2]))
+
+    slow = text("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT max(i) FROM n")
+    with query_budget(timeout_ms=10), pytest.raises(OperationalError) as raised:
+        session.execute(slow)
+    session.rollback()
+
+    assert database.is_budget_error(raised.value)
+    assert primary_statements == []
+    assert router.pick() is replica
+
+
+def test_mysql_budget_hint_is_a_timeout_only():
+    assert database.QueryBudget(5000).mysql_hint() == "/*+ MAX_EXECUTION_TIME(5000) */ "
+    assert database.QueryBudget().mysql_hint() == ""
+
+
+def test_response_cache_sync_runs_outside_the_request_budget(primary, monkeypatch):
+    from services import response_cache
+
+    budgets = []
+    monkeypatch.setattr(response_cache, "data_version", lambda session: budgets.append(database._budget.get()))
+    cache = response_cache.ResponseCache(sessionmaker(bind=primary)())
+    with query_budget(timeout_ms=10):
+        cache.get("/api/income-statement?symbol=AAPL")
+        assert database._budget.get().timeout_ms == 10
+    assert budgets == [None]
@@ -0,0 +1,64 @@
+import threading
+
+from services.event_bus import EventBus
+
+
+def test_publish_reaches_every_subscriber():
+    bus = EventBus()
+    first, second = bus.subscribe(), bus.subscribe()
+    assert len(bus) == 2
+
+    assert bus.publish("a") == 2
+    assert bus.publish("b") == 2
+    assert first.get(timeout=0) == ["a", "b"]
+    assert second.get(timeout=0) == ["a", "b"]
+    assert first.get(timeout=0) == []
+
+
+def test_unsubscribed_subscriptions_get_nothing():
+    bus = EventBus()
+    with bus.subscribe() as subscription:
+        bus.publish("a")
+    assert len(bus) == 0
+    assert bus.publish("b") == 0
+    assert subscription.get(timeout=0) == ["a"]
+
+    other = bus.subscribe()
+    bus.unsubscribe(other)
+    bus.unsubscribe(other)
+    assert len(bus) == 0
+
+
+def test_slow_subscriber_drops_oldest_events():
+    bus = EventBus(maxsize=3)
+    subscription = bus.subscribe()
+    for event in range(5):
+        bus.publish(event)
+    assert subscription.get(timeout=0) == [2, 3, 4]
+    assert subscription.dropped == 2
+
+    small = bus.subscribe(maxsize=1)
+    bus.publish(5)
+    bus.publish(6)
+    assert small.get(timeout=0) == [6]
+
+
+def test_close_wakes_a_waiting_subscriber():
+    bus = EventBus()
+    subscription = bus.subscribe()
+    received = []
+    waiter = threading.Thread(target=lambda: received.append(subscription.get()))
+    waiter.start()
+    subscription.close()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert received == [[]]
+
+
+def test_get_returns_events_published_while_waiting():
+    bus = EventBus()
+    subscription = bus.subscribe()
+    timer = threading.Timer(0.05, bus.publish, args=("filed",))
+    timer.start()
+    assert subscription.get(timeout=5) == ["filed"]
+    timer.join()
@@ -0,0 +1,104 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES
+from handlers.income_handler import IncomeHandler
+from mappers.field_map import to_date, to_datetime, to_float, to_int, to_str
+from models.income_statement import INCOME_STATEMENT_MAP
+
+
+def income(**overrides):
+    data = {"symbol": "AAPL", "date": "2024-09-28", "reportedCurrency": "USD", "revenue": "391035000000",
+            "grossProfit": 180683000000.0, "grossProfitRatio": "0.4621", "operatingIncome": 123216000000,
+            "netIncome": 93736000000, "eps": "6.11", "ebitda": "", "fillingDate": "2024-11-01",
+            "acceptedDate": "2024-11-01 06:01:36", "period": "FY"}
+    data.update(overrides)
+    return data
+
+
+@pytest.mark.parametrize("coerce, value, expected", [
+    (to_int, "391035000000", 391035000000),
+    (to_int, "1.5e3", 1500),
+    (to_int, 12.9, 12),
+    (to_int, "", None),
+    (to_float, "0.4621", 0.4621),
+    (to_float, None, None),
+    (to_str, 320193, "320193"),
+    (to_date, "2024-11-01 06:01:36", date(2024, 11, 1)),
+    (to_date, datetime(2024, 11, 1, 6, 1), date(2024, 11, 1)),
+    (to_datetime, "2024-11-01 06:01:36", datetime(2024, 11, 1, 6, 1, 36)),
+    (to_datetime, date(2024, 11, 1), datetime(2024, 11, 1)),
+    (to_datetime, "", None),
+])
+def test_coercions(coerce, value, expected):
+    assert coerce(value) == expected
+
+
+def test_to_record_coerces_and_keeps_optional_fields_none():
+    record = INCOME_STATEMENT_MAP.to_record(income(), 7)
+    assert record["company_id"] == 7
+    assert "symbol" not in record           # stored on the companies dimension
+    assert record["date"] == date(2024, 9, 28)
+    assert record["revenue"] == 391035000000 and isinstance(record["revenue"], int)
+    assert record["gross_profit"] == 180683000000 and isinstance(record["gross_profit"], int)
+    assert record["gross_profit_ratio"] == 0.4621
+    assert record["ebitda"] is None
+    assert record["research_and_development_expenses"] is None
+    assert record["accepted_date"] == datetime(2024, 11, 1, 6, 1, 36)
+
+
+def test_to_row_follows_columns():
+    row = INCOME_STATEMENT_MAP.to_row(income(), 7)
+    assert len(row) == len(INCOME_STATEMENT_MAP.columns)
+    assert dict(zip(INCOME_STATEMENT_MAP.columns, row)) == INCOME_STATEMENT_MAP.to_record(income(), 7)
+
+
+def test_missing_required_field_raises():
+    data = income()
+    del data["revenue"]
+    with pytest.raises(KeyError, match="revenue"):
+        INCOME_STATEMENT_MAP.to_row(data, 7)
+    with pytest.raises(KeyError, match="revenue"):
+        INCOME_STATEMENT_MAP.to_record(data, 7)
+
+
+def test_to_company_carries_the_statement_date():
+    assert INCOME_STATEMENT_MAP.to_company(income()) == {"symbol": "AAPL", "date": date(2024, 9, 28)}
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_round_trip_through_sqlite(bulk):
+    engine = make_engine("sqlite://")
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    handler = IncomeHandler(session)
+    if bulk:
+        handler.create_many([income()])
+    else:
+        handler.create(income())
+    session.commit()
+
+    record = handler.read("AAPL")["data"][0]
+    assert record["symbol"] == "AAPL"
+    assert record["date"] == "2024-09-28"
+    assert record["accepted_date"] == "2024-11-01T06:01:36"
+    assert record["revenue"] == 391035000000
+    assert record["eps"] == 6.11
+    assert record["ebitda"] is None
+    assert list(record) == list(INCOME_STATEMENT_MAP.output_columns)
+    session.close()
+    engine.dispose()
+
+
+def test_insert_sql_per_dialect():
+    sqlite_sql = INCOME_STATEMENT_MAP.insert_sql(make_engine("sqlite://").dialect)
+    assert "ON CONFLICT (company_id, date) DO UPDATE SET" in sqlite_sql
+    assert sqlite_sql.count("?") == len(INCOME_STATEMENT_MAP.columns)
+
+    with pytest.raises(NotImplementedError, match="postgresql"):
+        INCOME_STATEMENT_MAP.insert_sql(postgresql.dialect())
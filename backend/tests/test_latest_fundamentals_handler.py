@@ -0,0 +1,114 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES
+from handlers.balance_sheet_handler import BalanceSheetHandler
+from handlers.cash_flow_handler import CashFlowHandler
+from handlers.income_handler import IncomeHandler
+from handlers.latest_fundamentals_handler import LatestFundamentalsHandler
+
+
+def income(symbol, date, revenue):
+    return {"symbol": symbol, "date": date, "reportedCurrency": "USD", "revenue": revenue, "grossProfit": 40,
+            "operatingIncome": 20, "netIncome": 10, "eps": 1.0}
+
+
+def balance_sheet(symbol, date, total_assets):
+    return {"symbol": symbol, "date": date, "reportedCurrency": "USD", "cik": "0000000001",
+            "totalAssets": total_assets, "totalLiabilities": 300, "totalDebt": 100, "totalStockholdersEquity": 200}
+
+
+def cash_flow(symbol, date, free_cash_flow):
+    return {"symbol": symbol, "date": date, "reportedCurrency": "USD", "freeCashFlow": free_cash_flow,
+            "netCashProvidedByOperatingActivities": 120, "netCashUsedForInvestingActivities": -30,
+            "netCashUsedProvidedByFinancingActivities": -50}
+
+
+@pytest.fixture
+def session():
+    engine = make_engine("sqlite://")
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def snapshot(session, symbol):
+    return LatestFundamentalsHandler(session).read(symbol)["data"]
+
+
+def test_newer_statement_replaces_its_section(session):
+    IncomeHandler(session).create(income("A", "2023-12-31", 100))
+    BalanceSheetHandler(session).create(balance_sheet("A", "2023-12-31", 500))
+    session.commit()
+
+    IncomeHandler(session).create(income("A", "2024-12-31", 200))
+    session.commit()
+
+    row = snapshot(session, "A")
+    assert (row["income_date"], row["revenue"]) == ("2024-12-31", 200)
+    # the other sections stay as they were
+    assert (row["balance_sheet_date"], row["total_assets"]) == ("2023-12-31", 500)
+    assert row["cash_flow_date"] is None
+
+
+def test_older_statement_leaves_the_snapshot(session):
+    handler = CashFlowHandler(session)
+    handler.create(cash_flow("A", "2024-12-31", 90))
+    session.commit()
+
+    handler.create(cash_flow("A", "2020-12-31", 10))
+    session.commit()
+
+    row = snapshot(session, "A")
+    assert (row["cash_flow_date"], row["free_cash_flow"]) == ("2024-12-31", 90)
+
+
+def test_deleting_the_newest_statement_falls_back_to_the_previous_one(session):
+    handler = IncomeHandler(session)
+    handler.create_many([income("A", "2024-12-31", 200), income("A", "2023-12-31", 100)])
+    session.commit()
+
+    newest = handler.read("A")["data"][0]
+    assert newest["date"] == "2024-12-31"
+    handler.delete(newest["id"])
+    session.commit()
+
+    row = snapshot(session, "A")
+    assert (row["income_date"], row["revenue"]) == ("2023-12-31", 100)
+
+
+def test_row_is_removed_when_every_section_is_empty(session):
+    handlers = {IncomeHandler(session): income("A", "2024-12-31", 200),
+                BalanceSheetHandler(session): balance_sheet("A", "2024-12-31", 500),
+                CashFlowHandler(session): cash_flow("A", "2024-12-31", 90)}
+    for handler, statement in handlers.items():
+        handler.create(statement)
+    session.commit()
+
+    for remaining, handler in reversed(list(enumerate(handlers))):
+        for record in handler.read("A")["data"]:
+            handler.delete(record["id"])
+        session.commit()
+        assert (snapshot(session, "A") is None) == (remaining == 0)
+
+
+def test_screen_rejects_unknown_columns(session):
+    handler = LatestFundamentalsHandler(session)
+    with pytest.raises(ValueError, match="filter column"):
+        handler.screen(filters={"symbol; DROP TABLE companies": (0, None)})
+    with pytest.raises(ValueError, match="sort column"):
+        handler.screen(sort="updated_at")
+
+
+def test_screen_filters_and_sorts(session):
+    IncomeHandler(session).create_many([income(symbol, "2024-12-31", revenue)
+                                        for symbol, revenue in (("A", 100), ("B", 300), ("C", 200))])
+    session.commit()
+
+    result = LatestFundamentalsHandler(session).screen(filters={"revenue": (150, None)}, order="asc")
+    assert [row["symbol"] for row in result["data"]] == ["C", "B"]
+    assert result["pagination"]["total"] == 2
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from benchmarks.bench_peers import fake_features
+from services.peer_index import PeerMatrix
+
+
+def brute_force(matrix, row, k, metric):
+    vectors = matrix.vectors.astype(np.float64)
+    if metric == "cosine":
+        norms = np.linalg.norm(vectors, axis=1)
+        unit = vectors / np.where(norms > 0, norms, 1.0)[:, None]
+        keys = -(unit @ unit[row])
+    else:
+        keys = np.linalg.norm(vectors - vectors[row], axis=1)
+    keys[row] = np.inf
+    rows = np.argsort(keys, kind="stable")[:k]
+    return rows, (-keys[rows] if metric == "cosine" else keys[rows])
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # several blocks and a short last one, with queries in the first, a middle and the last block
+    monkeypatch.setattr(PeerMatrix, "BLOCK", 64)
+
+
+@pytest.mark.parametrize("metric", ["cosine", "euclidean"])
+def test_nearest_matches_brute_force(metric, small_blocks):
+    symbols, raw = fake_features(1000)
+    matrix = PeerMatrix(symbols, raw)
+    queries = [0, 63, 64, 500, 999]
+
+    rows, scores = matrix.nearest([symbols[row] for row in queries], k=20, metric=metric)
+    assert rows.shape == scores.shape == (len(queries), 20)
+    for query, found, found_scores in zip(queries, rows, scores):
+        expected, expected_scores = brute_force(matrix, query, 20, metric)
+        assert query not in found
+        assert list(found) == list(expected)
+        np.testing.assert_allclose(found_scores, expected_scores, rtol=1e-4, atol=1e-4)
+
+
+def test_k_is_capped_at_the_other_companies():
+    symbols, raw = fake_features(5)
+    rows, scores = PeerMatrix(symbols, raw).nearest([symbols[2]], k=20)
+    assert sorted(rows[0]) == [0, 1, 3, 4]
+    assert list(scores[0]) == sorted(scores[0], reverse=True)
+
+    rows, scores = PeerMatrix(symbols[:1], raw[:1]).nearest(symbols[:1], k=20)
+    assert rows.shape == scores.shape == (1, 0)
+
+
+def test_missing_features_are_the_median():
+    symbols, raw = fake_features(100)
+    raw[7] = np.nan
+    matrix = PeerMatrix(symbols, raw)
+    assert not np.isnan(matrix.vectors).any()
+    assert np.abs(matrix.vectors).max() <= PeerMatrix.CLIP
+    np.testing.assert_array_equal(matrix.vectors[7], 0)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine, sqlite_url
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES
+from handlers.income_handler import IncomeHandler
+from services.ranking_service import RankingService, _Bucket
+
+
+def income(symbol, year, revenue):
+    return {"symbol": symbol, "date": f"{year}-12-31", "reportedCurrency": "USD", "revenue": revenue,
+            "grossProfit": revenue // 2, "operatingIncome": revenue // 4, "netIncome": revenue // 8, "eps": 1.0}
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = make_engine(sqlite_url(str(tmp_path / "rankings.db"), readonly=False))
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    writer, reader = Session(), Session()
+    yield writer, reader
+    writer.close()
+    reader.close()
+    engine.dispose()
+
+
+def test_bucket_sorts_and_counts_ties():
+    bucket = _Bucket({"A": 3.0, "B": 1.0, "C": 3.0, "D": 2.0})
+    assert list(bucket.values) == [1.0, 2.0, 3.0, 3.0]
+    assert list(bucket.symbols) == ["B", "D", "A", "C"]
+    assert bucket.position(3.0) == 4            # ties count as at or below
+    assert bucket.position(2.5) == 2
+    assert bucket.position(0.0) == 0            # below the lowest value
+    assert bucket.position(np.inf) == 4         # above the highest value
+
+
+def test_empty_bucket():
+    bucket = _Bucket({})
+    assert len(bucket) == 0
+    assert bucket.position(1.0) == 0
+
+
+def test_rank_shares_the_best_rank_between_ties(sessions):
+    writer, reader = sessions
+    IncomeHandler(writer).create_many([income("A", 2024, 300), income("B", 2024, 100), income("C", 2024, 300)])
+    writer.commit()
+    rankings = RankingService(reader)
+    rankings.sync(force=True)
+
+    assert [rankings.rank("revenue", s)["rank"] for s in "ABC"] == [1, 3, 1]
+    lowest = rankings.rank("revenue", "B")
+    assert lowest["count"] == 3 and lowest["percentile"] == round(100 / 3, 2)
+    assert rankings.rank("revenue", "B", peers=["A"])["count"] == 2
+
+
+def test_sync_reloads_only_after_a_data_version_bump(sessions):
+    writer, reader = sessions
+    handler = IncomeHandler(writer)
+    handler.create_many([income("A", 2023, 100), income("B", 2023, 200)])
+    writer.commit()
+    rankings = RankingService(reader, interval=3600)
+    rankings.sync()
+    assert rankings.years("revenue") == [2023]
+
+    handler.create_many([income("A", 2024, 500), income("C", 2023, 50)])
+    writer.commit()
+    rankings.sync()         # within the interval, nothing is reloaded
+    assert rankings.years("revenue") == [2023]
+
+    rankings.sync(force=True)
+    assert rankings.years("revenue") == [2023, 2024]
+    assert rankings.rank("revenue", "A")["year"] == 2024
+    assert rankings.rank("revenue", "C", 2023)["rank"] == 3
+    assert rankings.top("revenue", 2023)["data"][0] == {"symbol": "B", "value": 200.0}
+
+
+def test_sync_drops_deleted_companies(sessions):
+    writer, reader = sessions
+    handler = IncomeHandler(writer)
+    handler.create_many([income("A", 2024, 100), income("B", 2024, 200), income("B", 2023, 150)])
+    writer.commit()
+    rankings = RankingService(reader)
+    rankings.sync(force=True)
+    assert rankings.top("revenue", 2024)["count"] == 2
+
+    for record in handler.read("B")["data"]:
+        handler.delete(record["id"])
+    writer.commit()
+    rankings.sync(force=True)
+
+    assert rankings.top("revenue", 2024)["count"] == 1
+    assert rankings.years("revenue") == [2024]      # the 2023 bucket only held B
+    with pytest.raises(LookupError):
+        rankings.rank("revenue", "B")
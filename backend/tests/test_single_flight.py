@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+def wait_for_requests(flight, name, count):
+    deadline = time.monotonic() + 5
+    while flight.stats()["by_name"].get(name, {}).get("requests", 0) < count:
+        assert time.monotonic() < deadline, "callers never joined"
+        time.sleep(0.001)
+
+
+def run_concurrently(flight, func, name="report"):
+    """
+    CALLERS concurrent calls of the same key, `func` only returns once all of them were made
+    """
+    release = threading.Event()
+
+    def blocked():
+        release.wait(5)
+        return func()
+
+    with ThreadPoolExecutor(CALLERS) as pool:
+        futures = [pool.submit(flight.do, "key", blocked, name) for _ in range(CALLERS)]
+        wait_for_requests(flight, name, CALLERS)
+        release.set()
+    return futures
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    futures = run_concurrently(flight, lambda: executions.append(1) or {"rows": 3})
+    results = [future.result() for future in futures]
+    assert len(executions) == 1
+    assert results == [{"rows": 3}] * CALLERS
+    assert all(result is results[0] for result in results)
+
+    stats = flight.stats()
+    assert stats["by_name"]["report"] == {"requests": CALLERS, "executions": 1, "coalesced": CALLERS - 1}
+    assert (stats["requests"], stats["executions"], stats["in_flight"]) == (CALLERS, 1, 0)
+
+
+def test_concurrent_calls_share_the_exception():
+    flight = SingleFlight()
+
+    def fail():
+        raise LookupError("No data")
+
+    for future in run_concurrently(flight, fail):
+        with pytest.raises(LookupError, match="No data"):
+            future.result()
+    assert flight.stats()["executions"] == 1
+
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    results = iter(range(10))
+    assert flight.do("key", lambda: next(results)) == 0
+    assert flight.do("key", lambda: next(results)) == 1
+    assert flight.stats()["by_name"]["key"] == {"requests": 2, "executions": 2, "coalesced": 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do(("income", "AAPL"), lambda: "AAPL", name="income") == "AAPL"
+    assert flight.do(("income", "MSFT"), lambda: "MSFT", name="income") == "MSFT"
+    assert flight.stats()["by_name"]["income"]["executions"] == 2
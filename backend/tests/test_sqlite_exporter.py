@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from database import make_engine, sqlite_url
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES, SQLiteExporter
+from handlers.balance_sheet_handler import BalanceSheetHandler
+from handlers.cash_flow_handler import CashFlowHandler
+from handlers.income_handler import IncomeHandler
+
+SYMBOLS = ("AAPL", "MSFT", "NVDA")
+YEARS = range(2015, 2025)
+
+
+def income(symbol, year):
+    return {"symbol": symbol, "date": f"{year}-12-31", "reportedCurrency": "USD", "revenue": 1000 * year,
+            "grossProfit": 400 * year, "grossProfitRatio": 0.4, "operatingIncome": 200 * year,
+            "netIncome": 100 * year, "eps": year / 1000}
+
+
+def balance_sheet(symbol, year):
+    return {"symbol": symbol, "date": f"{year}-12-31", "reportedCurrency": "USD", "cik": f"000{len(symbol)}",
+            "totalAssets": 5000 * year, "totalLiabilities": 3000 * year, "totalDebt": 1000 * year,
+            "totalStockholdersEquity": 2000 * year}
+
+
+def cash_flow(symbol, year):
+    return {"symbol": symbol, "date": f"{year}-12-31", "reportedCurrency": "USD", "freeCashFlow": 90 * year,
+            "netCashProvidedByOperatingActivities": 120 * year, "netCashUsedForInvestingActivities": -30 * year,
+            "netCashUsedProvidedByFinancingActivities": -50 * year}
+
+
+@pytest.fixture
+def source():
+    engine = make_engine("sqlite://")
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    IncomeHandler(session).create_many([income(s, y) for s in SYMBOLS for y in YEARS])
+    BalanceSheetHandler(session).create_many([balance_sheet(s, y) for s in SYMBOLS for y in YEARS])
+    CashFlowHandler(session).create_many([cash_flow(s, y) for s in SYMBOLS for y in YEARS])
+    session.commit()
+    yield engine, session
+    session.close()
+    engine.dispose()
+
+
+def test_export_round_trip(source, tmp_path):
+    engine, session = source
+    path = str(tmp_path / "insight.db")
+    counts = SQLiteExporter(engine, chunk_size=7).export(path)
+    assert counts["income_statements"] == len(SYMBOLS) * len(YEARS)
+
+    from app import create_app
+    app = create_app(sqlite_url(path), replica_urls=[])
+    client = app.test_client()
+    handlers = {
+        "/api/income-statement": IncomeHandler(session),
+        "/api/balance-sheet-statement": BalanceSheetHandler(session),
+        "/api/cash-flow-statement": CashFlowHandler(session),
+    }
+    for path, handler in handlers.items():
+        for symbol in SYMBOLS:
+            response = client.get(path, query_string={"symbol": symbol})
+            assert response.status_code == 200
+            expected = handler.read(symbol)["data"]
+            assert len(expected) == len(YEARS)
+            # serialized the way the API serializes them, dates included
+            assert response.get_json()["data"] == app.json.loads(app.json.dumps(expected))
+
+
+def test_exported_file_has_no_journal(source, tmp_path):
+    engine, _ = source
+    path = str(tmp_path / "insight.db")
+    SQLiteExporter(engine).export(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["insight.db"]
+
+    served = make_engine(sqlite_url(path))
+    with served.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+    served.dispose()
@@ -0,0 +1,97 @@
+import threading
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+import database
+from app import create_app
+from blueprints import stream
+from database import make_engine, sqlite_url
+from exporters.sqlite_exporter import SCHEMA_ONLY, TABLES
+from models.company import Company
+from models.filing_event import FilingEvent
+from services.filing_feed import FilingFeed
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_engine(sqlite_url(str(tmp_path / "feed.db"), readonly=False))
+    for model in TABLES + SCHEMA_ONLY:
+        model.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Company), [{"id": 1, "symbol": "AAPL"}])
+    yield engine
+    engine.dispose()
+
+
+def record(engine, *ids):
+    with engine.begin() as connection:
+        connection.execute(insert(FilingEvent), [{"id": id, "company_id": 1, "statement": "income-statement",
+                                                  "date": date(2024, 9, 28), "created_at": datetime.utcnow()}
+                                                 for id in ids])
+
+
+def events(subscription, count):
+    received = []
+    while len(received) < count:
+        batch = subscription.get(timeout=5)
+        assert batch, f"got {received} only"
+        received += batch
+    return [event["id"] for event in received]
+
+
+def test_feed_publishes_events_committed_out_of_id_order(engine):
+    record(engine, 1, 2)
+    feed = FilingFeed(sessionmaker(bind=engine)(), interval=0.01)
+    with feed.subscribe() as subscription:
+        record(engine, 5)
+        assert events(subscription, 1) == [5]
+        # a writer that took id 4 before id 5 commits after it
+        record(engine, 4)
+        record(engine, 6)
+        assert events(subscription, 2) == [4, 6]
+        assert subscription.get(timeout=0.1) == []
+
+
+@pytest.fixture
+def app(engine, monkeypatch):
+    monkeypatch.setattr(stream, "STREAMS", threading.BoundedSemaphore(1))
+    yield create_app(str(engine.url), replica_urls=[])
+    database.configure()
+
+
+def test_streams_are_capped_and_released(app):
+    client = app.test_client()
+    first = client.get("/api/stream/filings", buffered=False)
+    assert first.status_code == 200
+
+    refused = client.get("/api/stream/filings", buffered=False)
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"]
+
+    first.close()
+    second = client.get("/api/stream/filings", buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+
+def test_unread_stream_leaves_no_subscription(app):
+    with app.test_request_context("/api/stream/filings"):
+        feed = stream.filing_feed()
+        response = stream.stream_filings()
+    # the server never iterated the response, e.g. the client went away first
+    assert len(feed.bus) == 0
+    response.close()
+    assert stream.STREAMS.acquire(blocking=False)
+    stream.STREAMS.release()
+
+    with app.test_request_context("/api/stream/filings"):
+        response = stream.stream_filings()
+    body = iter(response.response)
+    assert next(body).startswith("retry:")
+    assert len(feed.bus) == 1
+    response.close()
+    body.close()
+    assert len(feed.bus) == 0